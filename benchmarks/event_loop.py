@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Controller traffic under stdlib asyncio vs. uvloop, against local stand-in servers.
+
+For each loop implementation (uvloop only if installed) this measures:
+
+- ``ha_events``: Home Assistant ``state_changed`` events per second through the
+  real ``HomeAssistantWsPlugin`` from a stand-in websocket server,
+- ``cdp_calls``: sequential ``CdpClient.call`` round trips to a stand-in
+  DevTools endpoint,
+- ``wakeup``: latency from a plugin's ``request_evaluate()`` to the
+  controller's tick wait returning, while CDP traffic keeps the loop busy.
+
+Each implementation runs through ``kiosk_control.runtime.run``, so the sized
+default executor is in place as in production. Prints JSON.
+
+    python benchmarks/event_loop.py --events 20000 --calls 5000 --wakeups 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from contextlib import suppress
+from typing import Any
+
+import websockets
+from aiohttp import web
+
+from kiosk_control import runtime
+from kiosk_control.cdp import CdpClient
+from kiosk_control.config import EventLoopConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.httpclient import create_session
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.homeassistant import HomeAssistantConfig, HomeAssistantWsPlugin
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class _DoneContext(PluginContext):
+    """Signals once the last event's value has been published."""
+
+    def __init__(self, last: float) -> None:
+        super().__init__({})
+        self.done = asyncio.Event()
+        self._last = last
+
+    def set_fact(self, key: str, value: Any) -> None:
+        super().set_fact(key, value)
+        if key == "ha.production_w" and value == self._last:
+            self.done.set()
+
+
+async def _ha_events(n: int) -> dict[str, float]:
+    subscribed = asyncio.Event()
+
+    async def ws_handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required"})
+        await ws.receive_json()
+        await ws.send_json({"type": "auth_ok"})
+        await ws.receive_json()  # subscribe_events
+        subscribed.set()
+        for i in range(1, n + 1):
+            entity = "sensor.production" if i % 2 or i == n else "sensor.consumption"
+            await ws.send_json(
+                {
+                    "type": "event",
+                    "event": {
+                        "event_type": "state_changed",
+                        "data": {"entity_id": entity, "new_state": {"state": str(i)}},
+                    },
+                }
+            )
+        with suppress(Exception):
+            await ws.receive()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/api/websocket", ws_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    ctx = _DoneContext(float(n))
+    ctx.http = create_session()
+    plugin = HomeAssistantWsPlugin(
+        HomeAssistantConfig(
+            ws_url=f"ws://127.0.0.1:{port}/api/websocket",
+            token="x",
+            entity_sun="sun.sun",
+            entity_production_w="sensor.production",
+            entity_consumption_w="sensor.consumption",
+            min_surplus_w=100,
+            require_sun_above_horizon=False,
+        )
+    )
+    try:
+        await plugin.start(ctx)
+        await subscribed.wait()
+        t0 = time.perf_counter()
+        await ctx.done.wait()
+        elapsed = time.perf_counter() - t0
+    finally:
+        await plugin.stop()
+        await ctx.http.close()
+        await runner.cleanup()
+    return {"events": n, "seconds": elapsed, "events_per_s": n / elapsed}
+
+
+async def _cdp_echo(ws: Any) -> None:
+    async for raw in ws:
+        msg = json.loads(raw)
+        await ws.send(json.dumps({"id": msg["id"], "result": {"result": {"value": 1}}}))
+
+
+async def _cdp_calls(client: CdpClient, n: int) -> dict[str, float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await client.call("Runtime.evaluate", {"expression": "1"})
+        samples.append(time.perf_counter() - t0)
+    out = _stats(samples)
+    out["calls_per_s"] = n / sum(samples)
+    return out
+
+
+def _controller() -> Controller:
+    return Controller(
+        validate(
+            {
+                "security": {"allow_insecure": True},
+                "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+                "views": {"a": "http://a"},
+                "playlist": [{"view": "a", "seconds": 10}],
+                "policy": {
+                    "idle_off_seconds": 60,
+                    "hypo_threshold_mmol": 4,
+                    "trending_guard_mmol": 0.5,
+                },
+                "screen": {"backlight_sysfs": "/tmp"},
+            }
+        )
+    )
+
+
+async def _wakeups(client: CdpClient, n: int) -> dict[str, float]:
+    ctl = _controller()
+    loop = asyncio.get_running_loop()
+
+    async def background() -> None:
+        while True:
+            await client.call("Runtime.evaluate", {"expression": "1"})
+
+    load = asyncio.create_task(background())
+    samples = []
+    sent = 0.0
+
+    def fire() -> None:
+        nonlocal sent
+        sent = time.perf_counter()
+        ctl._ctx.request_evaluate()
+
+    try:
+        for _ in range(n):
+            loop.call_later(random.uniform(0.001, 0.005), fire)
+            await ctl._wait_tick(1.0)
+            samples.append(time.perf_counter() - sent)
+    finally:
+        load.cancel()
+        with suppress(asyncio.CancelledError):
+            await load
+    return _stats(samples)
+
+
+async def _bench(args: argparse.Namespace) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    out: dict[str, Any] = {"loop": f"{type(loop).__module__}.{type(loop).__name__}"}
+    out["ha_events"] = await _ha_events(args.events)
+    async with websockets.serve(_cdp_echo, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        client = CdpClient(f"ws://127.0.0.1:{port}")
+        await client.connect()
+        try:
+            out["cdp_calls"] = await _cdp_calls(client, args.calls)
+            out["wakeup"] = await _wakeups(client, args.wakeups)
+        finally:
+            assert client._ws
+            await client._ws.close()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--calls", type=int, default=5000)
+    ap.add_argument("--wakeups", type=int, default=500)
+    args = ap.parse_args()
+
+    results = {"benchmark": "event_loop", "asyncio": runtime.run(_bench(args), EventLoopConfig())}
+    if runtime.loop_factory(True) is not None:
+        results["uvloop"] = runtime.run(_bench(args), EventLoopConfig(uvloop=True))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
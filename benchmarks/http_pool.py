@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Request latency against a local TLS server: shared session vs. one per request.
+
+Generates a throwaway self-signed certificate with ``openssl``, serves a small
+JSON document over HTTPS on localhost and compares:
+
+- ``fresh_session``: new SSL context and session per request (what separate
+  plugin clients cost after every reconnect),
+- ``new_connection``: shared context and DNS cache, but a new TCP+TLS
+  connection per request (a network blip that dropped the pool),
+- ``shared_session``: the controller's pooled keep-alive session.
+
+Prints JSON.
+
+    python benchmarks/http_pool.py --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+from kiosk_control.config import HttpConfig
+from kiosk_control.httpclient import create_session
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _make_cert(directory: Path) -> tuple[Path, Path]:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],  # fmt: skip
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+async def _timed(session: aiohttp.ClientSession, url: str) -> float:
+    t0 = time.perf_counter()
+    async with session.get(url) as resp:
+        await resp.read()
+    return time.perf_counter() - t0
+
+
+async def _run(requests: int) -> dict[str, object]:
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = _make_cert(Path(tmp))
+        server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_ctx.load_cert_chain(cert, key)
+
+        async def handler(_request: web.Request) -> web.Response:
+            return web.json_response({"state": "on"})
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "localhost", 0, ssl_context=server_ctx)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        url = f"https://localhost:{port}/"
+
+        def client_ctx() -> ssl.SSLContext:
+            # Like a real client: system CA bundle plus the test certificate.
+            ctx = ssl.create_default_context()
+            ctx.load_verify_locations(cafile=str(cert))
+            return ctx
+
+        try:
+            fresh: list[float] = []
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                async with (
+                    aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=client_ctx())) as s,
+                    s.get(url) as resp,
+                ):
+                    await resp.read()
+                fresh.append(time.perf_counter() - t0)
+
+            shared_ctx = client_ctx()
+            reconnect: list[float] = []
+            session = create_session(HttpConfig(), ssl_context=shared_ctx)
+            async with session:
+                for _ in range(requests):
+                    # Drop pooled connections, keep DNS cache and SSL context.
+                    assert session.connector is not None
+                    for conns in session.connector._conns.values():  # type: ignore[attr-defined]
+                        for proto, _t in conns:
+                            proto.close()
+                    session.connector._conns.clear()  # type: ignore[attr-defined]
+                    reconnect.append(await _timed(session, url))
+
+            pooled: list[float] = []
+            async with create_session(HttpConfig(), ssl_context=shared_ctx) as session:
+                await _timed(session, url)  # warm the pool
+                for _ in range(requests):
+                    pooled.append(await _timed(session, url))
+
+            t0 = time.perf_counter()
+            for _ in range(20):
+                ssl.create_default_context()
+            context_ms = (time.perf_counter() - t0) / 20 * 1000
+        finally:
+            await runner.cleanup()
+
+    return {
+        "benchmark": "http_pool_tls",
+        "ssl_context_create_ms": context_ms,
+        "fresh_session": _stats(fresh),
+        "new_connection": _stats(reconnect),
+        "shared_session": _stats(pooled),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=100)
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(_run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
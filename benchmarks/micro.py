@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks of the controller's hot paths, stored as JSON for comparison.
+
+Each case runs in rounds sized to take at least ``--min-time`` seconds; the
+median and best time per operation over ``--rounds`` rounds are reported:
+
+- ``policy.evaluate`` / ``policy.derive_alert``: one tick's policy decision,
+- ``plugins.screensaver_inhibit``: every plugin of ``configs/example.full.yaml``,
+- ``homeassistant.message``: one ``state_changed`` frame through the plugin,
+- ``cdp.call``: a ``CdpClient`` round trip to a local websocket echo server,
+- ``config.load`` (cold and cached): a config with ``--views`` views, a
+  playlist over all of them and schedules,
+- ``backlight.write``: brightness + power written to a directory in ``/tmp``.
+
+Save a run and compare a later one against it (exit status 1 on regressions):
+
+    python benchmarks/micro.py --out before.json
+    python benchmarks/micro.py --compare before.json --threshold 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import websockets
+import yaml
+
+from kiosk_control import __version__, config
+from kiosk_control.cdp import CdpClient
+from kiosk_control.controller import build_plugin
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.homeassistant import HomeAssistantConfig, HomeAssistantWsPlugin
+from kiosk_control.plugins.manager import PluginManager
+from kiosk_control.policy import PolicyConfig, RuntimeState, derive_alert, evaluate
+from kiosk_control.system.backlight import Backlight
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "configs" / "example.full.yaml"
+
+
+def _summary(number: int, rounds: list[float]) -> dict[str, float]:
+    per_op = [r / number * 1e9 for r in rounds]
+    return {
+        "number": number,
+        "rounds": len(rounds),
+        "median_ns": statistics.median(per_op),
+        "min_ns": min(per_op),
+    }
+
+
+def _measure(fn: Callable[[], object], rounds: int, min_time: float) -> dict[str, float]:
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        number *= 2
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append(time.perf_counter() - t0)
+    return _summary(number, samples)
+
+
+async def _measure_async(
+    fn: Callable[[], Awaitable[object]], rounds: int, min_time: float
+) -> dict[str, float]:
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        number *= 2
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        samples.append(time.perf_counter() - t0)
+    return _summary(number, samples)
+
+
+def _facts() -> dict[str, Any]:
+    now = time.time()
+    return {
+        "activity.last_ts": now,
+        "nightscout.sgv_mmol": 4.3,
+        "nightscout.direction": "FortyFiveDown",
+        "ha.energy_good": False,
+        "presence.detected": False,
+        "weather.temp_c": 12.5,
+    }
+
+
+def _policy_cases() -> dict[str, Callable[[], object]]:
+    cfg = PolicyConfig(
+        idle_off_seconds=120,
+        manual_timeout_seconds=600,
+        hypo_threshold_mmol=4.0,
+        trending_guard_mmol=0.5,
+        falling_directions={"DoubleDown", "SingleDown", "FortyFiveDown"},
+    )
+    state = RuntimeState()
+    facts = _facts()
+    views = {f"v{i}": f"https://example.net/{i}" for i in range(10)}
+    playlist = [{"view": f"v{i}", "seconds": 30} for i in range(10)]
+    return {
+        "policy.evaluate": lambda: evaluate(cfg, state, facts, views, playlist, False),
+        "policy.derive_alert": lambda: derive_alert(facts, cfg),
+    }
+
+
+def _inhibit_case() -> Callable[[], object]:
+    raw = yaml.safe_load(EXAMPLE.read_text(encoding="utf-8"))
+    plugins = []
+    for name, pcfg in raw["plugins"].items():
+        plugin = build_plugin(name, {**pcfg, "enabled": True})
+        if plugin is not None:
+            plugins.append(plugin)
+    pm = PluginManager(plugins)
+    facts = _facts()
+    return lambda: pm.screensaver_inhibit(facts)
+
+
+def _ha_case() -> Callable[[], object]:
+    plugin = HomeAssistantWsPlugin(
+        HomeAssistantConfig(
+            ws_url="wss://ha.invalid/api/websocket",
+            token="x",
+            entity_sun="sun.sun",
+            entity_production_w="sensor.production",
+            entity_consumption_w="sensor.consumption",
+            min_surplus_w=100,
+            require_sun_above_horizon=True,
+        )
+    )
+    plugin._ctx = PluginContext({"ha.consumption_w": 300.0, "ha.sun_state": "above_horizon"})
+    frame = json.dumps(
+        {
+            "type": "event",
+            "event": {
+                "event_type": "state_changed",
+                "data": {
+                    "entity_id": "sensor.production",
+                    "old_state": {"state": "1200", "attributes": {"unit_of_measurement": "W"}},
+                    "new_state": {"state": "1234", "attributes": {"unit_of_measurement": "W"}},
+                },
+            },
+        }
+    )
+    return lambda: plugin._handle_message(frame)
+
+
+def _large_config(path: Path, n_views: int) -> None:
+    raw = yaml.safe_load(EXAMPLE.read_text(encoding="utf-8"))
+    raw["views"] = {f"v{i}": f"https://dash.example.net/d/{i}" for i in range(n_views)}
+    raw["playlist"] = [
+        {"view": f"v{i}", "seconds": 30, "when": f"weather.temp_c > {i % 20} and not presence.x"}
+        for i in range(n_views)
+    ]
+    # The example's displays name views this config replaces.
+    raw["displays"] = [
+        {**d, "playlist": [{"view": f"v{j}", "seconds": 30} for j in range(i, i + 3)]}
+        for i, d in enumerate(raw.get("displays") or [])
+    ]
+    raw["schedules"] = [
+        {
+            "name": f"s{i}",
+            "windows": [
+                {
+                    "days": ["mon", "tue", "wed", "thu", "fri", "sat", "sun"][i % 7],
+                    "start": f"{i % 24:02d}:00",
+                    "end": f"{i % 24:02d}:30",
+                }
+            ],
+            "playlist": [{"view": f"v{j}", "seconds": 60} for j in range(i, i + 5)],
+        }
+        for i in range(min(n_views - 5, 48))
+    ]
+    path.write_text(yaml.safe_dump(raw, sort_keys=False), encoding="utf-8")
+
+
+def _config_cases(path: Path) -> dict[str, Callable[[], object]]:
+    def cold() -> object:
+        config._cache.clear()
+        return config.load(path)
+
+    return {"config.load": cold, "config.load_cached": lambda: config.load(path)}
+
+
+def _backlight_case(sysfs: Path) -> Callable[[], object]:
+    for name in ("bl_power", "brightness"):
+        (sysfs / name).write_text("0", encoding="utf-8")
+    bl = Backlight(sysfs)
+
+    def write() -> None:
+        bl.set_brightness(200)
+        bl.set_power(True)
+
+    return write
+
+
+async def _cdp_echo(ws: Any) -> None:
+    async for raw in ws:
+        msg = json.loads(raw)
+        await ws.send(json.dumps({"id": msg["id"], "result": {"result": {"value": 1}}}))
+
+
+async def _cdp_case(rounds: int, min_time: float) -> dict[str, float]:
+    async with websockets.serve(_cdp_echo, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        client = CdpClient(f"ws://127.0.0.1:{port}")
+        await client.connect()
+        try:
+            return await _measure_async(
+                lambda: client.call("Runtime.evaluate", {"expression": "1"}), rounds, min_time
+            )
+        finally:
+            assert client._ws
+            await client._ws.close()
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+
+    def want(name: str) -> bool:
+        return not args.filter or any(f in name for f in args.filter)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg_path = Path(tmp) / "large.yaml"
+        _large_config(cfg_path, args.views)
+        sysfs = Path(tmp) / "backlight"
+        sysfs.mkdir()
+        cases = {
+            **_policy_cases(),
+            "plugins.screensaver_inhibit": _inhibit_case(),
+            "homeassistant.message": _ha_case(),
+            **_config_cases(cfg_path),
+            "backlight.write": _backlight_case(sysfs),
+        }
+        for name, fn in cases.items():
+            if want(name):
+                results[name] = _measure(fn, args.rounds, args.min_time)
+        if want("cdp.call"):
+            results["cdp.call"] = asyncio.run(_cdp_case(args.rounds, args.min_time))
+    return {
+        "benchmark": "micro",
+        "version": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config_views": args.views,
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Cases whose median time per operation grew by more than ``threshold``."""
+
+    out = []
+    for name, res in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        ratio = res["median_ns"] / old["median_ns"]
+        if ratio > 1 + threshold:
+            out.append(
+                f"{name}: {old['median_ns']:.0f} -> {res['median_ns']:.0f} ns ({ratio:.2f}x)"
+            )
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per round, at least")
+    ap.add_argument("--views", type=int, default=200, help="views in the large config")
+    ap.add_argument("--filter", action="append", help="only cases containing this substring")
+    ap.add_argument("--out", help="write results to this JSON file")
+    ap.add_argument("--compare", help="baseline JSON from an earlier --out")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Press-to-reply latency of overlay commands against a stand-in controller.
+
+Starts a private dbus-daemon, exports ``KioskInterface`` with callbacks that
+simulate controller work, and compares the old two-call sequence (command +
+Wake) with the batched ``Act`` method. Prints JSON.
+
+    python benchmarks/overlay_latency.py --presses 500 --busy-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import time
+
+from kiosk_control.dbus_service import Callbacks, KioskInterface, serve
+from kiosk_overlay.dbus_client import KioskDbusClient
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def _run(presses: int, busy_ms: float) -> dict[str, object]:
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        address = daemon.stdout.readline().strip()
+
+        def busy(*_: object) -> None:
+            # Stand-in for controller work done inside the D-Bus handler.
+            end = time.perf_counter() + busy_ms / 1000
+            while time.perf_counter() < end:
+                pass
+
+        cb = Callbacks(
+            set_view=busy,
+            set_auto=busy,
+            next_view=busy,
+            prev_view=busy,
+            wake=busy,
+            sleep=busy,
+            power_off=lambda _r: True,
+            get_state=lambda: ("a", True, False, "bench"),
+            get_views=lambda: ["a"],
+            get_metrics=lambda: "{}",
+            dump_log=lambda _limit: "[]",
+            set_display_view=lambda _display, _view: True,
+            get_displays=lambda: [],
+        )
+        server_bus = await serve(KioskInterface(cb), bus_address=address)
+        client = await KioskDbusClient.connect(bus_address=address)
+
+        two_calls: list[float] = []
+        batched: list[float] = []
+        for _ in range(presses):
+            t0 = time.perf_counter()
+            await client.set_view("a")
+            await client.wake("ui")
+            two_calls.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            await client.act("SetView", "a", "ui")
+            batched.append(time.perf_counter() - t0)
+
+        await client.close()
+        server_bus.disconnect()
+        return {
+            "benchmark": "overlay_press_to_reply",
+            "busy_ms": busy_ms,
+            "two_calls": _stats(two_calls),
+            "act": _stats(batched),
+        }
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--presses", type=int, default=200)
+    ap.add_argument("--busy-ms", type=float, default=1.0)
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(_run(args.presses, args.busy_ms)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
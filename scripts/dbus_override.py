@@ -31,16 +31,43 @@ async def call(method: str, arg: str | None) -> None:
         await iface.call_sleep("cli")
     elif method == "poweroff":
         await iface.call_power_off("cli")
+    elif method == "metrics":
+        print(await iface.call_get_metrics())
+    elif method == "log":
+        print(await iface.call_dump_log(int(arg or 0)))
+    elif method == "display-view":
+        display, view = (arg or "").split("=", 1)  # main() checked the form
+        if not await iface.call_set_display_view(display, view):
+            raise SystemExit(f"unknown display or view: {arg}")
+    elif method == "displays":
+        for name, view, screen_on, manual, why in await iface.call_get_displays():
+            state = "on" if screen_on else "off"
+            print(f"{name}: {view or '-'} screen={state} manual={manual} why={why}")
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument(
         "cmd",
-        choices=["set-view", "auto", "next", "prev", "wake", "sleep", "poweroff"],
+        choices=[
+            "set-view",
+            "auto",
+            "next",
+            "prev",
+            "wake",
+            "sleep",
+            "poweroff",
+            "metrics",
+            "log",
+            "display-view",
+            "displays",
+        ],
     )
     ap.add_argument("arg", nargs="?")
     args = ap.parse_args()
+    if args.cmd == "display-view" and "=" not in (args.arg or ""):
+        # "right=energy" pins a view on that display, "right=" returns it to its playlist.
+        ap.error("display-view needs DISPLAY=VIEW (an empty VIEW returns it to its playlist)")
     asyncio.run(call(args.cmd, args.arg))
 
 
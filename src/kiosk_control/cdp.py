@@ -1,23 +1,48 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
 import subprocess
+import time
+from collections.abc import Callable
+from contextlib import suppress
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
 
 import websockets
 
+from .config import ProfileConfig, ScreenOffConfig, WindowConfig
 from .paths import default_user_data_dir
+from .system.profile_sync import ProfileSync
+
+log = logging.getLogger(__name__)
 
 
 class CdpError(RuntimeError):
     pass
 
 
+# Route change for SPAs that listen to "location-changed" (Home Assistant) or popstate.
+_SOFT_NAV_JS = """(() => {
+  const u = new URL(%s, location.href);
+  if (u.origin !== location.origin) return false;
+  history.pushState(null, "", u.pathname + u.search + u.hash);
+  window.dispatchEvent(new CustomEvent("location-changed", {detail: {replace: false}}));
+  window.dispatchEvent(new PopStateEvent("popstate", {state: null}));
+  return true;
+})()"""
+
+
+def _origin(url: str) -> tuple[str, str]:
+    parts = urlsplit(url)
+    return (parts.scheme, parts.netloc)
+
+
 def parse_devtools_active_port(profile_dir: str | Path) -> str:
     """Return the browser-level CDP websocket URL from DevToolsActivePort."""
 
@@ -44,15 +69,39 @@ class _Cmd:
     fut: asyncio.Future
 
 
+EventHandler = Callable[[dict[str, Any], str | None], None]
+# (base64 JPEG, frame ack id) of a Page.screencastFrame.
+FrameHandler = Callable[[str, int], None]
+
+
 class CdpClient:
     def __init__(self, ws_url: str):
         self._ws_url = ws_url
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._next_id = 0
         self._pending: dict[int, asyncio.Future] = {}
+        self._listeners: dict[str, list[EventHandler]] = {}
+
+    def on(self, method: str, handler: EventHandler) -> None:
+        """Call ``handler(params, session_id)`` for every ``method`` event.
+
+        Handlers run on the reader task and must not block; schedule work instead.
+        """
+
+        self._listeners.setdefault(method, []).append(handler)
+
+    def _dispatch(self, msg: dict[str, Any]) -> None:
+        for handler in self._listeners.get(msg["method"], ()):
+            try:
+                handler(msg.get("params") or {}, msg.get("sessionId"))
+            except Exception:
+                log.exception("CDP event handler for %s failed", msg["method"])
 
     async def connect(self) -> None:
-        self._ws = await websockets.connect(self._ws_url, ping_interval=20, ping_timeout=20)
+        # Screenshots and snapshots exceed the 1 MiB default message limit.
+        self._ws = await websockets.connect(
+            self._ws_url, ping_interval=20, ping_timeout=20, max_size=64 * 2**20
+        )
         asyncio.create_task(self._reader())
 
     async def _reader(self) -> None:
@@ -61,10 +110,15 @@ class CdpClient:
             msg = json.loads(raw)
             if "id" in msg and msg["id"] in self._pending:
                 fut = self._pending.pop(msg["id"])
+                if fut.done():
+                    # The caller gave up (wait_for timeout, cancelled task).
+                    continue
                 if "error" in msg:
                     fut.set_exception(CdpError(str(msg["error"])))
                 else:
                     fut.set_result(msg.get("result"))
+            elif "method" in msg:
+                self._dispatch(msg)
 
     async def call(
         self, method: str, params: dict[str, Any] | None = None, session_id: str | None = None
@@ -85,20 +139,88 @@ class CdpClient:
         return await fut
 
 
+@dataclass
+class NetworkStats:
+    """Per-view traffic: blocked requests always, the rest only with ``traffic_stats``."""
+
+    requests: int = 0
+    bytes: int = 0
+    blocked: int = 0
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    # Fetch URL patterns ("*" and "?" wildcards).
+    block_urls: tuple[str, ...] = ()
+    # CDP Network.ResourceType names, e.g. "Font", "Media", "Image".
+    block_resource_types: tuple[str, ...] = ()
+    # Count requests and bytes. Needs the Network domain, which sends an event per
+    # request, data chunk and WebSocket frame, so it is off unless a view asks for it.
+    traffic_stats: bool = False
+
+    def fetch_patterns(self) -> list[dict[str, str]]:
+        patterns = [{"urlPattern": u, "requestStage": "Request"} for u in self.block_urls]
+        patterns += [
+            {"urlPattern": "*", "resourceType": t, "requestStage": "Request"}
+            for t in self.block_resource_types
+        ]
+        return patterns
+
+
 class ChromiumKiosk:
     """Start Chromium and provide a single controllable page via CDP."""
 
-    def __init__(self, bin_path: str, user_data_dir: str, extra_flags: list[str]):
+    def __init__(
+        self,
+        bin_path: str,
+        user_data_dir: str,
+        extra_flags: list[str],
+        screen_off: ScreenOffConfig | None = None,
+        profile: ProfileConfig | None = None,
+    ):
         self._bin_path = bin_path
         self._user_data_dir = user_data_dir.strip()
         self._extra_flags = extra_flags
+        self._screen_off = screen_off or ScreenOffConfig()
+        self._profile = profile or ProfileConfig()
+        self.profile_sync: ProfileSync | None = None
         self._proc: subprocess.Popen | None = None
         self._cdp: CdpClient | None = None
         self._session_id: str | None = None
+        self._target_id: str | None = None
+        self._suspended_at: float | None = None
+        # URL of the document currently loaded by a full navigation (soft routes excluded).
+        self._document_url: str | None = None
+        # errorText of the last Page.navigate (e.g. net::ERR_CONNECTION_REFUSED), else None.
+        self.navigation_error: str | None = None
+        self._policy = RequestPolicy()
+        self._traffic_label = ""
+        self.network_stats: dict[str, NetworkStats] = {}
+        self._network_listening = False
+        self._bg: set[asyncio.Task] = set()
+        self._frame_handler: FrameHandler | None = None
+        self._screencast: dict[str, Any] | None = None
+        # Set on windows opened by open_window(): they share its process and connection.
+        self._owner: ChromiumKiosk | None = None
+
+    @property
+    def pid(self) -> int | None:
+        if self._owner:
+            return self._owner.pid
+        return self._proc.pid if self._proc else None
 
     async def start(self) -> None:
         self._ensure_profile_dir()
+        if self._profile.tmpfs:
+            runtime = Path(self._profile.tmpfs_dir).expanduser()
+            self.profile_sync = ProfileSync(
+                Path(self._user_data_dir).expanduser(), runtime, self._profile.sync_paths
+            )
+            await asyncio.to_thread(self.profile_sync.stage)
+            self._user_data_dir = str(runtime)
         cmd = [self._bin_path, f"--user-data-dir={self._user_data_dir}"] + list(self._extra_flags)
+        if self._profile.disk_cache_mb is not None:
+            cmd.append(f"--disk-cache-size={self._profile.disk_cache_mb * 2**20}")
         self._proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
         # Wait for DevToolsActivePort file.
@@ -112,6 +234,7 @@ class ChromiumKiosk:
 
         ws_url = parse_devtools_active_port(self._user_data_dir)
         self._cdp = CdpClient(ws_url)
+        self._listen()
         await self._cdp.connect()
 
         await self._cdp.call("Target.setDiscoverTargets", {"discover": True})
@@ -120,11 +243,161 @@ class ChromiumKiosk:
         if not page:
             raise CdpError("No page target found")
 
+        await self._attach(page["targetId"])
+
+    def _listen(self) -> None:
+        # Events of every target arrive on the shared connection; handlers
+        # ignore sessions other than their own.
+        assert self._cdp
+        self._cdp.on("Fetch.requestPaused", self._on_request_paused)
+        self._cdp.on("Page.screencastFrame", self._on_screencast_frame)
+
+    async def open_window(self, bounds: WindowConfig) -> ChromiumKiosk:
+        """Open another window in the same browser, placed on another output.
+
+        The returned object controls the new window's page like this one does,
+        over the same process and CDP connection.
+        """
+
+        if not self._cdp:
+            raise CdpError("ChromiumKiosk not started")
+        window = ChromiumKiosk(
+            self._bin_path, self._user_data_dir, self._extra_flags, self._screen_off, self._profile
+        )
+        window._owner = self
+        window._cdp = self._cdp
+        window._listen()
+        created = await self._cdp.call(
+            "Target.createTarget", {"url": "about:blank", "newWindow": True}
+        )
+        await window._attach(created["targetId"])
+        await window.place(bounds)
+        return window
+
+    async def place(self, bounds: WindowConfig) -> None:
+        """Move this page's window to ``bounds`` (and make it fullscreen there)."""
+
+        if not self._cdp or not self._target_id:
+            raise CdpError("ChromiumKiosk not started")
+        found = await self._cdp.call("Browser.getWindowForTarget", {"targetId": self._target_id})
+        window_id = found["windowId"]
+        # Bounds are ignored while a window is maximized or fullscreen.
+        await self._cdp.call(
+            "Browser.setWindowBounds", {"windowId": window_id, "bounds": {"windowState": "normal"}}
+        )
+        rect = {"left": bounds.x, "top": bounds.y, "width": bounds.width, "height": bounds.height}
+        await self._cdp.call("Browser.setWindowBounds", {"windowId": window_id, "bounds": rect})
+        if bounds.fullscreen:
+            await self._cdp.call(
+                "Browser.setWindowBounds",
+                {"windowId": window_id, "bounds": {"windowState": "fullscreen"}},
+            )
+
+    async def _attach(self, target_id: str) -> None:
+        assert self._cdp
         attached = await self._cdp.call(
-            "Target.attachToTarget", {"targetId": page["targetId"], "flatten": True}
+            "Target.attachToTarget", {"targetId": target_id, "flatten": True}
         )
+        self._target_id = target_id
         self._session_id = attached["sessionId"]
         await self._cdp.call("Page.enable", session_id=self._session_id)
+        await self._try_call("Performance.enable")
+        await self._apply_policy(self._policy, force=True)
+        if self._screencast is not None:
+            # A recycled target starts without the screencast of the old one.
+            await self._try_call("Page.startScreencast", self._screencast)
+
+    def _stats(self, session_id: str | None) -> NetworkStats | None:
+        if session_id != self._session_id:
+            return None
+        return self.network_stats.setdefault(self._traffic_label, NetworkStats())
+
+    def _on_request(self, _params: dict[str, Any], session_id: str | None) -> None:
+        stats = self._stats(session_id)
+        if stats:
+            stats.requests += 1
+
+    def _on_loading_finished(self, params: dict[str, Any], session_id: str | None) -> None:
+        stats = self._stats(session_id)
+        if stats:
+            stats.bytes += int(params.get("encodedDataLength") or 0)
+
+    def _on_request_paused(self, params: dict[str, Any], session_id: str | None) -> None:
+        # Fetch patterns only cover blocked URLs and resource types, so every paused request fails.
+        assert self._cdp
+        stats = self._stats(session_id)
+        if not stats:
+            return
+        stats.blocked += 1
+        task = asyncio.create_task(
+            self._cdp.call(
+                "Fetch.failRequest",
+                {"requestId": params["requestId"], "errorReason": "BlockedByClient"},
+                session_id=session_id,
+            )
+        )
+        self._bg.add(task)
+        task.add_done_callback(self._bg.discard)
+
+    def _on_screencast_frame(self, params: dict[str, Any], session_id: str | None) -> None:
+        if session_id == self._session_id and self._frame_handler:
+            self._frame_handler(params["data"], params["sessionId"])
+
+    async def start_screencast(
+        self, handler: FrameHandler, quality: int, max_width: int, max_height: int
+    ) -> None:
+        """Stream JPEG frames to ``handler``.
+
+        Chromium sends the next frame only after ack_screencast_frame(), so the
+        consumer sets the pace.
+        """
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        self._frame_handler = handler
+        self._screencast = {
+            "format": "jpeg",
+            "quality": quality,
+            "maxWidth": max_width,
+            "maxHeight": max_height,
+        }
+        await self._cdp.call("Page.startScreencast", self._screencast, session_id=self._session_id)
+
+    async def ack_screencast_frame(self, ack_id: int) -> None:
+        await self._try_call("Page.screencastFrameAck", {"sessionId": ack_id})
+
+    async def stop_screencast(self) -> None:
+        self._frame_handler = None
+        self._screencast = None
+        if self._cdp and self._session_id:
+            await self._try_call("Page.stopScreencast")
+
+    async def prepare_view(self, label: str, policy: RequestPolicy) -> None:
+        """Attribute traffic to ``label`` and apply its request blocking before navigating."""
+
+        self._traffic_label = label
+        await self._apply_policy(policy)
+
+    async def _apply_policy(self, policy: RequestPolicy, force: bool = False) -> None:
+        if not self._cdp or not self._session_id or (policy == self._policy and not force):
+            self._policy = policy
+            return
+        old, self._policy = self._policy, policy
+        patterns = policy.fetch_patterns()
+        if force or patterns != old.fetch_patterns():
+            if patterns:
+                await self._try_call("Fetch.enable", {"patterns": patterns})
+            else:
+                await self._try_call("Fetch.disable")
+        # A freshly attached target starts with the Network domain disabled.
+        if policy.traffic_stats and (force or not old.traffic_stats):
+            if not self._network_listening:
+                self._network_listening = True
+                self._cdp.on("Network.requestWillBeSent", self._on_request)
+                self._cdp.on("Network.loadingFinished", self._on_loading_finished)
+            await self._try_call("Network.enable")
+        elif old.traffic_stats and not policy.traffic_stats:
+            await self._try_call("Network.disable")
 
     def _ensure_profile_dir(self) -> None:
         """Create Chromium profile directory, with safe fallback for user runs.
@@ -133,8 +406,6 @@ class ChromiumKiosk:
         /var/lib/..), fall back to a user-writable XDG path.
         """
 
-        log = logging.getLogger(__name__)
-
         p = Path(self._user_data_dir).expanduser()
         if _needs_user_fallback(p):
             fallback = default_user_data_dir()
@@ -147,6 +418,239 @@ class ChromiumKiosk:
             p = fallback
         p.mkdir(parents=True, exist_ok=True)
 
+    async def navigate(self, url: str, soft: bool = False) -> bool:
+        """Show ``url``. Returns True if it was switched in-page (soft navigation).
+
+        With ``soft`` the already loaded single-page app is routed via
+        ``history.pushState``; anything unexpected falls back to ``Page.navigate``.
+        """
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        if (
+            soft
+            and self._document_url
+            and _origin(self._document_url) == _origin(url)
+            and await self._soft_navigate(url)
+        ):
+            self.navigation_error = None
+            return True
+        res = await self._cdp.call("Page.navigate", {"url": url}, session_id=self._session_id)
+        self.navigation_error = (res or {}).get("errorText") or None
+        # Chromium shows its error page; there is no app to route within.
+        self._document_url = None if self.navigation_error else url
+        return False
+
+    async def show_file(self, path: Path) -> None:
+        """Load a local file (e.g. an offline snapshot) in place of the current view."""
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        await self._cdp.call("Page.navigate", {"url": path.as_uri()}, session_id=self._session_id)
+        self._document_url = None
+
+    async def capture_screenshot(self, quality: int = 70) -> str:
+        """Base64 JPEG of the visible page."""
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        res = await self._cdp.call(
+            "Page.captureScreenshot",
+            {"format": "jpeg", "quality": quality},
+            session_id=self._session_id,
+        )
+        return res["data"]
+
+    async def evaluate(self, expression: str, timeout_seconds: float = 5.0) -> Any:
+        """Evaluate ``expression`` in the page and return its value."""
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        res = await asyncio.wait_for(
+            self._cdp.call(
+                "Runtime.evaluate",
+                {
+                    "expression": expression,
+                    "returnByValue": True,
+                    "awaitPromise": True,
+                    "timeout": int(timeout_seconds * 1000),
+                },
+                session_id=self._session_id,
+            ),
+            timeout_seconds,
+        )
+        if res.get("exceptionDetails"):
+            raise CdpError(str(res["exceptionDetails"].get("text", "exception")))
+        return (res.get("result") or {}).get("value")
+
+    async def heartbeat(self, timeout_seconds: float = 2.0) -> bool:
+        """True if the page's main thread answers a trivial evaluate in time."""
+
+        try:
+            return await self.evaluate("1", timeout_seconds) == 1
+        except (CdpError, TimeoutError):
+            return False
+
+    async def frame_hash(self, scale: float = 0.1) -> str:
+        """Hash of a downscaled screenshot; identical pixels give identical hashes."""
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        layout = await self._cdp.call("Page.getLayoutMetrics", session_id=self._session_id)
+        vp = layout.get("cssVisualViewport") or layout.get("visualViewport") or {}
+        res = await self._cdp.call(
+            "Page.captureScreenshot",
+            {
+                "format": "jpeg",
+                "quality": 30,
+                "clip": {
+                    "x": vp.get("pageX", 0),
+                    "y": vp.get("pageY", 0),
+                    "width": vp.get("clientWidth", 800),
+                    "height": vp.get("clientHeight", 600),
+                    "scale": scale,
+                },
+            },
+            session_id=self._session_id,
+        )
+        return hashlib.blake2b(res["data"].encode(), digest_size=16).hexdigest()
+
+    async def _soft_navigate(self, url: str) -> bool:
+        try:
+            ok = await self.evaluate(_SOFT_NAV_JS % json.dumps(url))
+        except (CdpError, TimeoutError) as e:
+            log.info("soft navigation to %s failed (%s); using full navigation", url, e)
+            return False
+        return ok is True
+
+    async def _try_call(
+        self, method: str, params: dict[str, Any] | None = None, browser: bool = False
+    ) -> bool:
+        """Call that tolerates methods missing from older Chromium builds.
+
+        Goes to the page session unless ``browser`` is set.
+        """
+
+        assert self._cdp
+        try:
+            await self._cdp.call(method, params, session_id=None if browser else self._session_id)
+            return True
+        except CdpError as e:
+            log.debug("%s failed: %s", method, e)
+            return False
+
+    async def suspend(self) -> None:
+        """Drop page CPU use while the screen is off (see ScreenOffConfig.mode)."""
+
+        if not self._cdp or not self._session_id or self._suspended_at is not None:
+            return
+        self._suspended_at = time.monotonic()
+        mode = self._screen_off.mode
+        if mode == "blank":
+            await self._try_call("Page.navigate", {"url": "about:blank"})
+            self._document_url = None
+        elif mode == "freeze":
+            await self._try_call("Animation.setPlaybackRate", {"playbackRate": 0})
+            await self._try_call(
+                "Emulation.setCPUThrottlingRate", {"rate": self._screen_off.cpu_throttle_rate}
+            )
+            await self._try_call("Page.setWebLifecycleState", {"state": "frozen"})
+
+    async def resume(self) -> bool:
+        """Undo suspend(). Returns True if the caller must navigate the current view again."""
+
+        if not self._cdp or not self._session_id or self._suspended_at is None:
+            return False
+        asleep = time.monotonic() - self._suspended_at
+        self._suspended_at = None
+        mode = self._screen_off.mode
+        if mode == "blank":
+            return True
+        if mode == "freeze":
+            await self._try_call("Page.setWebLifecycleState", {"state": "active"})
+            await self._try_call("Emulation.setCPUThrottlingRate", {"rate": 1})
+            await self._try_call("Animation.setPlaybackRate", {"playbackRate": 1})
+            if asleep >= self._screen_off.refresh_after_seconds:
+                await self._try_call("Page.reload")
+        return False
+
+    async def sample_memory(self) -> dict[str, float]:
+        """JS heap and DOM counters of the attached page."""
+
+        if not self._cdp or not self._session_id:
+            raise CdpError("ChromiumKiosk not started")
+        perf = await self._cdp.call("Performance.getMetrics", session_id=self._session_id)
+        heap = await self._cdp.call("Runtime.getHeapUsage", session_id=self._session_id)
+        out = {m["name"]: float(m["value"]) for m in (perf or {}).get("metrics", [])}
+        out["HeapUsed"] = float((heap or {}).get("usedSize", 0))
+        out["HeapTotal"] = float((heap or {}).get("totalSize", 0))
+        return out
+
+    async def recycle(self, url: str, bounds: WindowConfig | None = None) -> None:
+        """Replace the page target with a fresh one (new renderer process) showing ``url``.
+
+        A window from open_window() passes its ``bounds``: the new target gets a
+        window of its own, placed there, instead of a tab in whichever window
+        was active last.
+        """
+
+        if not self._cdp:
+            raise CdpError("ChromiumKiosk not started")
+        old = self._target_id
+        params: dict[str, Any] = {"url": url}
+        if bounds is not None:
+            params["newWindow"] = True
+        elif old:
+            # New tabs open in the last active window; make that ours.
+            await self._try_call("Target.activateTarget", {"targetId": old}, browser=True)
+        created = await self._cdp.call("Target.createTarget", params)
+        await self._attach(created["targetId"])
+        if bounds is not None:
+            await self.place(bounds)
+        self._document_url = url
+        self.navigation_error = None
+        await self._try_call(
+            "Target.activateTarget", {"targetId": created["targetId"]}, browser=True
+        )
+        if old:
+            await self._try_call("Target.closeTarget", {"targetId": old}, browser=True)
+
+    async def sync_profile(self, final: bool = False) -> int:
+        """Write changed profile files back to disk (tmpfs mode). Returns bytes written.
+
+        ``final`` is for after Chromium has exited; see ``ProfileSync.sync``.
+        """
+
+        if not self.profile_sync:
+            return 0
+        return await asyncio.to_thread(self.profile_sync.sync, final)
+
+    async def close(self, timeout_seconds: float = 10.0) -> None:
+        """Terminate Chromium and, in tmpfs mode, sync the profile once it has exited.
+
+        A window from open_window() only closes its own page.
+        """
+
+        if self._owner:
+            if self._cdp and self._target_id:
+                await self._try_call(
+                    "Target.closeTarget", {"targetId": self._target_id}, browser=True
+                )
+            return
+        self.terminate()
+        if self._proc:
+            with suppress(subprocess.TimeoutExpired):
+                await asyncio.to_thread(self._proc.wait, timeout_seconds)
+        if self.profile_sync:
+            try:
+                await self.sync_profile(final=True)
+            except OSError as e:
+                log.error("final profile sync failed: %s", e)
+
+    def terminate(self) -> None:
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+
 
 def _needs_user_fallback(profile_dir: Path) -> bool:
     # Root can create /var/lib locations; user services typically cannot.
@@ -162,12 +666,3 @@ def _needs_user_fallback(profile_dir: Path) -> bool:
         return not os.access(parent, os.W_OK)
     except Exception:
         return True
-
-    async def navigate(self, url: str) -> None:
-        if not self._cdp or not self._session_id:
-            raise CdpError("ChromiumKiosk not started")
-        await self._cdp.call("Page.navigate", {"url": url}, session_id=self._session_id)
-
-    def terminate(self) -> None:
-        if self._proc and self._proc.poll() is None:
-            self._proc.terminate()
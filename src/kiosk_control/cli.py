@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
 
-from kiosk_control import __version__
+from kiosk_control import __version__, logs, runtime
 from kiosk_control.config import load
 from kiosk_control.controller import Controller
 
@@ -16,6 +15,17 @@ def _build_parser() -> argparse.ArgumentParser:
 
     run = sub.add_parser("run", help="Run the kiosk controller")
     run.add_argument("-c", "--config", required=True)
+    run.add_argument(
+        "--watch-config",
+        action="store_true",
+        help="Reload the config when the file changes (SIGHUP always reloads)",
+    )
+    run.add_argument(
+        "--uvloop",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Run under uvloop if installed (default: event_loop.uvloop in the config)",
+    )
 
     return ap
 
@@ -24,5 +34,9 @@ def main() -> None:
     args = _build_parser().parse_args()
     if args.cmd == "run":
         cfg = load(args.config)
-        ctl = Controller(cfg)
-        asyncio.run(ctl.run())
+        logging_setup = logs.setup(cfg.logging)
+        try:
+            ctl = Controller(cfg, config_path=args.config, watch_config=args.watch_config)
+            runtime.run(ctl.run(), cfg.event_loop, use_uvloop=args.uvloop)
+        finally:
+            logging_setup.stop()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import operator
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<num>-?\d+(?:\.\d+)?)
+      | (?P<str>"[^"]*"|'[^']*')
+      | (?P<op>==|!=|<=|>=|<|>|\(|\))
+      | (?P<name>[A-Za-z_][\w.-]*)
+    )""",
+    re.VERBOSE,
+)
+_COMPARE: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_CONSTANTS = {"true": True, "false": False, "null": None, "none": None}
+_KEYWORDS = {"and", "or", "not"}
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A compiled boolean expression over facts, e.g. ``ha.production_w > 100``.
+
+    Compares equal by source so reloaded configs diff cleanly.
+    """
+
+    source: str
+    _eval: Evaluator = field(compare=False, repr=False)
+
+    def __call__(self, facts: Mapping[str, Any]) -> bool:
+        return bool(self._eval(facts))
+
+
+def _compare(op: Callable[[Any, Any], bool], left: Evaluator, right: Evaluator) -> Evaluator:
+    def ev(facts: Mapping[str, Any]) -> bool:
+        a, b = left(facts), right(facts)
+        if op is operator.eq or op is operator.ne:
+            return op(a, b)
+        try:
+            # A missing fact or a type mismatch never satisfies an ordering.
+            return a is not None and b is not None and op(a, b)
+        except TypeError:
+            return False
+
+    return ev
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens: list[tuple[str, str, int]] = []
+        pos = 0
+        while pos < len(source):
+            m = _TOKEN.match(source, pos)
+            if not m or m.end() == pos:
+                if source[pos:].strip():
+                    raise ValueError(f"unexpected {source[pos:].strip()!r} in {source!r}")
+                break
+            kind = m.lastgroup or ""
+            self.tokens.append((kind, m.group(kind), m.start(kind)))
+            pos = m.end()
+        self.i = 0
+
+    def _peek(self) -> str | None:
+        return self.tokens[self.i][1] if self.i < len(self.tokens) else None
+
+    def _take(self) -> tuple[str, str, int]:
+        if self.i >= len(self.tokens):
+            raise ValueError(f"unexpected end of condition {self.source!r}")
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def parse(self) -> Evaluator:
+        ev = self._or()
+        if self.i < len(self.tokens):
+            raise ValueError(f"unexpected {self.tokens[self.i][1]!r} in {self.source!r}")
+        return ev
+
+    def _or(self) -> Evaluator:
+        parts = [self._and()]
+        while self._peek() == "or":
+            self.i += 1
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda facts: any(p(facts) for p in parts)
+
+    def _and(self) -> Evaluator:
+        parts = [self._not()]
+        while self._peek() == "and":
+            self.i += 1
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda facts: all(p(facts) for p in parts)
+
+    def _not(self) -> Evaluator:
+        if self._peek() == "not":
+            self.i += 1
+            inner = self._not()
+            return lambda facts: not inner(facts)
+        return self._comparison()
+
+    def _comparison(self) -> Evaluator:
+        left = self._operand()
+        op = self._peek()
+        if op not in _COMPARE:
+            return left
+        self.i += 1
+        return _compare(_COMPARE[op], left, self._operand())
+
+    def _operand(self) -> Evaluator:
+        kind, text, _pos = self._take()
+        if text == "(":
+            inner = self._or()
+            if self._take()[1] != ")":
+                raise ValueError(f"missing ')' in {self.source!r}")
+            return inner
+        if kind == "num":
+            num = float(text) if "." in text else int(text)
+            return lambda _facts: num
+        if kind == "str":
+            s = text[1:-1]
+            return lambda _facts: s
+        if kind == "name" and text.lower() in _CONSTANTS:
+            const = _CONSTANTS[text.lower()]
+            return lambda _facts: const
+        if kind == "name" and text not in _KEYWORDS:
+            return lambda facts: facts.get(text)
+        raise ValueError(f"unexpected {text!r} in {self.source!r}")
+
+
+def compile_condition(source: str) -> Condition:
+    """Compile ``source`` once; evaluating it is a few closure calls and dict lookups.
+
+    Supports fact names, numbers, quoted strings, ``true``/``false``/``null``,
+    the comparisons ``== != < <= > >=``, ``and``/``or``/``not`` and parentheses.
+    A bare fact name tests truthiness.
+    """
+
+    if not source.strip():
+        raise ValueError("empty condition")
+    return Condition(source.strip(), _Parser(source).parse())
@@ -1,23 +1,318 @@
 from __future__ import annotations
 
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 import yaml
 
-from .paths import default_user_data_dir
+from .conditions import Condition, compile_condition
+from .paths import default_cache_dir, default_runtime_dir, default_user_data_dir
+from .plugins.selectors import check_fact_template, compile_selector
+from .policy import PolicyConfig
+from .schedule import ScheduleConfig, TimeWindow, parse_clock, parse_days
+from .system.profile_sync import DEFAULT_SYNC_PATHS
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# libyaml's loader is several times faster on a Pi; fall back to pure Python.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_MISSING: Any = object()
 
 
 class ConfigError(ValueError):
     pass
 
 
-def _require(cfg: dict[str, Any], key: str) -> Any:
+@dataclass(frozen=True)
+class ScreenOffConfig:
+    """What to do with the page while the screen is off."""
+
+    # "freeze": freeze the page and throttle CPU; "blank": navigate to about:blank;
+    # "none": leave the page running.
+    mode: str = "freeze"
+    cpu_throttle_rate: float = 20.0
+    # Reload on wake if the page was frozen longer than this (stale dashboard data).
+    refresh_after_seconds: int = 300
+
+
+@dataclass(frozen=True)
+class MemoryWatchdogConfig:
+    enabled: bool = False
+    interval_seconds: float = 60.0
+    # JS heap limit for the visible page; None disables it.
+    heap_limit_mb: float | None = None
+    # Browser process-tree RSS limit; crossing it refreshes the visible page once.
+    rss_limit_mb: float | None = None
+    # "reload" the view, or "recycle" the page target (fresh renderer process).
+    action: str = "reload"
+    # Samples kept per view.
+    history: int = 120
+
+
+@dataclass(frozen=True)
+class LivenessConfig:
+    """Detect hung pages (no JS heartbeat) and frozen renders (unchanged screenshots)."""
+
+    enabled: bool = False
+    heartbeat_timeout_seconds: float = 2.0
+    # Consecutive missed heartbeats before the page is recycled.
+    heartbeat_failures: int = 2
+    # Check interval backs off from min to max while the page looks healthy.
+    min_interval_seconds: float = 10.0
+    max_interval_seconds: float = 120.0
+    # should_change views whose screenshot stays identical this long are reloaded.
+    stall_seconds: float = 600.0
+
+
+@dataclass(frozen=True)
+class PreviewConfig:
+    """Live view of the page over HTTP/WebSocket (Page.startScreencast)."""
+
+    enabled: bool = False
+    # Loopback by default; reach it through an SSH tunnel or a reverse proxy.
+    host: str = "127.0.0.1"
+    port: int = 8765
+    quality: int = 60
+    max_fps: float = 2.0
+    max_width: int = 960
+    max_height: int = 540
+
+
+@dataclass(frozen=True)
+class SnapshotConfig:
+    """Last-good screenshots shown when a view fails to load."""
+
+    enabled: bool = False
+    dir: str = ""
+    max_mb: float = 50.0
+    # JPEG quality of Page.captureScreenshot.
+    quality: int = 70
+    # Capture this long after a successful navigation, then every capture_interval_seconds.
+    capture_after_seconds: float = 15.0
+    capture_interval_seconds: float = 900.0
+    # While a snapshot is shown, retry the live URL this often.
+    retry_seconds: float = 60.0
+
+
+@dataclass(frozen=True)
+class ProfileConfig:
+    """Where Chromium keeps its profile while running."""
+
+    # Run from a RAM-backed copy and write selected files back to user_data_dir.
+    tmpfs: bool = False
+    tmpfs_dir: str = ""
+    sync_interval_seconds: float = 600.0
+    # Paths relative to the profile root that survive restarts (files or directories).
+    sync_paths: tuple[str, ...] = DEFAULT_SYNC_PATHS
+    # --disk-cache-size; None leaves Chromium's default (which can grow to hundreds of MB).
+    disk_cache_mb: int | None = 64
+
+
+@dataclass(frozen=True)
+class ChromiumConfig:
+    bin: str
+    user_data_dir: str
+    extra_flags: list[str]
+    screen_off: ScreenOffConfig = field(default_factory=ScreenOffConfig)
+    memory_watchdog: MemoryWatchdogConfig = field(default_factory=MemoryWatchdogConfig)
+    snapshots: SnapshotConfig = field(default_factory=SnapshotConfig)
+    liveness: LivenessConfig = field(default_factory=LivenessConfig)
+    preview: PreviewConfig = field(default_factory=PreviewConfig)
+    profile: ProfileConfig = field(default_factory=ProfileConfig)
+
+
+@dataclass(frozen=True)
+class ViewConfig:
+    """A view is a URL; the mapping form adds per-view options."""
+
+    url: str
+    # Same-origin route of an already loaded single-page app (e.g. Home Assistant):
+    # switch with history.pushState instead of a full page load.
+    spa: bool = False
+    # URL patterns ("*" wildcards) and CDP resource types (Font, Media, ...) to block.
+    block_urls: tuple[str, ...] = ()
+    block_resource_types: tuple[str, ...] = ()
+    # Export request and byte counts (network.<view>.*); costs a CDP event per request.
+    traffic_stats: bool = False
+    # The page keeps repainting (clock, live graph): unchanged pixels mean it is stuck.
+    should_change: bool = False
+
+
+@dataclass(frozen=True)
+class PlaylistItem:
+    view: str
+    seconds: int
+    # Shown only while this holds; skipped otherwise.
+    when: Condition | None = None
+
+
+@dataclass(frozen=True)
+class ScreenConfig:
+    backlight_sysfs: str
+    brightness_on: int = 200
+    brightness_dim: int = 40
+
+
+@dataclass(frozen=True)
+class WindowConfig:
+    """Browser window bounds in desktop coordinates (the output's position and size)."""
+
+    x: int = 0
+    y: int = 0
+    width: int = 1920
+    height: int = 1080
+    # Fullscreen on whichever output contains the bounds.
+    fullscreen: bool = True
+
+
+# Name of the output driven by the top-level playlist and screen sections.
+PRIMARY_DISPLAY = "main"
+
+
+@dataclass(frozen=True)
+class DisplayConfig:
+    """An output: its own browser window, playlist and screen power."""
+
+    name: str
+    # None for the primary display: Chromium's own window, placed by the compositor.
+    window: WindowConfig | None
+    playlist: tuple[PlaylistItem, ...]
+    # ``backlight_sysfs`` may be empty for outputs without a backlight (HDMI) ...
+    screen: ScreenConfig
+    # ... which are switched by commands instead, e.g. wlr-randr --output HDMI-A-2 --off.
+    power_on_command: tuple[str, ...] = ()
+    power_off_command: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class HttpConfig:
+    """Shared aiohttp session for plugins (connection pool, DNS cache)."""
+
+    limit: int = 20
+    limit_per_host: int = 4
+    dns_ttl_seconds: int = 300
+    keepalive_seconds: float = 60.0
+    connect_timeout_seconds: float = 10.0
+
+
+@dataclass(frozen=True)
+class StateConfig:
+    """Runtime state and last-known facts kept across controller restarts."""
+
+    enabled: bool = False
+    # The default lives in RAM: it survives restarts and crashes but not reboots,
+    # and never writes to the SD card. Point it at persistent storage to keep
+    # state across reboots.
+    path: str = ""
+    # At most one write per this many seconds ...
+    min_interval_seconds: float = 60.0
+    # ... once nothing has changed for this long (or changes kept coming for a full interval).
+    debounce_seconds: float = 2.0
+    # Facts older than this are not restored.
+    max_fact_age_seconds: float = 3600.0
+
+
+@dataclass(frozen=True)
+class EventLoopConfig:
+    """Event loop implementation, executor and health monitoring."""
+
+    # Run under uvloop when it is installed (extra ``uvloop``); falls back to asyncio.
+    uvloop: bool = False
+    # Default executor threads for blocking work (sysfs, snapshots, profile sync).
+    executor_workers: int = 4
+    # Measure scheduling delay and log the stack when the loop is blocked.
+    lag_monitor: bool = True
+    lag_interval_seconds: float = 0.5
+    lag_threshold_seconds: float = 1.0
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    """Log output, rate limiting and the in-memory ring of recent records."""
+
+    level: str = "INFO"
+    # "text" for humans, "json" for one structured object per line.
+    format: str = "text"
+    # Recent records kept in memory for the DumpLog D-Bus method.
+    ring_size: int = 500
+    # Records with the same logger and message template: at most this many ...
+    rate_limit_burst: int = 10
+    # ... per this many seconds; the rest are counted and dropped.
+    rate_limit_window_seconds: float = 60.0
+
+
+@dataclass(frozen=True)
+class KioskConfig:
+    """Validated, typed configuration.
+
+    Plugin sections stay plain mappings; each plugin builds its own config
+    dataclass from them in the controller.
+    """
+
+    chromium: ChromiumConfig
+    views: dict[str, ViewConfig]
+    playlist: list[PlaylistItem]
+    policy: PolicyConfig
+    screen: ScreenConfig
+    poweroff_command: list[str] | None = None
+    allow_insecure: bool = False
+    plugins: dict[str, dict[str, Any]] = field(default_factory=dict)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    # Checked in order; the first active one replaces the default playlist.
+    schedules: list[ScheduleConfig] = field(default_factory=list)
+    state: StateConfig = field(default_factory=StateConfig)
+    event_loop: EventLoopConfig = field(default_factory=EventLoopConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    # Outputs besides the primary one, each with a window in the same browser.
+    displays: list[DisplayConfig] = field(default_factory=list)
+
+
+def primary_display(cfg: KioskConfig) -> DisplayConfig:
+    """The top-level ``playlist`` and ``screen`` as the primary display's config."""
+
+    return DisplayConfig(
+        name=PRIMARY_DISPLAY, window=None, playlist=tuple(cfg.playlist), screen=cfg.screen
+    )
+
+
+def _require(cfg: dict[str, Any], key: str, path: str = "") -> Any:
     if key not in cfg:
-        raise ConfigError(f"Missing required config key: {key}")
+        raise ConfigError(f"Missing required config key: {path}{key}")
     return cfg[key]
 
 
+def _section(cfg: dict[str, Any], key: str, required: bool = True) -> dict[str, Any]:
+    val = _require(cfg, key) if required else cfg.get(key, {})
+    if val is None and not required:
+        return {}
+    if not isinstance(val, dict):
+        raise ConfigError(f"{key}: must be a mapping")
+    return val
+
+
+def _field(
+    section: dict[str, Any],
+    key: str,
+    path: str,
+    conv: Callable[[Any], T],
+    default: Any = _MISSING,
+) -> T:
+    if key not in section:
+        if default is _MISSING:
+            raise ConfigError(f"Missing required config key: {path}.{key}")
+        return default
+    try:
+        return conv(section[key])
+    except (TypeError, ValueError) as e:
+        raise ConfigError(f"{path}.{key}: invalid value {section[key]!r} ({e})") from e
+
+
 def _is_https(url: str) -> bool:
     return url.startswith("https://")
 
@@ -26,14 +321,34 @@ def _is_wss(url: str) -> bool:
     return url.startswith("wss://")
 
 
-def load(path: str | Path) -> dict[str, Any]:
-    p = Path(path)
-    data = yaml.safe_load(p.read_text(encoding="utf-8"))
+def _stat_key(p: Path) -> tuple[int, int, int]:
+    st = p.stat()
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+_cache: dict[Path, tuple[tuple[int, int, int], KioskConfig]] = {}
+
+
+def load(path: str | Path) -> KioskConfig:
+    """Parse and validate a config file.
+
+    The compiled result is cached per path and reused while the file is
+    unchanged, so repeated reload signals do not re-parse YAML.
+    """
+
+    p = Path(path).resolve()
+    key = _stat_key(p)
+    hit = _cache.get(p)
+    if hit and hit[0] == key:
+        return hit[1]
+
+    data = yaml.load(p.read_text(encoding="utf-8"), Loader=_Loader)
     if not isinstance(data, dict):
         raise ConfigError("Top-level config must be a mapping")
     normalize(data)
-    validate(data)
-    return data
+    cfg = validate(data)
+    _cache[p] = (key, cfg)
+    return cfg
 
 
 def normalize(cfg: dict[str, Any]) -> None:
@@ -57,6 +372,8 @@ def normalize(cfg: dict[str, Any]) -> None:
         for k, v in list(views.items()):
             if isinstance(v, str):
                 views[k] = v.strip()
+            elif isinstance(v, dict) and isinstance(v.get("url"), str):
+                v["url"] = v["url"].strip()
 
     plugins = cfg.get("plugins")
     if isinstance(plugins, dict):
@@ -67,65 +384,636 @@ def normalize(cfg: dict[str, Any]) -> None:
                         pcfg[k] = v.strip()
 
 
-def validate(cfg: dict[str, Any]) -> None:
-    security = cfg.get("security", {})
-    allow_insecure = bool(security.get("allow_insecure", False))
+def _opt_float(v: Any) -> float | None:
+    return None if v is None else float(v)
 
-    chromium = _require(cfg, "chromium")
-    _require(chromium, "bin")
-    _require(chromium, "user_data_dir")
-    _require(chromium, "extra_flags")
 
-    views = _require(cfg, "views")
-    if not isinstance(views, dict) or not views:
-        raise ConfigError("views must be a non-empty mapping")
+def _opt_int(v: Any) -> int | None:
+    return None if v is None else int(v)
+
+
+def _str_list(v: Any) -> list[str]:
+    if not isinstance(v, list):
+        raise TypeError("must be a list")
+    return [str(x) for x in v]
+
+
+_BOOL_WORDS = {
+    "true": True,
+    "yes": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "no": False,
+    "off": False,
+    "0": False,
+}
+
+
+def _bool(v: Any) -> bool:
+    # bool("no") is True; quoted words and 0/1 mean what they say, anything else is an error.
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, int | str) and str(v).strip().lower() in _BOOL_WORDS:
+        return _BOOL_WORDS[str(v).strip().lower()]
+    raise TypeError("must be true or false")
+
+
+def _opt_str(v: Any) -> str | None:
+    return None if v is None else str(v)
+
 
-    playlist = _require(cfg, "playlist")
-    if not isinstance(playlist, list) or not playlist:
-        raise ConfigError("playlist must be a non-empty list")
+def _str_map(v: Any) -> dict[str, str]:
+    if not isinstance(v, dict):
+        raise TypeError("must be a mapping")
+    return {str(k): str(x) for k, x in v.items()}
 
-    for item in playlist:
+
+def _str_or_list(v: Any) -> str | list[str] | None:
+    return v if v is None or isinstance(v, str) else _str_list(v)
+
+
+def _mapping_list(v: Any) -> list[dict[str, Any]]:
+    if not isinstance(v, list) or not all(isinstance(x, dict) for x in v):
+        raise TypeError("must be a list of mappings")
+    return v
+
+
+# Plugin settings: key -> converter. Defaults are applied by the builders in
+# controller.py; required keys are only checked for enabled plugins.
+_PLUGIN_KEYS: dict[str, dict[str, Callable[[Any], Any]]] = {
+    "input_activity": {
+        "device_hint": _str_or_list,
+        "min_interval_seconds": float,
+        "hotplug": _bool,
+    },
+    "homeassistant": {
+        "ws_url": str,
+        "token": str,
+        "entity_sun": str,
+        "entity_production_w": str,
+        "entity_consumption_w": str,
+        "min_surplus_w": float,
+        "require_sun_above_horizon": _bool,
+        "reconnect_min_seconds": float,
+        "reconnect_max_seconds": float,
+    },
+    "nightscout": {
+        "base_url": str,
+        "access_token": str,
+        "collections": _str_list,
+        "stale_seconds": int,
+    },
+    "presence": {
+        "sources": _mapping_list,
+        "poll_interval_seconds": float,
+        "debounce_seconds": float,
+        "hold_seconds": float,
+    },
+    "rest": {"endpoints": _mapping_list, "max_concurrency": int, "timeout_seconds": float},
+    "mqtt": {
+        "host": str,
+        "port": int,
+        "username": _opt_str,
+        "password": _opt_str,
+        "client_id": str,
+        "tls": _bool,
+        "keepalive": int,
+        "topics": _mapping_list,
+        "reconnect_min_seconds": float,
+        "reconnect_max_seconds": float,
+    },
+}
+_PLUGIN_REQUIRED: dict[str, tuple[str, ...]] = {
+    "homeassistant": (
+        "ws_url",
+        "token",
+        "entity_sun",
+        "entity_production_w",
+        "entity_consumption_w",
+    ),
+    "nightscout": ("base_url", "access_token"),
+    "mqtt": ("host",),
+}
+# (plugin, list key) -> item keys, required item keys
+_PLUGIN_ITEMS: dict[tuple[str, str], tuple[dict[str, Callable[[Any], Any]], tuple[str, ...]]] = {
+    ("presence", "sources"): (
+        {
+            "kind": str,
+            "path": str,
+            "gpio": _opt_int,
+            "line": _opt_int,
+            "active_value": str,
+            "threshold": _opt_float,
+            "invert": _bool,
+        },
+        ("kind",),
+    ),
+    ("rest", "endpoints"): (
+        {
+            "name": str,
+            "url": str,
+            "facts": _str_map,
+            "headers": _str_map,
+            "interval_seconds": float,
+            "min_interval_seconds": float,
+            "max_interval_seconds": float,
+            "screen_off_interval_seconds": _opt_float,
+        },
+        ("name", "url", "facts"),
+    ),
+    ("mqtt", "topics"): (
+        {"filter": str, "fact": str, "field": _opt_str, "qos": int},
+        ("filter", "fact"),
+    ),
+}
+_PRESENCE_KINDS = ("file", "gpio_sysfs", "gpiochip")
+
+
+def _typed(
+    raw: dict[str, Any],
+    path: str,
+    keys: dict[str, Callable[[Any], Any]],
+    required: tuple[str, ...],
+) -> dict[str, Any]:
+    for key in raw:
+        if key not in keys:
+            # A warning, not an error: older configs carry keys that are no longer read.
+            log.warning(
+                "%s.%s: unknown key ignored (expected one of %s)", path, key, ", ".join(keys)
+            )
+    out = {key: _field(raw, key, path, conv) for key, conv in keys.items() if key in raw}
+    for key in required:
+        if key not in out:
+            raise ConfigError(f"Missing required config key: {path}.{key}")
+    return out
+
+
+def _check(path: str, check: Callable[..., Any], *args: Any) -> None:
+    # Re-raise a plugin-side ValueError with the key path it came from.
+    try:
+        check(*args)
+    except ValueError as e:
+        raise ConfigError(f"{path}: {e}") from None
+
+
+def _plugin(name: str, raw: Any) -> dict[str, Any]:
+    path = f"plugins.{name}"
+    if raw is None:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ConfigError(f"{path}: must be a mapping")
+    enabled = _field(raw, "enabled", path, _bool, False)
+    keys = {"enabled": _bool, **_PLUGIN_KEYS[name]}
+    out = _typed(raw, path, keys, _PLUGIN_REQUIRED.get(name, ()) if enabled else ())
+    for (plugin, list_key), (item_keys, item_required) in _PLUGIN_ITEMS.items():
+        if plugin != name or list_key not in out:
+            continue
+        out[list_key] = [
+            _typed(item, f"{path}.{list_key}[{i}]", item_keys, item_required)
+            for i, item in enumerate(out[list_key])
+        ]
+    for i, src in enumerate(out.get("sources", []) if name == "presence" else []):
+        if src["kind"] not in _PRESENCE_KINDS:
+            raise ConfigError(
+                f"{path}.sources[{i}].kind: must be one of {', '.join(_PRESENCE_KINDS)}"
+            )
+    for i, ep in enumerate(out.get("endpoints", []) if name == "rest" else []):
+        for fact, selector in ep["facts"].items():
+            _check(f"{path}.endpoints[{i}].facts.{fact}", compile_selector, selector)
+    for i, topic in enumerate(out.get("topics", []) if name == "mqtt" else []):
+        _check(f"{path}.topics[{i}].fact", check_fact_template, topic["filter"], topic["fact"])
+        if topic.get("field"):
+            _check(f"{path}.topics[{i}].field", compile_selector, topic["field"])
+    return out
+
+
+def _view(name: str, raw: Any) -> ViewConfig:
+    if isinstance(raw, str):
+        return ViewConfig(url=raw)
+    if not isinstance(raw, dict):
+        raise ConfigError(f"views.{name}: must be a URL or a mapping with url")
+    path = f"views.{name}"
+    return ViewConfig(
+        url=_field(raw, "url", path, str),
+        spa=_field(raw, "spa", path, _bool, False),
+        block_urls=tuple(_field(raw, "block_urls", path, _str_list, [])),
+        block_resource_types=tuple(_field(raw, "block_resource_types", path, _str_list, [])),
+        should_change=_field(raw, "should_change", path, _bool, False),
+        traffic_stats=_field(raw, "traffic_stats", path, _bool, False),
+    )
+
+
+def _playlist(raw: Any, path: str, views: dict[str, ViewConfig]) -> list[PlaylistItem]:
+    if not isinstance(raw, list) or not raw:
+        raise ConfigError(f"{path} must be a non-empty list")
+    playlist: list[PlaylistItem] = []
+    for i, item in enumerate(raw):
+        item_path = f"{path}[{i}]"
         if not isinstance(item, dict):
-            raise ConfigError("playlist items must be mappings")
+            raise ConfigError(f"{item_path}: playlist items must be mappings")
         view = item.get("view")
         if view not in views:
-            raise ConfigError(f"playlist references unknown view: {view}")
-        if int(item.get("seconds", 0)) <= 0:
-            raise ConfigError(f"playlist item seconds must be > 0: {item}")
+            raise ConfigError(f"{item_path}.view: playlist references unknown view: {view}")
+        seconds = _field(item, "seconds", item_path, int, 0)
+        if seconds <= 0:
+            raise ConfigError(f"{item_path}.seconds: playlist item seconds must be > 0: {item}")
+        when = _field(item, "when", item_path, compile_condition, None)
+        playlist.append(PlaylistItem(view=str(view), seconds=seconds, when=when))
+    return playlist
+
 
-    policy = _require(cfg, "policy")
-    if int(policy.get("idle_off_seconds", 0)) <= 0:
+def _clock(v: Any) -> int:
+    if not isinstance(v, str):
+        # YAML 1.1 reads an unquoted 06:30 as the base-60 integer 390.
+        raise TypeError('times must be quoted strings, e.g. "06:30"')
+    return parse_clock(v)
+
+
+def _schedule(i: int, raw: Any, views: dict[str, ViewConfig]) -> ScheduleConfig:
+    path = f"schedules[{i}]"
+    if not isinstance(raw, dict):
+        raise ConfigError(f"{path}: must be a mapping")
+    windows_raw = _field(raw, "windows", path, list)
+    if not windows_raw:
+        raise ConfigError(f"{path}.windows must be a non-empty list")
+    windows = []
+    for j, w in enumerate(windows_raw):
+        wpath = f"{path}.windows[{j}]"
+        if not isinstance(w, dict):
+            raise ConfigError(f"{wpath}: must be a mapping")
+        windows.append(
+            TimeWindow(
+                days=_field(w, "days", wpath, parse_days, tuple(range(7))),
+                start=_field(w, "start", wpath, _clock),
+                end=_field(w, "end", wpath, _clock),
+            )
+        )
+    playlist: list[PlaylistItem] = []
+    if "playlist" in raw:
+        playlist = _playlist(raw["playlist"], f"{path}.playlist", views)
+    displays_raw = _field(raw, "displays", path, dict, {})
+    displays = {
+        str(name): tuple(_playlist(items, f"{path}.displays.{name}", views))
+        for name, items in displays_raw.items()
+    }
+    return ScheduleConfig(
+        name=_field(raw, "name", path, str, f"schedule{i}"),
+        windows=tuple(windows),
+        playlist=tuple(playlist),
+        displays=displays,
+        screen_off=_field(raw, "screen_off", path, _bool, False),
+    )
+
+
+def _display(i: int, raw: Any, views: dict[str, ViewConfig]) -> DisplayConfig:
+    path = f"displays[{i}]"
+    if not isinstance(raw, dict):
+        raise ConfigError(f"{path}: must be a mapping")
+    name = _field(raw, "name", path, str)
+    if name == PRIMARY_DISPLAY:
+        raise ConfigError(f"{path}.name: {PRIMARY_DISPLAY!r} is the primary display")
+    win_raw = _require(raw, "window", f"{path}.")
+    win_path = f"{path}.window"
+    if not isinstance(win_raw, dict):
+        raise ConfigError(f"{win_path}: must be a mapping")
+    window = WindowConfig(
+        x=_field(win_raw, "x", win_path, int, 0),
+        y=_field(win_raw, "y", win_path, int, 0),
+        width=_field(win_raw, "width", win_path, int, 1920),
+        height=_field(win_raw, "height", win_path, int, 1080),
+        fullscreen=_field(win_raw, "fullscreen", win_path, _bool, True),
+    )
+    if window.width <= 0 or window.height <= 0:
+        raise ConfigError(f"{win_path}: width and height must be > 0")
+    screen_raw = raw.get("screen") or {}
+    screen_path = f"{path}.screen"
+    if not isinstance(screen_raw, dict):
+        raise ConfigError(f"{screen_path}: must be a mapping")
+    return DisplayConfig(
+        name=name,
+        window=window,
+        playlist=tuple(_playlist(raw.get("playlist"), f"{path}.playlist", views)),
+        screen=ScreenConfig(
+            backlight_sysfs=_field(screen_raw, "backlight_sysfs", screen_path, str, ""),
+            brightness_on=_field(screen_raw, "brightness_on", screen_path, int, 200),
+            brightness_dim=_field(screen_raw, "brightness_dim", screen_path, int, 40),
+        ),
+        power_on_command=tuple(_field(screen_raw, "power_on_command", screen_path, _str_list, [])),
+        power_off_command=tuple(
+            _field(screen_raw, "power_off_command", screen_path, _str_list, [])
+        ),
+    )
+
+
+def validate(cfg: dict[str, Any]) -> KioskConfig:
+    """Validate a normalized config mapping and compile it into a KioskConfig.
+
+    Errors name the offending key path, e.g. ``playlist[2].seconds``.
+    """
+
+    security = _section(cfg, "security", required=False)
+    allow_insecure = _field(security, "allow_insecure", "security", _bool, False)
+
+    chromium_raw = _section(cfg, "chromium")
+    screen_off_raw = _section(chromium_raw, "screen_off", required=False)
+    screen_off = ScreenOffConfig(
+        mode=_field(screen_off_raw, "mode", "chromium.screen_off", str, "freeze"),
+        cpu_throttle_rate=_field(
+            screen_off_raw, "cpu_throttle_rate", "chromium.screen_off", float, 20.0
+        ),
+        refresh_after_seconds=_field(
+            screen_off_raw, "refresh_after_seconds", "chromium.screen_off", int, 300
+        ),
+    )
+    if screen_off.mode not in ("freeze", "blank", "none"):
+        raise ConfigError("chromium.screen_off.mode must be one of: freeze, blank, none")
+    mw_raw = _section(chromium_raw, "memory_watchdog", required=False)
+    mw_path = "chromium.memory_watchdog"
+    memory_watchdog = MemoryWatchdogConfig(
+        enabled=_field(mw_raw, "enabled", mw_path, _bool, False),
+        interval_seconds=_field(mw_raw, "interval_seconds", mw_path, float, 60.0),
+        heap_limit_mb=_field(mw_raw, "heap_limit_mb", mw_path, _opt_float, None),
+        rss_limit_mb=_field(mw_raw, "rss_limit_mb", mw_path, _opt_float, None),
+        action=_field(mw_raw, "action", mw_path, str, "reload"),
+        history=_field(mw_raw, "history", mw_path, int, 120),
+    )
+    if memory_watchdog.action not in ("reload", "recycle"):
+        raise ConfigError(f"{mw_path}.action must be one of: reload, recycle")
+    if memory_watchdog.interval_seconds <= 0:
+        raise ConfigError(f"{mw_path}.interval_seconds must be > 0")
+    snap_raw = _section(chromium_raw, "snapshots", required=False)
+    snap_path = "chromium.snapshots"
+    snapshots = SnapshotConfig(
+        enabled=_field(snap_raw, "enabled", snap_path, _bool, False),
+        dir=_field(snap_raw, "dir", snap_path, str, str(default_cache_dir() / "snapshots")),
+        max_mb=_field(snap_raw, "max_mb", snap_path, float, 50.0),
+        quality=_field(snap_raw, "quality", snap_path, int, 70),
+        capture_after_seconds=_field(snap_raw, "capture_after_seconds", snap_path, float, 15.0),
+        capture_interval_seconds=_field(
+            snap_raw, "capture_interval_seconds", snap_path, float, 900.0
+        ),
+        retry_seconds=_field(snap_raw, "retry_seconds", snap_path, float, 60.0),
+    )
+    if not 0 < snapshots.quality <= 100:
+        raise ConfigError(f"{snap_path}.quality must be in 1..100")
+    live_raw = _section(chromium_raw, "liveness", required=False)
+    live_path = "chromium.liveness"
+    liveness = LivenessConfig(
+        enabled=_field(live_raw, "enabled", live_path, _bool, False),
+        heartbeat_timeout_seconds=_field(
+            live_raw, "heartbeat_timeout_seconds", live_path, float, 2.0
+        ),
+        heartbeat_failures=_field(live_raw, "heartbeat_failures", live_path, int, 2),
+        min_interval_seconds=_field(live_raw, "min_interval_seconds", live_path, float, 10.0),
+        max_interval_seconds=_field(live_raw, "max_interval_seconds", live_path, float, 120.0),
+        stall_seconds=_field(live_raw, "stall_seconds", live_path, float, 600.0),
+    )
+    if not 0 < liveness.min_interval_seconds <= liveness.max_interval_seconds:
+        raise ConfigError(f"{live_path}: need 0 < min_interval_seconds <= max_interval_seconds")
+    pv_raw = _section(chromium_raw, "preview", required=False)
+    pv_path = "chromium.preview"
+    preview = PreviewConfig(
+        enabled=_field(pv_raw, "enabled", pv_path, _bool, False),
+        host=_field(pv_raw, "host", pv_path, str, "127.0.0.1"),
+        port=_field(pv_raw, "port", pv_path, int, 8765),
+        quality=_field(pv_raw, "quality", pv_path, int, 60),
+        max_fps=_field(pv_raw, "max_fps", pv_path, float, 2.0),
+        max_width=_field(pv_raw, "max_width", pv_path, int, 960),
+        max_height=_field(pv_raw, "max_height", pv_path, int, 540),
+    )
+    if not 0 < preview.quality <= 100:
+        raise ConfigError(f"{pv_path}.quality must be in 1..100")
+    if preview.max_fps <= 0:
+        raise ConfigError(f"{pv_path}.max_fps must be > 0")
+    prof_raw = _section(chromium_raw, "profile", required=False)
+    prof_path = "chromium.profile"
+    profile = ProfileConfig(
+        tmpfs=_field(prof_raw, "tmpfs", prof_path, _bool, False),
+        tmpfs_dir=_field(
+            prof_raw, "tmpfs_dir", prof_path, str, str(default_runtime_dir() / "chrome-profile")
+        ),
+        sync_interval_seconds=_field(prof_raw, "sync_interval_seconds", prof_path, float, 600.0),
+        sync_paths=tuple(
+            _field(prof_raw, "sync_paths", prof_path, _str_list, list(DEFAULT_SYNC_PATHS))
+        ),
+        disk_cache_mb=_field(prof_raw, "disk_cache_mb", prof_path, _opt_int, 64),
+    )
+    if profile.sync_interval_seconds <= 0:
+        raise ConfigError(f"{prof_path}.sync_interval_seconds must be > 0")
+
+    chromium = ChromiumConfig(
+        bin=_field(chromium_raw, "bin", "chromium", str),
+        user_data_dir=_field(chromium_raw, "user_data_dir", "chromium", str),
+        extra_flags=_field(chromium_raw, "extra_flags", "chromium", _str_list),
+        screen_off=screen_off,
+        memory_watchdog=memory_watchdog,
+        snapshots=snapshots,
+        liveness=liveness,
+        preview=preview,
+        profile=profile,
+    )
+
+    views_raw = _require(cfg, "views")
+    if not isinstance(views_raw, dict) or not views_raw:
+        raise ConfigError("views must be a non-empty mapping")
+    views = {str(k): _view(str(k), v) for k, v in views_raw.items()}
+
+    playlist = _playlist(_require(cfg, "playlist"), "playlist", views)
+
+    schedules_raw = cfg.get("schedules") or []
+    if not isinstance(schedules_raw, list):
+        raise ConfigError("schedules must be a list")
+    schedules = [_schedule(i, raw, views) for i, raw in enumerate(schedules_raw)]
+
+    displays_raw = cfg.get("displays") or []
+    if not isinstance(displays_raw, list):
+        raise ConfigError("displays must be a list")
+    displays = [_display(i, raw, views) for i, raw in enumerate(displays_raw)]
+    names = [d.name for d in displays]
+    if len(set(names)) != len(names):
+        raise ConfigError("displays: names must be unique")
+    for i, sched in enumerate(schedules):
+        for name in sched.displays:
+            if name not in names:
+                raise ConfigError(f"schedules[{i}].displays.{name}: unknown display")
+
+    policy_raw = _section(cfg, "policy")
+    policy = PolicyConfig(
+        idle_off_seconds=_field(policy_raw, "idle_off_seconds", "policy", int, 0),
+        manual_timeout_seconds=_field(policy_raw, "manual_timeout_seconds", "policy", int, 600),
+        hypo_threshold_mmol=_field(policy_raw, "hypo_threshold_mmol", "policy", float),
+        trending_guard_mmol=_field(policy_raw, "trending_guard_mmol", "policy", float),
+        falling_directions=set(_field(policy_raw, "falling_directions", "policy", _str_list, [])),
+    )
+    if policy.idle_off_seconds <= 0:
         raise ConfigError("policy.idle_off_seconds must be > 0")
 
-    screen = _require(cfg, "screen")
-    _require(screen, "backlight_sysfs")
+    screen_raw = _section(cfg, "screen")
+    screen = ScreenConfig(
+        backlight_sysfs=_field(screen_raw, "backlight_sysfs", "screen", str),
+        brightness_on=_field(screen_raw, "brightness_on", "screen", int, 200),
+        brightness_dim=_field(screen_raw, "brightness_dim", "screen", int, 40),
+    )
+
+    system = _section(cfg, "system", required=False)
+    poweroff_command = None
+    if "poweroff_command" in system:
+        poweroff_command = system["poweroff_command"]
+        if not isinstance(poweroff_command, list) or not poweroff_command:
+            raise ConfigError("system.poweroff_command must be a non-empty list")
+        poweroff_command = [str(x) for x in poweroff_command]
+
+    http_raw = _section(cfg, "http", required=False)
+    http = HttpConfig(
+        limit=_field(http_raw, "limit", "http", int, 20),
+        limit_per_host=_field(http_raw, "limit_per_host", "http", int, 4),
+        dns_ttl_seconds=_field(http_raw, "dns_ttl_seconds", "http", int, 300),
+        keepalive_seconds=_field(http_raw, "keepalive_seconds", "http", float, 60.0),
+        connect_timeout_seconds=_field(http_raw, "connect_timeout_seconds", "http", float, 10.0),
+    )
+
+    state_raw = _section(cfg, "state", required=False)
+    state = StateConfig(
+        enabled=_field(state_raw, "enabled", "state", _bool, False),
+        path=_field(state_raw, "path", "state", str, str(default_runtime_dir() / "state.json")),
+        min_interval_seconds=_field(state_raw, "min_interval_seconds", "state", float, 60.0),
+        debounce_seconds=_field(state_raw, "debounce_seconds", "state", float, 2.0),
+        max_fact_age_seconds=_field(state_raw, "max_fact_age_seconds", "state", float, 3600.0),
+    )
 
-    system = cfg.get("system", {})
-    if "poweroff_command" in system and (
-        not isinstance(system["poweroff_command"], list) or not system["poweroff_command"]
-    ):
-        raise ConfigError("system.poweroff_command must be a non-empty list")
+    loop_raw = _section(cfg, "event_loop", required=False)
+    event_loop = EventLoopConfig(
+        uvloop=_field(loop_raw, "uvloop", "event_loop", _bool, False),
+        executor_workers=_field(loop_raw, "executor_workers", "event_loop", int, 4),
+        lag_monitor=_field(loop_raw, "lag_monitor", "event_loop", _bool, True),
+        lag_interval_seconds=_field(loop_raw, "lag_interval_seconds", "event_loop", float, 0.5),
+        lag_threshold_seconds=_field(loop_raw, "lag_threshold_seconds", "event_loop", float, 1.0),
+    )
+    if event_loop.lag_interval_seconds <= 0 or event_loop.lag_threshold_seconds <= 0:
+        raise ConfigError("event_loop lag interval and threshold must be > 0")
+    if event_loop.executor_workers < 1:
+        raise ConfigError("event_loop.executor_workers must be >= 1")
+
+    log_raw = _section(cfg, "logging", required=False)
+    logging_cfg = LoggingConfig(
+        level=_field(log_raw, "level", "logging", str, "INFO").upper(),
+        format=_field(log_raw, "format", "logging", str, "text"),
+        ring_size=_field(log_raw, "ring_size", "logging", int, 500),
+        rate_limit_burst=_field(log_raw, "rate_limit_burst", "logging", int, 10),
+        rate_limit_window_seconds=_field(
+            log_raw, "rate_limit_window_seconds", "logging", float, 60.0
+        ),
+    )
+    if logging_cfg.level not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        raise ConfigError("logging.level must be one of: DEBUG, INFO, WARNING, ERROR, CRITICAL")
+    if logging_cfg.format not in ("text", "json"):
+        raise ConfigError("logging.format must be one of: text, json")
+    if logging_cfg.ring_size < 0:
+        raise ConfigError("logging.ring_size must be >= 0")
+    if logging_cfg.rate_limit_burst < 1 or logging_cfg.rate_limit_window_seconds <= 0:
+        raise ConfigError("logging.rate_limit_burst must be >= 1 and the window > 0")
+
+    plugins_raw = _section(cfg, "plugins", required=False)
+    plugins: dict[str, dict[str, Any]] = {}
+    for name, raw in plugins_raw.items():
+        if str(name) not in _PLUGIN_KEYS:
+            log.warning(
+                "plugins.%s: unknown plugin ignored (expected one of %s)",
+                name,
+                ", ".join(_PLUGIN_KEYS),
+            )
+            continue
+        plugins[str(name)] = _plugin(str(name), raw)
 
     if not allow_insecure:
-        for name, url in views.items():
-            if not _is_https(str(url)):
+        for name, view_cfg in views.items():
+            if not _is_https(view_cfg.url):
                 raise ConfigError(
                     f"views.{name} must be https:// (set allow_insecure to true to bypass)"
                 )
 
-        plugins = cfg.get("plugins", {})
         ha = plugins.get("homeassistant", {})
         if ha.get("enabled"):
             ws_url = str(ha.get("ws_url", ""))
             if not _is_wss(ws_url):
                 raise ConfigError(
-                    "Home Assistant ws_url must be wss:// when allow_insecure is false"
+                    "plugins.homeassistant.ws_url must be wss:// when allow_insecure is false"
                 )
 
+        rest = plugins.get("rest", {})
+        if rest.get("enabled"):
+            for i, ep in enumerate(rest.get("endpoints") or []):
+                if not _is_https(str(ep.get("url", ""))):
+                    raise ConfigError(
+                        f"plugins.rest.endpoints[{i}].url must be https:// "
+                        "when allow_insecure is false"
+                    )
+
+        mqtt = plugins.get("mqtt", {})
+        if mqtt.get("enabled") and not mqtt.get("tls"):
+            raise ConfigError("plugins.mqtt.tls must be true when allow_insecure is false")
+
         ns = plugins.get("nightscout", {})
         if ns.get("enabled"):
             base_url = str(ns.get("base_url", ""))
             if not _is_https(base_url):
                 raise ConfigError(
-                    "Nightscout base_url must be https:// when allow_insecure is false"
+                    "plugins.nightscout.base_url must be https:// when allow_insecure is false"
                 )
+
+    return KioskConfig(
+        chromium=chromium,
+        views=views,
+        playlist=playlist,
+        policy=policy,
+        screen=screen,
+        poweroff_command=poweroff_command,
+        allow_insecure=allow_insecure,
+        plugins=plugins,
+        http=http,
+        schedules=schedules,
+        state=state,
+        event_loop=event_loop,
+        logging=logging_cfg,
+        displays=displays,
+    )
+
+
+@dataclass(frozen=True)
+class ConfigDiff:
+    """Sections that differ between two configs."""
+
+    sections: frozenset[str]
+    plugins: frozenset[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.sections or self.plugins)
+
+
+def diff(old: KioskConfig, new: KioskConfig) -> ConfigDiff:
+    sections = {
+        name
+        for name in (
+            "chromium",
+            "views",
+            "playlist",
+            "policy",
+            "screen",
+            "poweroff_command",
+            "allow_insecure",
+            "http",
+            "schedules",
+            "state",
+            "event_loop",
+            "logging",
+            "displays",
+        )
+        if getattr(old, name) != getattr(new, name)
+    }
+    plugins = {
+        name
+        for name in set(old.plugins) | set(new.plugins)
+        if old.plugins.get(name) != new.plugins.get(name)
+    }
+    return ConfigDiff(sections=frozenset(sections), plugins=frozenset(plugins))
@@ -1,102 +1,255 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import logging
+import signal
 import time
-from dataclasses import dataclass
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
-from kiosk_control.cdp import ChromiumKiosk
+from kiosk_control import logs
+from kiosk_control.cdp import CdpError, ChromiumKiosk
+from kiosk_control.config import (
+    PRIMARY_DISPLAY,
+    ConfigError,
+    DisplayConfig,
+    KioskConfig,
+    ViewConfig,
+    diff,
+    load,
+    primary_display,
+)
 from kiosk_control.dbus_service import Callbacks, KioskInterface, serve
-from kiosk_control.plugins.base import PluginContext
+from kiosk_control.display import Display
+from kiosk_control.httpclient import create_session
+from kiosk_control.liveness import LivenessChecker
+from kiosk_control.loop_monitor import LoopLagMonitor
+from kiosk_control.memory_watchdog import MemorySample, MemoryWatchdog
+from kiosk_control.metrics import Metrics
+from kiosk_control.plugins.base import Plugin, PluginContext
 from kiosk_control.plugins.homeassistant import HomeAssistantConfig, HomeAssistantWsPlugin
 from kiosk_control.plugins.input_activity import InputActivityConfig, InputActivityPlugin
 from kiosk_control.plugins.manager import PluginManager
+from kiosk_control.plugins.mqtt import MqttConfig, MqttPlugin, MqttTopicConfig
 from kiosk_control.plugins.nightscout import NightscoutConfig, NightscoutV3SocketPlugin
-from kiosk_control.policy import Decision, PolicyConfig, RuntimeState, derive_alert, evaluate
-from kiosk_control.system.backlight import Backlight
+from kiosk_control.plugins.presence import PresenceConfig, PresencePlugin, PresenceSourceConfig
+from kiosk_control.plugins.rest import RestConfig, RestEndpointConfig, RestPollingPlugin
+from kiosk_control.policy import Decision, RuntimeState, derive_alert, evaluate, item_view
+from kiosk_control.preview import PreviewServer
+from kiosk_control.schedule import ScheduleConfig, ScheduleIndex
+from kiosk_control.snapshots import SnapshotCache
+from kiosk_control.state_store import StateStore
+from kiosk_control.system.inotify import IN_CLOSE_WRITE, IN_MOVED_TO, Inotify, InotifyError
 from kiosk_control.system.power import PowerConfig, normalize_poweroff_command, request_poweroff
+from kiosk_control.system.procstat import (
+    CpuAccounting,
+    cpu_seconds,
+    process_tree,
+    rss_bytes,
+    write_bytes,
+)
+from kiosk_control.system.sdnotify import SdNotifier
+
+log = logging.getLogger(__name__)
+
+# Browser CPU and disk metrics walk /proc for every Chromium process; GetMetrics
+# reports the latest of these samples.
+_PROC_SAMPLE_SECONDS = 30.0
+
+
+def _build_input_activity(ia: dict[str, Any]) -> Plugin:
+    return InputActivityPlugin(
+        InputActivityConfig(
+            device_hint=ia.get("device_hint"),
+            min_interval_seconds=float(ia.get("min_interval_seconds", 1.0)),
+            hotplug=bool(ia.get("hotplug", True)),
+        )
+    )
+
+
+def _build_homeassistant(ha: dict[str, Any]) -> Plugin:
+    return HomeAssistantWsPlugin(
+        HomeAssistantConfig(
+            ws_url=str(ha["ws_url"]),
+            token=str(ha["token"]),
+            entity_sun=str(ha["entity_sun"]),
+            entity_production_w=str(ha["entity_production_w"]),
+            entity_consumption_w=str(ha["entity_consumption_w"]),
+            min_surplus_w=float(ha.get("min_surplus_w", 0)),
+            require_sun_above_horizon=bool(ha.get("require_sun_above_horizon", True)),
+            reconnect_min_seconds=float(ha.get("reconnect_min_seconds", 1.0)),
+            reconnect_max_seconds=float(ha.get("reconnect_max_seconds", 60.0)),
+        )
+    )
+
+
+def _build_nightscout(ns: dict[str, Any]) -> Plugin:
+    return NightscoutV3SocketPlugin(
+        NightscoutConfig(
+            base_url=str(ns["base_url"]),
+            access_token=str(ns["access_token"]),
+            collections=[str(x) for x in ns.get("collections", ["entries"])],
+            stale_seconds=int(ns.get("stale_seconds", 900)),
+        )
+    )
+
+
+def _build_presence(pr: dict[str, Any]) -> Plugin:
+    return PresencePlugin(
+        PresenceConfig(
+            sources=[PresenceSourceConfig(**src) for src in pr.get("sources", [])],
+            poll_interval_seconds=float(pr.get("poll_interval_seconds", 0.25)),
+            debounce_seconds=float(pr.get("debounce_seconds", 0.2)),
+            hold_seconds=float(pr.get("hold_seconds", 30.0)),
+        )
+    )
+
+
+def _build_rest(rc: dict[str, Any]) -> Plugin:
+    return RestPollingPlugin(
+        RestConfig(
+            endpoints=[RestEndpointConfig(**ep) for ep in rc.get("endpoints", [])],
+            max_concurrency=int(rc.get("max_concurrency", 4)),
+            timeout_seconds=float(rc.get("timeout_seconds", 10.0)),
+        )
+    )
+
+
+def _build_mqtt(mc: dict[str, Any]) -> Plugin:
+    return MqttPlugin(
+        MqttConfig(
+            host=str(mc["host"]),
+            port=int(mc.get("port", 1883)),
+            username=mc.get("username"),
+            password=mc.get("password"),
+            client_id=str(mc.get("client_id", "kiosk-control")),
+            tls=bool(mc.get("tls", False)),
+            keepalive=int(mc.get("keepalive", 60)),
+            topics=[MqttTopicConfig(**t) for t in mc.get("topics", [])],
+            reconnect_min_seconds=float(mc.get("reconnect_min_seconds", 1.0)),
+            reconnect_max_seconds=float(mc.get("reconnect_max_seconds", 60.0)),
+        )
+    )
+
+
+# Config section name -> builder; order is start order.
+PLUGIN_BUILDERS: dict[str, Callable[[dict[str, Any]], Plugin]] = {
+    "input_activity": _build_input_activity,
+    "homeassistant": _build_homeassistant,
+    "nightscout": _build_nightscout,
+    "presence": _build_presence,
+    "rest": _build_rest,
+    "mqtt": _build_mqtt,
+}
+
+
+def build_plugin(name: str, pcfg: dict[str, Any]) -> Plugin | None:
+    builder = PLUGIN_BUILDERS.get(name)
+    if builder is None or not pcfg.get("enabled"):
+        return None
+    return builder(pcfg)
 
 
 @dataclass
 class Controller:
-    cfg: dict[str, Any]
+    cfg: KioskConfig
+    # Source file for hot reload (SIGHUP, and inotify when watch_config is set).
+    config_path: str | None = None
+    watch_config: bool = False
 
     def __post_init__(self) -> None:
         self.facts: dict[str, Any] = {}
-        self.state = RuntimeState()
-        self._current_view: str | None = None
-        self._screen_on = True
         self._forced_sleep = False
+        # Set by plugins (request_evaluate) and D-Bus commands to skip the tick wait.
+        self._wakeup = asyncio.Event()
+        self._reload_requested = False
+        self._inotify: Inotify | None = None
 
-        self._policy_cfg = PolicyConfig(
-            idle_off_seconds=int(self.cfg["policy"]["idle_off_seconds"]),
-            manual_timeout_seconds=int(self.cfg["policy"]["manual_timeout_seconds"]),
-            hypo_threshold_mmol=float(self.cfg["policy"]["hypo_threshold_mmol"]),
-            trending_guard_mmol=float(self.cfg["policy"]["trending_guard_mmol"]),
-            falling_directions=set(self.cfg["policy"].get("falling_directions", [])),
-        )
-
-        backlight_dir = Path(self.cfg["screen"]["backlight_sysfs"])
-        self._backlight = Backlight(backlight_dir)
-
+        self._policy_cfg = self.cfg.policy
         self._power_cfg = PowerConfig(
-            poweroff_command=normalize_poweroff_command(
-                self.cfg.get("system", {}).get("poweroff_command")
-            )
+            poweroff_command=normalize_poweroff_command(self.cfg.poweroff_command)
         )
 
-        chromium = self.cfg["chromium"]
+        chromium = self.cfg.chromium
         self._chromium = ChromiumKiosk(
-            bin_path=str(chromium["bin"]),
-            user_data_dir=str(chromium["user_data_dir"]),
-            extra_flags=[str(x) for x in chromium.get("extra_flags", [])],
+            bin_path=chromium.bin,
+            user_data_dir=chromium.user_data_dir,
+            extra_flags=list(chromium.extra_flags),
+            screen_off=chromium.screen_off,
+            profile=chromium.profile,
         )
-
-        self._views: dict[str, str] = {k: str(v) for k, v in self.cfg["views"].items()}
-        self._playlist: list[dict[str, Any]] = list(self.cfg["playlist"])
-
-        self._plugins = self._build_plugins(self.cfg.get("plugins", {}))
-        self._pm = PluginManager(self._plugins)
+        self._started_at = time.monotonic()
+        self.metrics = Metrics()
+        self._browser_cpu = CpuAccounting()
+        self._memwatch = MemoryWatchdog(chromium.memory_watchdog)
+        self._liveness = LivenessChecker(chromium.liveness)
+        self._preview: PreviewServer | None = None
+        if chromium.preview.enabled:
+            self._preview = PreviewServer(self._chromium, chromium.preview)
+        self._tasks: list[asyncio.Task] = []
+
+        snap = chromium.snapshots
+        self._snapshots: SnapshotCache | None = None
+        if snap.enabled:
+            self._snapshots = SnapshotCache(Path(snap.dir).expanduser(), int(snap.max_mb * 2**20))
+
+        self._views: dict[str, ViewConfig] = dict(self.cfg.views)
+        self._schedules = ScheduleIndex(self.cfg.schedules)
+        self._schedule: ScheduleConfig | None = None
+        # Wall-clock time of the next schedule boundary; nothing to look up before it.
+        self._schedule_until = 0.0
+        # The top-level playlist and screen on Chromium's first window ...
+        self._main = self._display(primary_display(self.cfg), self._chromium)
+        # ... and the outputs besides it, with windows in the same browser (cfg.displays).
+        self._displays: list[Display] = []
+
+        # systemd Type=notify: READY after the first navigation, WATCHDOG while healthy.
+        self._notifier = SdNotifier()
+        self._ready = False
+        self._last_watchdog = 0.0
+        self._loop_monitor: LoopLagMonitor | None = None
+        if self.cfg.event_loop.lag_monitor:
+            self._loop_monitor = LoopLagMonitor(self.cfg.event_loop)
+
+        self._state_store: StateStore | None = None
+        if self.cfg.state.enabled:
+            self._state_store = StateStore(self.cfg.state)
+
+        self._ctx = PluginContext(self.facts, wakeup=self._wakeup)
+        self._pm = PluginManager(self._build_plugins(self.cfg.plugins))
 
         self._bus = None
+        self._iface: KioskInterface | None = None
+        self._published: tuple[str, bool, bool, str] | None = None
+        self._last_decision: Decision | None = None
+
+    @property
+    def state(self) -> RuntimeState:
+        """Playlist position and manual override of the primary display."""
+
+        return self._main.state
+
+    def _display(self, cfg: DisplayConfig, window: ChromiumKiosk) -> Display:
+        return Display(
+            cfg,
+            window,
+            self.metrics,
+            self.cfg.chromium,
+            self._memwatch,
+            self._snapshots,
+            self._schedule,
+        )
 
-    def _build_plugins(self, plugins_cfg: dict[str, Any]) -> list[Any]:
-        out: list[Any] = []
-
-        ia = plugins_cfg.get("input_activity", {})
-        if ia.get("enabled"):
-            out.append(InputActivityPlugin(InputActivityConfig(device_hint=ia.get("device_hint"))))
-
-        ha = plugins_cfg.get("homeassistant", {})
-        if ha.get("enabled"):
-            out.append(
-                HomeAssistantWsPlugin(
-                    HomeAssistantConfig(
-                        ws_url=str(ha["ws_url"]),
-                        token=str(ha["token"]),
-                        entity_sun=str(ha["entity_sun"]),
-                        entity_production_w=str(ha["entity_production_w"]),
-                        entity_consumption_w=str(ha["entity_consumption_w"]),
-                        min_surplus_w=float(ha.get("min_surplus_w", 0)),
-                        require_sun_above_horizon=bool(ha.get("require_sun_above_horizon", True)),
-                    )
-                )
-            )
-
-        ns = plugins_cfg.get("nightscout", {})
-        if ns.get("enabled"):
-            out.append(
-                NightscoutV3SocketPlugin(
-                    NightscoutConfig(
-                        base_url=str(ns["base_url"]),
-                        access_token=str(ns["access_token"]),
-                        collections=[str(x) for x in ns.get("collections", ["entries"])],
-                        stale_seconds=int(ns.get("stale_seconds", 900)),
-                    )
-                )
-            )
-
+    def _build_plugins(self, plugins_cfg: dict[str, dict[str, Any]]) -> list[Plugin]:
+        out: list[Plugin] = []
+        for name in PLUGIN_BUILDERS:
+            plugin = build_plugin(name, plugins_cfg.get(name, {}))
+            if plugin is not None:
+                out.append(plugin)
         return out
 
     def set_view(self, view: str) -> None:
@@ -105,37 +258,467 @@ class Controller:
         self._forced_sleep = False
         self.state.manual_view = view
         self.state.manual_until_ts = time.time() + self._policy_cfg.manual_timeout_seconds
+        self._wakeup.set()
 
     def set_auto(self) -> None:
         self.state.manual_view = None
         self.state.manual_until_ts = 0.0
+        self._wakeup.set()
 
     def next_view(self) -> None:
         self._forced_sleep = False
-        self.state.playlist_index = (self.state.playlist_index + 1) % len(self._playlist)
-        self.set_view(str(self._playlist[self.state.playlist_index]["view"]))
+        self._main.step(1, self.facts)
+        self.set_view(item_view(self._main.playlist[self.state.playlist_index]))
 
     def prev_view(self) -> None:
         self._forced_sleep = False
-        self.state.playlist_index = (self.state.playlist_index - 1) % len(self._playlist)
-        self.set_view(str(self._playlist[self.state.playlist_index]["view"]))
+        self._main.step(-1, self.facts)
+        self.set_view(item_view(self._main.playlist[self.state.playlist_index]))
 
     def wake(self, reason: str) -> None:
         self._forced_sleep = False
         self.facts["activity.last_ts"] = time.time()
+        self._wakeup.set()
 
     def sleep(self, reason: str) -> None:
         if self.facts.get("nightscout.alert"):
             return
         self._forced_sleep = True
+        self._wakeup.set()
+
+    def set_display_view(self, display: str, view: str) -> bool:
+        """Manual override on one output; an empty ``view`` returns it to its playlist."""
+
+        if view and view not in self._views:
+            return False
+        if display == PRIMARY_DISPLAY:
+            if view:
+                self.set_view(view)
+            else:
+                self.set_auto()
+            return True
+        target = next((d for d in self._displays if d.name == display), None)
+        if target is None:
+            return False
+        if view:
+            self._forced_sleep = False
+            target.set_view(view, time.time() + self._policy_cfg.manual_timeout_seconds)
+        else:
+            target.set_auto()
+        self._wakeup.set()
+        return True
+
+    def get_displays(self) -> list[tuple[str, str, bool, bool, str]]:
+        now = time.time()
+        return [(PRIMARY_DISPLAY, *self.get_state())] + [
+            (d.name, *d.get_state(now)) for d in self._displays
+        ]
 
     def power_off(self, reason: str) -> bool:
         return request_poweroff(self._power_cfg, reason)
 
+    def get_state(self) -> tuple[str, bool, bool, str]:
+        return self._main.get_state(time.time())
+
+    def get_views(self) -> list[str]:
+        return list(self._views)
+
+    def _all_displays(self) -> list[Display]:
+        return [self._main, *self._displays]
+
+    def _update_schedule(self, now: float) -> None:
+        """Switch playlists when a schedule starts or ends."""
+
+        if now < self._schedule_until:
+            return
+        active = self._schedules.at(now)
+        self._schedule_until = active.until
+        if active.schedule is self._schedule:
+            return
+        previous, self._schedule = self._schedule, active.schedule
+        log.info(
+            "schedule %s -> %s",
+            previous.name if previous else "default",
+            active.schedule.name if active.schedule else "default",
+        )
+        self.facts["schedule.active"] = active.schedule.name if active.schedule else None
+        for display in self._all_displays():
+            display.set_schedule(active.schedule, now)
+
+    async def _sample_browser_cpu(self, state: str | None = None) -> None:
+        pid = self._chromium.pid
+        if pid is None:
+            return
+        try:
+            # Walks all of /proc (Chromium runs dozens of processes); keep it off the loop.
+            cpu = await asyncio.to_thread(lambda: cpu_seconds(process_tree(pid)))
+        except OSError:
+            return
+        acc = self._browser_cpu
+        acc.sample(cpu, time.monotonic(), state)
+        for name in ("asleep", "awake"):
+            self.metrics.set(f"browser.cpu_seconds.{name}", round(acc.cpu_seconds.get(name, 0), 3))
+            self.metrics.set(f"browser.cpu_percent.{name}", round(acc.cpu_percent(name), 2))
+
+    async def _memory_loop(self) -> None:
+        interval = self.cfg.chromium.memory_watchdog.interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            # Frozen pages do not grow; only sample what is on screen.
+            shown = [d for d in self._all_displays() if d.screen_on and d.current_view]
+            if shown:
+                await self._sample_memory(shown)
+
+    async def _liveness_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._liveness.interval)
+            await self._check_liveness()
+
+    async def _check_liveness(self) -> None:
+        main = self._main
+        view = main.current_view
+        now = time.monotonic()
+        # Frozen-on-purpose (screen off) and offline snapshot pages are not stalls.
+        if not main.screen_on or view is None or main.offline_retry_at is not None:
+            self._liveness.reset(None, now)
+            return
+        if view != self._liveness.view:
+            self._liveness.reset(view, now)
+        cfg = self.cfg.chromium.liveness
+        started = time.perf_counter()
+        ok = await self._chromium.heartbeat(cfg.heartbeat_timeout_seconds)
+        frame = None
+        if ok and self._views[view].should_change:
+            try:
+                frame = await asyncio.wait_for(self._chromium.frame_hash(), 10.0)
+            except (TimeoutError, CdpError) as e:
+                log.debug("frame capture failed: %s", e)
+        self.metrics.set("liveness.check_ms", round((time.perf_counter() - started) * 1000, 1))
+        self.metrics.set("liveness.interval_seconds", self._liveness.interval)
+
+        verdict = self._liveness.observe(now, ok, frame)
+        if verdict is None or view != main.current_view:
+            return
+        url = self._views[view].url
+        log.warning("view %s is %s; reloading", view, verdict)
+        self.metrics.inc(f"liveness.{verdict}.{view}")
+        try:
+            if verdict == "hung":
+                # A busy renderer may never process Page.navigate; replace it instead.
+                await asyncio.wait_for(self._chromium.recycle(url), 15.0)
+            else:
+                await asyncio.wait_for(self._chromium.navigate(url), 15.0)
+        except (TimeoutError, CdpError) as e:
+            log.error("reloading stalled view %s failed: %s", view, e)
+        self._liveness.reset(view, time.monotonic())
+
+    async def _profile_sync_loop(self) -> None:
+        interval = self.cfg.chromium.profile.sync_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                written = await self._chromium.sync_profile()
+            except OSError as e:
+                log.warning("profile sync failed: %s", e)
+                continue
+            if written:
+                log.debug("profile sync wrote %d bytes", written)
+
+    def _runtime_snapshot(self) -> dict[str, Any]:
+        # last_switch_ts is left out: it changes on every playlist step and the
+        # restored item simply starts its slot again.
+        return {
+            "playlist_index": self.state.playlist_index,
+            "playlist_view": item_view(self._main.playlist[self.state.playlist_index]),
+            "manual_view": self.state.manual_view,
+            "manual_until_ts": self.state.manual_until_ts,
+            "forced_sleep": self._forced_sleep,
+        }
+
+    async def _restore_state(self) -> None:
+        assert self._state_store
+        saved = await asyncio.to_thread(self._state_store.load)
+        if saved is None:
+            return
+        now = time.time()
+        facts = self._state_store.fresh_facts(saved, now)
+        self.facts.update(facts)
+        # Until a plugin publishes a live value, "<key>.restored" tells conditions
+        # and the status output that the value predates the restart.
+        self.facts.update({f"{key}.restored": True for key in facts})
+        self._ctx.restored.update(facts)
+        self.facts["state.restored_ts"] = saved.saved_ts
+        # The playlist in effect now (schedules included) may differ from the saved one.
+        self._update_schedule(now)
+        st = saved.state
+        views = [item_view(item) for item in self._main.playlist]
+        idx = int(st.get("playlist_index", 0))
+        if not (0 <= idx < len(views) and views[idx] == st.get("playlist_view")):
+            view = st.get("playlist_view")
+            idx = views.index(view) if view in views else 0
+        self.state.playlist_index = idx
+        manual_until = float(st.get("manual_until_ts") or 0.0)
+        if st.get("manual_view") in self._views and manual_until > now:
+            self.state.manual_view = st["manual_view"]
+            self.state.manual_until_ts = manual_until
+        self._forced_sleep = bool(st.get("forced_sleep"))
+        log.info("restored state from %.0f s ago (%d facts)", now - saved.saved_ts, len(facts))
+
+    async def _state_loop(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            await self._save_state(time.time())
+
+    async def _save_state(self, now: float, force: bool = False) -> None:
+        store = self._state_store
+        assert store
+        store.observe(self._runtime_snapshot(), self.facts, now)
+        if not (store.due(now) or (force and store.dirty)):
+            return
+        version, data = store.document(now)
+        try:
+            await asyncio.to_thread(store.write, data)
+        except OSError as e:
+            log.warning("could not save state to %s: %s", store.path, e)
+            return
+        store.mark_saved(version, now)
+        self.metrics.inc("state.writes")
+
+    async def _proc_loop(self) -> None:
+        while True:
+            await self._sample_proc()
+            await asyncio.sleep(_PROC_SAMPLE_SECONDS)
+
+    async def _sample_proc(self) -> None:
+        await self._sample_browser_cpu()
+        await self._sample_disk_writes()
+        self.metrics.set("proc.sampled_ts", round(time.time(), 1))
+
+    async def _sample_disk_writes(self) -> None:
+        # Block-device writes of the browser tree vs. what the profile sync adds, per hour,
+        # to compare SD card wear with and without chromium.profile.tmpfs.
+        hours = max(time.monotonic() - self._started_at, 1.0) / 3600
+        pid = self._chromium.pid
+        if pid is not None:
+            with suppress(OSError):
+                browser = await asyncio.to_thread(lambda: write_bytes(process_tree(pid)))
+                self.metrics.set("browser.disk_write_bytes", browser)
+                self.metrics.set(
+                    "browser.disk_write_mb_per_hour", round(browser / 2**20 / hours, 2)
+                )
+        sync = self._chromium.profile_sync
+        if sync:
+            self.metrics.set("profile.sync_bytes", sync.bytes_written)
+            self.metrics.set(
+                "profile.sync_mb_per_hour", round(sync.bytes_written / 2**20 / hours, 2)
+            )
+
+    async def _sample_memory(self, displays: list[Display]) -> None:
+        rss = 0
+        pid = self._chromium.pid
+        if pid is not None:
+            rss = await asyncio.to_thread(lambda: rss_bytes(process_tree(pid)))
+        rss_mb = rss / 2**20
+        self.facts["browser.rss_mb"] = round(rss_mb, 1)
+        self.metrics.set("browser.rss_mb", round(rss_mb, 1))
+        for display in displays:
+            view = display.current_view
+            assert view is not None
+            try:
+                page = await asyncio.wait_for(display.window.sample_memory(), 5.0)
+            except (TimeoutError, CdpError) as e:
+                log.debug("memory sample of %s failed: %s", display.name, e)
+                continue
+            label = display.label(view)
+            sample = MemorySample(
+                ts=time.time(), js_heap_mb=page.get("HeapUsed", 0.0) / 2**20, rss_mb=rss_mb
+            )
+            if display.primary:
+                self.facts["browser.js_heap_mb"] = round(sample.js_heap_mb, 1)
+            self.metrics.set(f"browser.js_heap_mb.{label}", round(sample.js_heap_mb, 1))
+            self.metrics.set(f"browser.dom_nodes.{label}", int(page.get("Nodes", 0)))
+            reason = self._memwatch.record(label, sample)
+            if reason == "heap":
+                log.warning(
+                    "view %s over JS heap limit (%.0f MB); reload scheduled",
+                    label,
+                    sample.js_heap_mb,
+                )
+            elif reason == "rss":
+                log.warning(
+                    "browser over RSS limit (%.0f MB); refreshing the visible page once", rss_mb
+                )
+
+    def get_metrics(self) -> str:
+        # D-Bus handlers are synchronous, so browser CPU and disk figures come from
+        # _proc_loop's last sample; proc.sampled_ts says when that was.
+        for view, stats in self._chromium.network_stats.items():
+            self.metrics.set(f"network.{view}.requests", stats.requests)
+            self.metrics.set(f"network.{view}.bytes", stats.bytes)
+            self.metrics.set(f"network.{view}.blocked", stats.blocked)
+        if self._loop_monitor:
+            for name, value in self._loop_monitor.stats().items():
+                self.metrics.set(f"loop.lag_{name}", round(value, 1))
+            self.metrics.set("loop.stalls", self._loop_monitor.stalls)
+        self.metrics.set("log.suppressed", logs.suppressed())
+        return self.metrics.to_json()
+
+    def dump_log(self, limit: int) -> str:
+        """Recent log records from memory as a JSON array (all kept records if ``limit`` <= 0)."""
+
+        return json.dumps(logs.recent(limit), default=str)
+
+    def _publish_state(self) -> None:
+        # Signal the overlay only on change so idle kiosks stay quiet on the bus.
+        state = self.get_state()
+        if state == self._published:
+            return
+        self._published = state
+        if self._iface:
+            self._iface.StateChanged(*state)
+
+    def request_reload(self) -> None:
+        self._reload_requested = True
+        self._wakeup.set()
+
+    async def reload(self) -> None:
+        """Re-read the config file and apply what changed; errors keep the old config."""
+
+        self._reload_requested = False
+        if not self.config_path:
+            return
+        try:
+            new = await asyncio.to_thread(load, self.config_path)
+        except (ConfigError, OSError, ValueError) as e:
+            log.error("config reload failed, keeping current config: %s", e)
+            return
+        await self.apply_config(new)
+
+    async def apply_config(self, new: KioskConfig) -> None:
+        """Apply a new config without restarting Chromium."""
+
+        d = diff(self.cfg, new)
+        if not d:
+            return
+        # Plugins first: a section that fails to build or start keeps its old
+        # config and plugin, and the rest of the reload still applies.
+        plugins = dict(new.plugins)
+        for name in sorted(d.plugins):
+            if await self._replace_plugin(name, self.cfg.plugins, new.plugins):
+                continue
+            if name in self.cfg.plugins:
+                plugins[name] = self.cfg.plugins[name]
+            else:
+                plugins.pop(name, None)
+        if plugins != new.plugins:
+            new = replace(new, plugins=plugins)
+        old, self.cfg = self.cfg, new
+        log.info("config changed: %s", ", ".join(sorted(d.sections | d.plugins)))
+
+        for section in sorted(d.sections & {"chromium", "http", "state", "event_loop"}):
+            log.warning("%s settings changed; they take effect on the next restart", section)
+
+        if d.sections & {"views", "playlist", "schedules"}:
+            self._views = dict(new.views)
+            self._schedules = ScheduleIndex(new.schedules)
+            active = self._schedules.at(time.time())
+            self._schedule, self._schedule_until = active.schedule, active.until
+            self.facts["schedule.active"] = active.schedule.name if active.schedule else None
+        if d.sections & {"playlist", "schedules", "screen"}:
+            self._main.reconfigure(primary_display(new), self._schedule)
+        if d.sections & {"schedules", "displays"}:
+            await self._apply_displays(new.displays)
+        if d.sections & {"views", "displays"}:
+            for display in self._all_displays():
+                if display.state.manual_view not in self._views:
+                    display.set_auto()
+                cur = display.current_view
+                if cur is not None and old.views.get(cur) != new.views.get(cur):
+                    # Force navigation on the next tick.
+                    display.current_view = None
+
+        if "policy" in d.sections:
+            self._policy_cfg = new.policy
+
+        if "logging" in d.sections:
+            logs.set_level(new.logging.level)
+            if replace(old.logging, level=new.logging.level) != new.logging:
+                log.warning("logging settings changed; only the level applies before a restart")
+
+        if "screen" in d.sections:
+            await self._main.set_screen(self._main.screen_on)
+
+        if "poweroff_command" in d.sections:
+            self._power_cfg = PowerConfig(
+                poweroff_command=normalize_poweroff_command(new.poweroff_command)
+            )
+
+        self._wakeup.set()
+
+    async def _replace_plugin(
+        self, name: str, old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]
+    ) -> bool:
+        try:
+            plugin = build_plugin(name, new.get(name, {}))
+        except Exception as e:
+            log.error("plugins.%s: %s; keeping the current plugin", name, e)
+            return False
+        return await self._pm.replace(
+            name, plugin, self._ctx, fallback=lambda: build_plugin(name, old.get(name, {}))
+        )
+
+    def _watch_config(self) -> None:
+        assert self.config_path
+        loop = asyncio.get_running_loop()
+        with suppress(NotImplementedError, RuntimeError):
+            loop.add_signal_handler(signal.SIGHUP, self.request_reload)
+        if not self.watch_config:
+            return
+
+        path = Path(self.config_path).resolve()
+        try:
+            self._inotify = Inotify()
+            # Watch the directory: editors replace the file rather than write in place.
+            self._inotify.add_watch(path.parent, IN_CLOSE_WRITE | IN_MOVED_TO)
+        except InotifyError as e:
+            log.warning("config file watching disabled: %s", e)
+            self._inotify = None
+            return
+
+        def on_event() -> None:
+            assert self._inotify
+            if any(name == path.name for _wd, _mask, name in self._inotify.read_events()):
+                self.request_reload()
+
+        loop.add_reader(self._inotify.fileno(), on_event)
+
     async def start(self) -> None:
-        ctx = PluginContext(self.facts)
+        if self._loop_monitor:
+            self._loop_monitor.start()
+        # Before plugins connect, so the first tick already shows the right view.
+        if self._state_store:
+            await self._restore_state()
+        self._ctx.http = create_session(self.cfg.http)
         await self._chromium.start()
-        await self._pm.start_all(ctx)
+        await self._apply_displays(self.cfg.displays)
+        if self._preview:
+            try:
+                await self._preview.start()
+            except OSError as e:
+                log.error("preview server disabled: %s", e)
+                self._preview = None
+        await self._pm.start_all(self._ctx)
+        if self.config_path:
+            self._watch_config()
+        if self.cfg.chromium.memory_watchdog.enabled:
+            self._tasks.append(asyncio.create_task(self._memory_loop()))
+        if self.cfg.chromium.liveness.enabled:
+            self._tasks.append(asyncio.create_task(self._liveness_loop()))
+        if self._chromium.profile_sync:
+            self._tasks.append(asyncio.create_task(self._profile_sync_loop()))
+        if self._state_store:
+            self._tasks.append(asyncio.create_task(self._state_loop()))
+        self._tasks.append(asyncio.create_task(self._proc_loop()))
 
         cb = Callbacks(
             set_view=self.set_view,
@@ -145,15 +728,42 @@ class Controller:
             wake=self.wake,
             sleep=self.sleep,
             power_off=self.power_off,
+            get_state=self.get_state,
+            get_views=self.get_views,
+            get_metrics=self.get_metrics,
+            dump_log=self.dump_log,
+            set_display_view=self.set_display_view,
+            get_displays=self.get_displays,
         )
-        iface = KioskInterface(cb)
-        self._bus = await serve(iface)
+        self._iface = KioskInterface(cb)
+        self._bus = await serve(self._iface)
 
     async def stop(self) -> None:
+        self._notifier.notify("STOPPING=1")
+        for display in self._all_displays():
+            await display.stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._state_store:
+            await self._save_state(time.time(), force=True)
+        if self._inotify:
+            asyncio.get_running_loop().remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
         await self._pm.stop_all()
-        self._chromium.terminate()
+        if self._ctx.http:
+            await self._ctx.http.close()
+            self._ctx.http = None
+        if self._preview:
+            await self._preview.stop()
+        await self._chromium.close()
         if self._bus:
             self._bus.disconnect()
+        if self._loop_monitor:
+            await self._loop_monitor.stop()
+        self._notifier.close()
 
     async def run(self) -> None:
         await self.start()
@@ -167,49 +777,128 @@ class Controller:
         self.state.last_switch_ts = time.time()
 
         while True:
+            if self._reload_requested:
+                await self.reload()
             now = time.time()
+            self._update_schedule(now)
+            self._main.skip_ineligible(now, self.facts)
 
             # Keep a derived alert fact available to plugins.
             self.facts["nightscout.alert"] = derive_alert(self.facts, self._policy_cfg)
 
             inhibit, _reasons = self._pm.screensaver_inhibit(self.facts)
-            decision = evaluate(
-                cfg=self._policy_cfg,
-                state=self.state,
-                facts=self.facts,
-                views=self._views,
-                playlist=self._playlist,
-                screensaver_inhibit=inhibit,
-                now=now,
-            )
+            decision = self._decide(self._main, now, inhibit)
+            self._log_decision(decision)
+            await self._apply(decision, now)
+            for display in self._displays:
+                await self._tick_display(display, now, inhibit)
+            self._publish_state()
+            self._notify_systemd()
+            # Wake exactly at the next schedule boundary if it comes before the tick.
+            await self._wait_tick(min(0.25, max(0.0, self._schedule_until - time.time())))
+
+    async def _apply_displays(self, configs: list[DisplayConfig]) -> None:
+        """Open, move, reconfigure or close windows so they match ``configs``."""
+
+        current = {d.name: d for d in self._displays}
+        displays = []
+        for dcfg in configs:
+            assert dcfg.window is not None
+            display = current.pop(dcfg.name, None)
+            if display is None:
+                display = self._display(dcfg, await self._chromium.open_window(dcfg.window))
+            else:
+                if dcfg.window != display.cfg.window:
+                    await display.window.place(dcfg.window)
+                display.reconfigure(dcfg, self._schedule)
+            displays.append(display)
+        for display in current.values():
+            await display.stop()
+            await display.window.close()
+        self._displays = displays
+
+    def _decide(self, display: Display, now: float, inhibit: bool) -> Decision:
+        decision = evaluate(
+            cfg=self._policy_cfg,
+            state=display.state,
+            facts=self.facts,
+            views=self._views,
+            playlist=display.playlist,
+            screensaver_inhibit=inhibit,
+            now=now,
+        )
+        decision = self._screen_off_override(decision)
+        display.why = decision.why
+        return decision
 
-            if self._forced_sleep and not self.facts.get("nightscout.alert"):
-                decision = Decision(screen_on=False, view=decision.view, why="forced_sleep")
+    async def _tick_display(self, display: Display, now: float, inhibit: bool) -> None:
+        display.skip_ineligible(now, self.facts)
+        decision = self._decide(display, now, inhibit)
+        try:
+            await display.apply(decision, now, self._views, self.facts)
+        except CdpError as e:
+            # Retried on the next tick; one broken window must not hold up the others.
+            log.warning("display %s: %s", display.name, e)
+            display.current_view = None
+
+    def _log_decision(self, decision: Decision) -> None:
+        if decision == self._last_decision:
+            return
+        self._last_decision = decision
+        # Later records (plugin warnings, reconnects) carry the decision they happened under.
+        logs.set_context(view=decision.view, why=decision.why)
+        log.info(
+            "decision: %s, screen %s (%s)",
+            decision.view,
+            "on" if decision.screen_on else "off",
+            decision.why,
+            extra={"screen_on": decision.screen_on},
+        )
 
-            await self._apply(decision, now)
-            await asyncio.sleep(0.25)
+    def _notify_systemd(self) -> None:
+        if not self._notifier.enabled:
+            return
+        main = self._main
+        if not self._ready and (main.current_view is not None or not main.screen_on):
+            # Also ready when the first page failed to load: it is retried (or a
+            # snapshot shown), and a start timeout would only restart us into the same state.
+            self._ready = True
+            error = self._chromium.navigation_error
+            status = f"showing {main.current_view or 'nothing (screen off)'}"
+            self._notifier.notify("READY=1", f"STATUS={status}" + (f" ({error})" if error else ""))
+
+        interval = self._notifier.watchdog_seconds
+        now = time.monotonic()
+        if interval is None or now - self._last_watchdog < interval / 4:
+            return
+        # Reaching this line proves the loop turns; the monitor also vetoes a
+        # loop that keeps running late. Missing pings let systemd restart us.
+        if self._loop_monitor and not self._loop_monitor.healthy():
+            return
+        self._last_watchdog = now
+        self._notifier.notify("WATCHDOG=1")
+
+    def _screen_off_override(self, decision: Decision) -> Decision:
+        """Forced sleep and screen-off schedules win over the policy, but not over an alert."""
+
+        if self.facts.get("nightscout.alert"):
+            return decision
+        if self._forced_sleep:
+            return Decision(screen_on=False, view=decision.view, why="forced_sleep")
+        if self._schedule and self._schedule.screen_off:
+            return Decision(
+                screen_on=False, view=decision.view, why=f"schedule:{self._schedule.name}"
+            )
+        return decision
+
+    async def _wait_tick(self, timeout: float) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        self._wakeup.clear()
 
     async def _apply(self, decision: Decision, now: float) -> None:
-        # Screen power.
-        if decision.screen_on != self._screen_on:
-            self._screen_on = decision.screen_on
-            if decision.screen_on:
-                self._backlight.set_brightness(int(self.cfg["screen"]["brightness_on"]))
-                self._backlight.set_power(True)
-            else:
-                self._backlight.set_brightness(int(self.cfg["screen"]["brightness_dim"]))
-                self._backlight.set_power(False)
-
-        # Playlist cycling when in auto mode.
-        manual_active = self.state.manual_view is not None and now < self.state.manual_until_ts
-        alert = bool(self.facts.get("nightscout.alert"))
-        if self._screen_on and not manual_active and not alert:
-            seconds = int(self._playlist[self.state.playlist_index]["seconds"])
-            if (now - self.state.last_switch_ts) >= seconds:
-                self.state.playlist_index = (self.state.playlist_index + 1) % len(self._playlist)
-                self.state.last_switch_ts = now
-
-        # Navigate only if screen is on.
-        if self._screen_on and decision.view != self._current_view:
-            self._current_view = decision.view
-            await self._chromium.navigate(self._views[decision.view])
+        if decision.screen_on != self._main.screen_on:
+            # Plugins slow their polling while nobody can see the data.
+            self.facts["screen.on"] = decision.screen_on
+            await self._sample_browser_cpu("awake" if decision.screen_on else "asleep")
+        await self._main.apply(decision, now, self._views, self.facts)
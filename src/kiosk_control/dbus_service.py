@@ -4,7 +4,8 @@ from collections.abc import Callable
 from dataclasses import dataclass
 
 from dbus_next.aio import MessageBus
-from dbus_next.service import ServiceInterface, method
+from dbus_next.errors import DBusError
+from dbus_next.service import ServiceInterface, method, signal
 
 # dbus-next uses signature strings ("s", "b") in annotations.
 # Ruff tries to treat these as Python types.
@@ -23,6 +24,37 @@ class Callbacks:
     wake: Callable[[str], None]
     sleep: Callable[[str], None]
     power_off: Callable[[str], bool]
+    # (view, screen_on, manual, why)
+    get_state: Callable[[], tuple[str, bool, bool, str]]
+    get_views: Callable[[], list[str]]
+    # JSON object of metric name -> value
+    get_metrics: Callable[[], str]
+    # JSON array of recent log records (limit; <= 0 for all kept)
+    dump_log: Callable[[int], str]
+    # (display, view) -> False for an unknown display or view; "" returns it to its playlist
+    set_display_view: Callable[[str, str], bool]
+    # (display, view, screen_on, manual, why) per output, the primary ("main") first
+    get_displays: Callable[[], list[tuple[str, str, bool, bool, str]]]
+
+
+def dispatch_action(cb: Callbacks, action: str, arg: str, reason: str) -> bool:
+    """Run one overlay command (SetView, SetAuto, Next, Prev) followed by a wake.
+
+    Returns False for unknown actions so callers can surface an error.
+    """
+
+    if action == "SetView":
+        cb.set_view(arg)
+    elif action == "SetAuto":
+        cb.set_auto()
+    elif action == "Next":
+        cb.next_view()
+    elif action == "Prev":
+        cb.prev_view()
+    else:
+        return False
+    cb.wake(reason)
+    return True
 
 
 class KioskInterface(ServiceInterface):
@@ -64,9 +96,43 @@ class KioskInterface(ServiceInterface):
     def PowerOff(self, reason: "s") -> "b":  # noqa: N802
         return bool(self._cb.power_off(reason))
 
+    @method()
+    def Act(self, action: "s", arg: "s", reason: "s") -> "b":  # noqa: N802
+        if not dispatch_action(self._cb, action, arg, reason):
+            raise DBusError("org.freedesktop.DBus.Error.InvalidArgs", f"unknown action: {action}")
+        return True
+
+    @method()
+    def GetState(self) -> "sbbs":  # noqa: N802
+        return list(self._cb.get_state())
+
+    @method()
+    def GetViews(self) -> "as":  # noqa: N802
+        return list(self._cb.get_views())
+
+    @method()
+    def GetMetrics(self) -> "s":  # noqa: N802
+        return self._cb.get_metrics()
+
+    @method()
+    def SetDisplayView(self, display: "s", view: "s") -> "b":  # noqa: N802
+        return bool(self._cb.set_display_view(display, view))
+
+    @method()
+    def GetDisplays(self) -> "a(ssbbs)":  # noqa: N802
+        return [list(d) for d in self._cb.get_displays()]
+
+    @method()
+    def DumpLog(self, limit: "i") -> "s":  # noqa: N802
+        return self._cb.dump_log(limit)
+
+    @signal()
+    def StateChanged(self, view: "s", screen_on: "b", manual: "b", why: "s") -> "sbbs":  # noqa: N802
+        return [view, screen_on, manual, why]
+
 
-async def serve(iface: KioskInterface) -> MessageBus:
-    bus = await MessageBus().connect()
+async def serve(iface: KioskInterface, bus_address: str | None = None) -> MessageBus:
+    bus = await MessageBus(bus_address=bus_address).connect()
     bus.export(OBJ_PATH, iface)
     await bus.request_name(BUS_NAME)
     return bus
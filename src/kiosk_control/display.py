@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from kiosk_control.cdp import CdpError, ChromiumKiosk, RequestPolicy
+from kiosk_control.config import PRIMARY_DISPLAY, ChromiumConfig, DisplayConfig, ViewConfig
+from kiosk_control.memory_watchdog import MemoryWatchdog
+from kiosk_control.metrics import Metrics
+from kiosk_control.policy import Decision, RuntimeState, item_eligible, step_playlist
+from kiosk_control.schedule import ScheduleConfig
+from kiosk_control.snapshots import SnapshotCache
+from kiosk_control.system.backlight import Backlight
+
+log = logging.getLogger(__name__)
+
+
+class Display:
+    """One output of the shared browser: a window with its own playlist and screen power.
+
+    The controller runs the primary output and every entry of ``displays:``
+    through this class, so schedule playlists, soft navigation, memory watchdog
+    refreshes and offline snapshots behave the same on each. Facts, plugins and
+    the policy are shared; liveness checks and the preview stream cover the
+    primary display only.
+    """
+
+    def __init__(
+        self,
+        cfg: DisplayConfig,
+        window: ChromiumKiosk,
+        metrics: Metrics,
+        chromium: ChromiumConfig,
+        memwatch: MemoryWatchdog,
+        snapshots: SnapshotCache | None = None,
+        schedule: ScheduleConfig | None = None,
+    ):
+        self.cfg = cfg
+        self.name = cfg.name
+        self.primary = cfg.name == PRIMARY_DISPLAY
+        self.window = window
+        self.schedule = schedule
+        self.playlist = self._playlist_for(cfg, schedule)
+        self.state = RuntimeState()
+        # The first item gets its full time.
+        self.state.last_switch_ts = time.time()
+        self.current_view: str | None = None
+        self.screen_on = True
+        self.why = ""
+        self._metrics = metrics
+        self._chromium = chromium
+        self._memwatch = memwatch
+        self._snapshots = snapshots
+        self._backlight = (
+            Backlight(Path(cfg.screen.backlight_sysfs)) if cfg.screen.backlight_sysfs else None
+        )
+        self._power_task: asyncio.Task | None = None
+        self._capture_at: float | None = None
+        self._capture_task: asyncio.Task | None = None
+        # Set while a snapshot replaces the current view; time of the next live retry.
+        self.offline_retry_at: float | None = None
+
+    def _playlist_for(self, cfg: DisplayConfig, schedule: ScheduleConfig | None) -> list[Any]:
+        if schedule is not None:
+            playlist = schedule.playlist if self.primary else schedule.displays.get(self.name)
+            if playlist:
+                return list(playlist)
+        return list(cfg.playlist)
+
+    def key(self, name: str) -> str:
+        """Metric name for this display; the primary display keeps the plain names."""
+
+        return name if self.primary else f"display.{self.name}.{name}"
+
+    def label(self, view: str) -> str:
+        """Memory watchdog and snapshot key: the same view differs per window."""
+
+        return view if self.primary else f"{self.name}.{view}"
+
+    def reconfigure(self, cfg: DisplayConfig, schedule: ScheduleConfig | None) -> None:
+        """Take a reloaded config (the window is moved by the caller)."""
+
+        self.cfg = cfg
+        self.schedule = schedule
+        playlist = self._playlist_for(cfg, schedule)
+        if playlist != self.playlist:
+            self.playlist = playlist
+            self.state.playlist_index %= len(playlist)
+            self.state.last_switch_ts = time.time()
+        self._backlight = (
+            Backlight(Path(cfg.screen.backlight_sysfs)) if cfg.screen.backlight_sysfs else None
+        )
+
+    def set_schedule(self, schedule: ScheduleConfig | None, now: float) -> None:
+        """Switch playlists at a schedule boundary, starting from the first item."""
+
+        self.schedule = schedule
+        self.playlist = self._playlist_for(self.cfg, schedule)
+        self.state.playlist_index = 0
+        self.state.last_switch_ts = now
+
+    def manual_active(self, now: float) -> bool:
+        return self.state.manual_view is not None and now < self.state.manual_until_ts
+
+    def get_state(self, now: float) -> tuple[str, bool, bool, str]:
+        return (self.current_view or "", self.screen_on, self.manual_active(now), self.why)
+
+    def set_view(self, view: str, until: float) -> None:
+        self.state.manual_view = view
+        self.state.manual_until_ts = until
+
+    def set_auto(self) -> None:
+        self.state.manual_view = None
+        self.state.manual_until_ts = 0.0
+
+    def step(self, step: int, facts: dict[str, Any]) -> bool:
+        """Move to the next item whose condition holds, counting the items skipped.
+
+        Stays put (and returns False) when no other item is eligible.
+        """
+
+        idx, skipped = step_playlist(self.playlist, self.state.playlist_index, step, facts)
+        if idx is None:
+            return False
+        for view in skipped:
+            self._metrics.inc(self.key(f"playlist.skipped.{view}"))
+        self.state.playlist_index = idx
+        return True
+
+    def skip_ineligible(self, now: float, facts: dict[str, Any]) -> None:
+        # Checked before evaluate() so an item whose condition no longer holds
+        # is never navigated to.
+        idx = self.state.playlist_index
+        if not item_eligible(self.playlist[idx], facts) and self.step(1, facts):
+            self._metrics.inc(self.key(f"playlist.skipped.{self.playlist[idx].view}"))
+            self.state.last_switch_ts = now
+
+    async def set_screen(self, on: bool) -> None:
+        self.screen_on = on
+        screen = self.cfg.screen
+        if self._backlight:
+            brightness = screen.brightness_on if on else screen.brightness_dim
+            # Backlight drivers can stall sysfs writes (I2C, DSI); keep them off the loop.
+            await asyncio.to_thread(_write_backlight, self._backlight, on, brightness)
+        cmd = self.cfg.power_on_command if on else self.cfg.power_off_command
+        if cmd:
+            # Output switching can take seconds; run it beside the tick, after
+            # any earlier command so on and off arrive in order.
+            self._power_task = asyncio.create_task(_run_after(self._power_task, cmd))
+
+    async def apply(
+        self, decision: Decision, now: float, views: dict[str, ViewConfig], facts: dict[str, Any]
+    ) -> None:
+        """Screen power, playlist cycling and navigation for one tick's decision."""
+
+        # The page is frozen (or blanked) while the screen is off.
+        if decision.screen_on != self.screen_on:
+            await self.set_screen(decision.screen_on)
+            if decision.screen_on:
+                if await self.window.resume():
+                    self.current_view = None
+            else:
+                # Leaky pages are reloaded while nobody is looking.
+                cur = self.current_view
+                if cur is not None and self._memwatch.pending(self.label(cur)):
+                    await self._refresh_page(views[cur].url)
+                    self._memwatch.refreshed(self.label(cur))
+                await self.window.suspend()
+
+        # Playlist cycling when in auto mode.
+        alert = bool(facts.get("nightscout.alert"))
+        if self.screen_on and not self.manual_active(now) and not alert:
+            seconds = self.playlist[self.state.playlist_index].seconds
+            if (now - self.state.last_switch_ts) >= seconds:
+                self.step(1, facts)
+                self.state.last_switch_ts = now
+
+        # Navigate only if screen is on.
+        if self.screen_on and decision.view != self.current_view:
+            previous, self.current_view = self.current_view, decision.view
+            view = views[decision.view]
+            await self.window.prepare_view(
+                decision.view,
+                RequestPolicy(view.block_urls, view.block_resource_types, view.traffic_stats),
+            )
+            if previous is not None and self._memwatch.pending(self.label(previous)):
+                # Use the switch to replace the leaky document instead of routing within it.
+                await self._refresh_page(view.url)
+                self._memwatch.refreshed(self.label(previous))
+                soft = False
+            else:
+                soft = await self.window.navigate(view.url, soft=view.spa)
+            self._metrics.inc(self.key("navigations.soft" if soft else "navigations.full"))
+            if not soft:
+                # A full navigation discards the old document and its heap.
+                if previous is not None:
+                    self._memwatch.clear(self.label(previous))
+                self._memwatch.clear(self.label(decision.view))
+            await self._after_navigation(decision.view, now, facts)
+
+        await self._snapshot_tick(now, views, facts)
+
+    async def _refresh_page(self, url: str) -> None:
+        """Load ``url`` into a fresh document (or renderer, with action=recycle)."""
+
+        if self._chromium.memory_watchdog.action == "recycle":
+            await self.window.recycle(url, self.cfg.window)
+            self._metrics.inc(self.key("browser.recycles"))
+        else:
+            await self.window.navigate(url)
+            self._metrics.inc(self.key("browser.reloads"))
+
+    def _offline_fact(self) -> str:
+        return "browser.offline" if self.primary else f"browser.offline.{self.name}"
+
+    async def _after_navigation(self, view: str, now: float, facts: dict[str, Any]) -> None:
+        """Schedule a snapshot of a good page, or fall back to the last one on failure."""
+
+        if not self._snapshots:
+            return
+        snap = self._chromium.snapshots
+        error = self.window.navigation_error
+        if error is None:
+            self.offline_retry_at = None
+            facts[self._offline_fact()] = False
+            self._capture_at = now + snap.capture_after_seconds
+            return
+        self._capture_at = None
+        self.offline_retry_at = now + snap.retry_seconds
+        facts[self._offline_fact()] = True
+        path = self._snapshots.get(self.label(view))
+        if path is None:
+            log.warning("view %s failed to load (%s); no snapshot available", view, error)
+            return
+        log.warning("view %s failed to load (%s); showing last snapshot", view, error)
+        await self.window.show_file(path)
+        self._metrics.inc(self.key("snapshots.served"))
+
+    async def _snapshot_tick(
+        self, now: float, views: dict[str, ViewConfig], facts: dict[str, Any]
+    ) -> None:
+        view = self.current_view
+        if not self._snapshots or not self.screen_on or view is None:
+            return
+        if self.offline_retry_at is not None:
+            if now >= self.offline_retry_at:
+                await self.window.navigate(views[view].url)
+                await self._after_navigation(view, now, facts)
+            return
+        if self._capture_at is None or now < self._capture_at:
+            return
+        if self._capture_task and not self._capture_task.done():
+            return
+        self._capture_at = now + self._chromium.snapshots.capture_interval_seconds
+        self._capture_task = asyncio.create_task(self._capture_snapshot(view))
+
+    async def _capture_snapshot(self, view: str) -> None:
+        assert self._snapshots
+        try:
+            data = await asyncio.wait_for(
+                self.window.capture_screenshot(self._chromium.snapshots.quality), 10.0
+            )
+        except (TimeoutError, CdpError) as e:
+            log.debug("snapshot of %s failed: %s", view, e)
+            return
+        if view != self.current_view or self.offline_retry_at is not None:
+            return
+        try:
+            # Decoding and writing happen in a worker thread, never on the loop.
+            await asyncio.to_thread(self._snapshots.store, self.label(view), data, time.time())
+        except OSError as e:
+            log.warning("could not store snapshot of %s: %s", view, e)
+            return
+        self._metrics.inc(self.key("snapshots.captured"))
+        self._metrics.set("snapshots.bytes", self._snapshots.total_bytes)
+
+    async def stop(self) -> None:
+        """Cancel a snapshot capture and let a running power command finish."""
+
+        if self._capture_task:
+            self._capture_task.cancel()
+            await asyncio.gather(self._capture_task, return_exceptions=True)
+        if self._power_task:
+            await asyncio.wait({self._power_task})
+
+
+def _write_backlight(backlight: Backlight, on: bool, brightness: int) -> None:
+    backlight.set_brightness(brightness)
+    backlight.set_power(on)
+
+
+async def _run_after(previous: asyncio.Task | None, cmd: tuple[str, ...]) -> None:
+    if previous is not None:
+        await asyncio.wait({previous})
+    await _run(cmd)
+
+
+async def _run(cmd: tuple[str, ...], timeout_seconds: float = 10.0) -> None:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+    except OSError as e:
+        log.warning("display power command %s failed: %s", cmd[0], e)
+        return
+    try:
+        code = await asyncio.wait_for(proc.wait(), timeout_seconds)
+    except TimeoutError:
+        proc.kill()
+        log.warning("display power command %s timed out", cmd[0])
+        return
+    if code:
+        log.warning("display power command %s exited with %d", cmd[0], code)
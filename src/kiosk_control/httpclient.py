@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import ssl
+from functools import lru_cache
+
+import aiohttp
+
+from kiosk_control.config import HttpConfig
+
+
+@lru_cache(maxsize=1)
+def shared_ssl_context() -> ssl.SSLContext:
+    """One verified client context for the process.
+
+    Building a context loads the CA bundle (tens of milliseconds and ~1 MB on a
+    Pi), so every connection and plugin shares this one.
+    """
+
+    return ssl.create_default_context()
+
+
+def create_session(
+    cfg: HttpConfig | None = None, ssl_context: ssl.SSLContext | None = None
+) -> aiohttp.ClientSession:
+    """The controller's shared session; must be created inside the running loop.
+
+    Connections are kept alive and pooled per host, and DNS answers are cached,
+    so a plugin reconnecting after a network blip usually skips both the lookup
+    and the TCP/TLS handshake.
+    """
+
+    cfg = cfg or HttpConfig()
+    connector = aiohttp.TCPConnector(
+        limit=cfg.limit,
+        limit_per_host=cfg.limit_per_host,
+        ttl_dns_cache=cfg.dns_ttl_seconds,
+        use_dns_cache=True,
+        keepalive_timeout=cfg.keepalive_seconds,
+        ssl=ssl_context or shared_ssl_context(),
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=None, sock_connect=cfg.connect_timeout_seconds, sock_read=None
+        ),
+        headers={"User-Agent": "kiosk-control"},
+    )
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from kiosk_control.config import LivenessConfig
+
+
+class LivenessChecker:
+    """Decide from heartbeat and frame-hash samples whether the visible page is stuck.
+
+    The controller samples at ``interval``. Healthy samples double the interval up
+    to ``max_interval_seconds``; anything suspicious drops it back to the minimum so
+    a stall is confirmed quickly. A hung page costs one extra evaluate per
+    interval, a healthy one a few calls per couple of minutes.
+    """
+
+    def __init__(self, cfg: LivenessConfig):
+        self._cfg = cfg
+        self.view: str | None = None
+        self.interval = cfg.min_interval_seconds
+        self._failures = 0
+        self._frame: str | None = None
+        self._changed_at = 0.0
+
+    def reset(self, view: str | None, now: float) -> None:
+        self.view = view
+        self.interval = self._cfg.min_interval_seconds
+        self._failures = 0
+        self._frame = None
+        self._changed_at = now
+
+    def observe(self, now: float, heartbeat_ok: bool, frame: str | None = None) -> str | None:
+        """Record one sample; returns "hung" or "frozen" when the view must be reloaded.
+
+        ``frame`` is a hash of a low-resolution screenshot, only for views that
+        should change; None skips the frozen-render check.
+        """
+
+        suspicious = False
+        if heartbeat_ok:
+            self._failures = 0
+        else:
+            self._failures += 1
+            suspicious = True
+            if self._failures >= self._cfg.heartbeat_failures:
+                return "hung"
+
+        if frame is not None:
+            if frame != self._frame:
+                self._frame = frame
+                self._changed_at = now
+            elif now - self._changed_at >= self._cfg.stall_seconds:
+                return "frozen"
+            elif now - self._changed_at >= self._cfg.stall_seconds / 2:
+                suspicious = True
+
+        if suspicious:
+            self.interval = self._cfg.min_interval_seconds
+        else:
+            self.interval = min(self.interval * 2, self._cfg.max_interval_seconds)
+        return None
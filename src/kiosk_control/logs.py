@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import IO, Any
+
+from kiosk_control.config import LoggingConfig
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=``
+# or the shared context.
+_STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+_context: dict[str, Any] = {}
+_active: LogSetup | None = None
+
+
+def set_context(**fields: Any) -> None:
+    """Attach ``fields`` (e.g. the current view and decision ``why``) to later records."""
+
+    _context.update(fields)
+
+
+def record_fields(record: logging.LogRecord) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "ts": round(record.created, 3),
+        "level": record.levelname,
+        "logger": record.name,
+        "msg": record.getMessage(),
+    }
+    for key, value in vars(record).items():
+        if key not in _STANDARD and not key.startswith("_"):
+            out[key] = value
+    if record.exc_text:
+        out["exc"] = record.exc_text
+    return out
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context and extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record_fields(record), default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Classic single-line format, with context and extras appended as ``key=value``."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:  # noqa: N802
+        line = super().formatMessage(record)
+        extras = [f"{k}={v}" for k, v in vars(record).items() if k not in _STANDARD and k[0] != "_"]
+        return f"{line} ({' '.join(extras)})" if extras else line
+
+
+class RateLimitFilter(logging.Filter):
+    """Pass at most ``burst`` records per message key per ``window`` seconds.
+
+    The key is the logger name plus the unformatted message, so a reconnect
+    storm logging one template with changing arguments counts as one key. The
+    first record of a key's next window carries ``suppressed=<n>``.
+    """
+
+    def __init__(
+        self, burst: int, window: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        super().__init__()
+        self._burst = burst
+        self._window = window
+        self._clock = clock
+        # key -> [window start, records seen, records dropped]
+        self._keys: dict[tuple[str, str], list[Any]] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry is None or now - entry[0] >= self._window:
+                if entry is not None and entry[2]:
+                    record.suppressed = entry[2]
+                if entry is None and len(self._keys) >= 1024:
+                    self._prune(now)
+                self._keys[key] = [now, 1, 0]
+                return True
+            entry[1] += 1
+            if entry[1] <= self._burst:
+                return True
+            entry[2] += 1
+            self.suppressed += 1
+            return False
+
+    def _prune(self, now: float) -> None:
+        # Keys with drops are kept so their count is still reported.
+        for key, (start, _seen, dropped) in list(self._keys.items()):
+            if now - start >= self._window and not dropped:
+                del self._keys[key]
+
+
+class RingBuffer(logging.Handler):
+    """The most recent records as plain dicts, kept in memory only."""
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self._records: deque[dict[str, Any]] = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._records.append(record_fields(record))
+
+    def recent(self, limit: int = 0) -> list[dict[str, Any]]:
+        records = list(self._records)
+        return records[-limit:] if limit > 0 else records
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format the message in the caller's thread (its arguments may change
+        # later) but keep the traceback apart so JSON output can carry it as a field.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in _context.items():
+            record.__dict__.setdefault(key, value)
+        return record
+
+
+@dataclass
+class LogSetup:
+    handler: _QueueHandler
+    listener: logging.handlers.QueueListener
+    ring: RingBuffer
+    limiter: RateLimitFilter
+    previous_level: int = logging.WARNING
+    stopped: bool = False
+
+    def stop(self) -> None:
+        """Detach from the root logger and flush the queue."""
+
+        global _active
+        if self.stopped:
+            return
+        self.stopped = True
+        root = logging.getLogger()
+        root.removeHandler(self.handler)
+        root.setLevel(self.previous_level)
+        self.listener.stop()
+        if _active is self:
+            _active = None
+
+
+def setup(cfg: LoggingConfig, stream: IO[str] | None = None) -> LogSetup:
+    """Route all logging through a queue to a writer thread.
+
+    Callers (the event loop included) only format the message and enqueue it;
+    writing to ``stream`` (stderr, i.e. the journal) and the ring buffer happens
+    on the listener thread. Repeated messages are rate limited before queueing.
+    """
+
+    global _active
+    out = logging.StreamHandler(stream or sys.stderr)
+    out.setFormatter(JsonFormatter() if cfg.format == "json" else TextFormatter())
+    ring = RingBuffer(cfg.ring_size)
+    limiter = RateLimitFilter(cfg.rate_limit_burst, cfg.rate_limit_window_seconds)
+
+    q: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = _QueueHandler(q)
+    handler.addFilter(limiter)
+    listener = logging.handlers.QueueListener(q, out, ring)
+    listener.start()
+
+    root = logging.getLogger()
+    _active = LogSetup(handler, listener, ring, limiter, previous_level=root.level)
+    root.setLevel(cfg.level)
+    root.addHandler(handler)
+    return _active
+
+
+def set_level(level: str) -> None:
+    logging.getLogger().setLevel(level)
+
+
+def recent(limit: int = 0) -> list[dict[str, Any]]:
+    """Recent records from the ring buffer (empty when logging was not set up)."""
+
+    return _active.ring.recent(limit) if _active else []
+
+
+def suppressed() -> int:
+    """Records dropped by rate limiting since start-up."""
+
+    return _active.limiter.suppressed if _active else 0
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+
+from kiosk_control.config import EventLoopConfig
+
+log = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measure event-loop scheduling delay and catch the loop while it is blocked.
+
+    A task sleeps ``lag_interval_seconds`` and records how late it wakes up. A
+    daemon thread watches that task: when it has not run for
+    ``lag_threshold_seconds`` the loop is stuck in synchronous code, and the
+    loop thread's current stack (the blocking call and the coroutine around it)
+    is logged once per stall.
+    """
+
+    def __init__(self, cfg: EventLoopConfig, history: int = 600):
+        self._cfg = cfg
+        self._lags: deque[float] = deque(maxlen=history)
+        # When the lag task should next wake up; later than that means the loop is late.
+        self._expected = time.monotonic()
+        self._dumped = False
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.stalls = 0
+        self.last_stack = ""
+
+    def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._expected = time.monotonic() + self._cfg.lag_interval_seconds
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._thread:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    def healthy(self) -> bool:
+        """The loop is running and its latest wakeup was on time."""
+
+        if time.monotonic() - self._expected >= self._cfg.lag_threshold_seconds:
+            return False
+        return not self._lags or self._lags[-1] < self._cfg.lag_threshold_seconds
+
+    def stats(self) -> dict[str, float]:
+        lags = sorted(self._lags)
+        if not lags:
+            return {}
+
+        def pct(p: float) -> float:
+            return lags[min(len(lags) - 1, int(p * len(lags)))] * 1000
+
+        return {"p50_ms": pct(0.5), "p99_ms": pct(0.99), "max_ms": lags[-1] * 1000}
+
+    async def _run(self) -> None:
+        interval = self._cfg.lag_interval_seconds
+        while True:
+            self._expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            self._lags.append(max(0.0, time.monotonic() - self._expected))
+            self._dumped = False
+
+    def _watch(self) -> None:
+        threshold = self._cfg.lag_threshold_seconds
+        while not self._stop.wait(threshold / 4):
+            stalled = time.monotonic() - self._expected
+            if stalled < threshold or self._dumped or self._loop_thread is None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self._dumped = True
+            self.stalls += 1
+            self.last_stack = "".join(traceback.format_stack(frame))
+            log.warning(
+                "event loop blocked for %.1fs; loop thread stack:\n%s", stalled, self.last_stack
+            )
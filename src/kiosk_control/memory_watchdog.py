@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+from kiosk_control.config import MemoryWatchdogConfig
+
+
+@dataclass(frozen=True)
+class MemorySample:
+    ts: float
+    js_heap_mb: float
+    rss_mb: float
+
+
+class MemoryWatchdog:
+    """Per-view memory time series with a pending-reload flag per view.
+
+    The controller records samples for the visible view. The JS heap belongs to
+    that page, so a view over ``heap_limit_mb`` is marked pending itself. RSS is
+    measured for the whole browser process tree and says nothing about which
+    view leaks; crossing ``rss_limit_mb`` therefore schedules a single refresh
+    of whichever page is visible and re-arms only once RSS is back under the
+    limit. Pending refreshes happen at the next moment the page is not on
+    screen (screen off, or when the playlist moves away from it).
+    """
+
+    def __init__(self, cfg: MemoryWatchdogConfig):
+        self._cfg = cfg
+        self.series: dict[str, deque[MemorySample]] = {}
+        self._pending: set[str] = set()
+        self.rss_pending = False
+        self._rss_armed = True
+
+    def record(self, view: str, sample: MemorySample) -> str | None:
+        """Store a sample; returns ``"heap"`` or ``"rss"`` when it newly schedules a refresh."""
+
+        self.series.setdefault(view, deque(maxlen=self._cfg.history)).append(sample)
+        limit = self._cfg.rss_limit_mb
+        if limit is not None and sample.rss_mb < limit and not self.rss_pending:
+            self._rss_armed = True
+        limit = self._cfg.heap_limit_mb
+        if view not in self._pending and limit is not None and sample.js_heap_mb >= limit:
+            self._pending.add(view)
+            return "heap"
+        limit = self._cfg.rss_limit_mb
+        if self._rss_armed and limit is not None and sample.rss_mb >= limit:
+            self._rss_armed = False
+            self.rss_pending = True
+            return "rss"
+        return None
+
+    def pending(self, view: str | None) -> bool:
+        return view in self._pending or (view is not None and self.rss_pending)
+
+    def clear(self, view: str | None) -> None:
+        """Forget the pending flag, e.g. after the view was freshly loaded."""
+
+        self._pending.discard(view)  # type: ignore[arg-type]
+
+    def refreshed(self, view: str | None) -> None:
+        """Record a refresh of ``view`` made for a pending flag (its own or the RSS one)."""
+
+        self.clear(view)
+        self.rss_pending = False
+
+    def latest(self, view: str) -> MemorySample | None:
+        s = self.series.get(view)
+        return s[-1] if s else None
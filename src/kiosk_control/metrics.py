@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class Metrics:
+    """Process-local gauges and counters, exported as JSON over D-Bus (``GetMetrics``)."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, Any] = {}
+
+    def set(self, name: str, value: Any) -> None:
+        self._values[name] = value
+
+    def inc(self, name: str, n: float = 1) -> None:
+        self._values[name] = self._values.get(name, 0) + n
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._values.get(name, default)
+
+    def snapshot(self) -> dict[str, Any]:
+        return dict(sorted(self._values.items()))
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), default=str)
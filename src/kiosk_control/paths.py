@@ -14,9 +14,29 @@ def default_user_data_dir(app_name: str = "kiosk-control") -> Path:
     Uses XDG_STATE_HOME when available, else ~/.local/state.
     """
 
+    return default_state_dir(app_name) / "chrome-profile"
+
+
+def default_state_dir(app_name: str = "kiosk-control") -> Path:
+    """Return a user-writable state directory (XDG_STATE_HOME, else ~/.local/state)."""
+
     base = os.environ.get("XDG_STATE_HOME")
+    root = Path(base) if base else Path.home() / ".local" / "state"
+    return root / app_name
+
+
+def default_cache_dir(app_name: str = "kiosk-control") -> Path:
+    """Return a user-writable cache directory (XDG_CACHE_HOME, else ~/.cache)."""
+
+    base = os.environ.get("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / app_name
+
+
+def default_runtime_dir(app_name: str = "kiosk-control") -> Path:
+    """Return a RAM-backed directory: XDG_RUNTIME_DIR, else a per-user /dev/shm dir."""
+
+    base = os.environ.get("XDG_RUNTIME_DIR")
     if base:
-        root = Path(base)
-    else:
-        root = Path.home() / ".local" / "state"
-    return root / app_name / "chrome-profile"
+        return Path(base) / app_name
+    return Path("/dev/shm") / f"{app_name}-{os.getuid()}"
@@ -1,16 +1,49 @@
 from __future__ import annotations
 
 import abc
-from dataclasses import dataclass
-from typing import Any
+import asyncio
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import aiohttp
 
 
 @dataclass
 class PluginContext:
     facts: dict[str, Any]
+    # Set by the controller; plugins call request_evaluate() for latency-sensitive facts.
+    wakeup: asyncio.Event | None = None
+    # Shared connection pool; plugins use it instead of opening their own sessions.
+    http: aiohttp.ClientSession | None = None
+    # Facts restored from the state file that no plugin has published since; each
+    # has a "<key>.restored" marker fact until the first live value replaces it.
+    restored: set[str] = field(default_factory=set)
 
     def set_fact(self, key: str, value: Any) -> None:
         self.facts[key] = value
+        if self.restored:
+            self._mark_live((key,))
+
+    def set_facts(self, values: Mapping[str, Any]) -> None:
+        """Publish several facts at once (one update for a burst of messages)."""
+
+        self.facts.update(values)
+        if self.restored:
+            self._mark_live(values)
+
+    def _mark_live(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            if key in self.restored:
+                self.restored.discard(key)
+                self.facts.pop(f"{key}.restored", None)
+
+    def request_evaluate(self) -> None:
+        """Ask the controller to run the policy now instead of on its next tick."""
+
+        if self.wakeup is not None:
+            self.wakeup.set()
 
 
 class Plugin(abc.ABC):
@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 from contextlib import suppress
 from dataclasses import dataclass
 from typing import Any
 
-import websockets
+import aiohttp
 
+from kiosk_control.httpclient import create_session
 from kiosk_control.plugins.base import Plugin, PluginContext
 
+log = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class HomeAssistantConfig:
@@ -20,6 +24,9 @@ class HomeAssistantConfig:
     entity_consumption_w: str
     min_surplus_w: float
     require_sun_above_horizon: bool
+    # Backoff between reconnect attempts; reset once a connection authenticates.
+    reconnect_min_seconds: float = 1.0
+    reconnect_max_seconds: float = 60.0
 
 
 def _to_float(val: Any) -> float | None:
@@ -69,55 +76,94 @@ class HomeAssistantWsPlugin(Plugin):
     async def _run(self) -> None:
         assert self._ctx
         self._ctx.set_fact("ha.connected", False)
-        async with websockets.connect(self._cfg.ws_url, ping_interval=20, ping_timeout=20) as ws:
-            # auth_required
-            raw = await ws.recv()
-            msg = json.loads(raw)
-            if msg.get("type") != "auth_required":
-                raise RuntimeError("Unexpected HA websocket handshake")
-
-            await ws.send(json.dumps({"type": "auth", "access_token": self._cfg.token}))
-
-            raw = await ws.recv()
-            msg = json.loads(raw)
-            if msg.get("type") != "auth_ok":
-                raise RuntimeError("Home Assistant auth failed")
-
-            self._ctx.set_fact("ha.connected", True)
-            self._msg_id += 1
-            await ws.send(
-                json.dumps(
-                    {"id": self._msg_id, "type": "subscribe_events", "event_type": "state_changed"}
-                )
-            )
-
+        session = self._ctx.http
+        owned = session is None
+        if session is None:
+            session = create_session()
+        delay = self._cfg.reconnect_min_seconds
+        try:
             while not self._stop.is_set():
-                raw = await ws.recv()
-                msg = json.loads(raw)
-                if msg.get("type") != "event":
-                    continue
-                ev = msg.get("event", {})
-                if ev.get("event_type") != "state_changed":
-                    continue
-
-                data = ev.get("data", {})
-                entity = data.get("entity_id")
-                new_state = (data.get("new_state") or {}).get("state")
-
-                if entity == self._cfg.entity_sun:
-                    self._ctx.set_fact("ha.sun_state", new_state)
-                elif entity == self._cfg.entity_production_w:
-                    v = _to_float(new_state)
-                    if v is not None:
-                        self._ctx.set_fact("ha.production_w", v)
-                elif entity == self._cfg.entity_consumption_w:
-                    v = _to_float(new_state)
-                    if v is not None:
-                        self._ctx.set_fact("ha.consumption_w", v)
-                else:
-                    continue
-
-                self._update_energy_good()
+                try:
+                    # The open websocket keeps one of the shared connector's
+                    # http.limit_per_host slots for its whole life; other requests
+                    # to the Home Assistant host share the remaining ones.
+                    async with session.ws_connect(self._cfg.ws_url, heartbeat=20) as ws:
+                        await self._serve(ws)
+                    reason = "closed by server"
+                except (
+                    aiohttp.ClientError,
+                    TimeoutError,
+                    RuntimeError,
+                    TypeError,
+                    ValueError,
+                ) as e:
+                    reason = str(e) or type(e).__name__
+                if self._ctx.facts.get("ha.connected"):
+                    delay = self._cfg.reconnect_min_seconds
+                self._ctx.set_fact("ha.connected", False)
+                if self._stop.is_set():
+                    break
+                log.warning("home assistant websocket: %s; retrying in %.0fs", reason, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._cfg.reconnect_max_seconds)
+        finally:
+            if owned:
+                await session.close()
+
+    async def _serve(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        assert self._ctx
+        # auth_required
+        msg = await ws.receive_json()
+        if msg.get("type") != "auth_required":
+            raise RuntimeError("Unexpected HA websocket handshake")
+
+        await ws.send_json({"type": "auth", "access_token": self._cfg.token})
+
+        msg = await ws.receive_json()
+        if msg.get("type") != "auth_ok":
+            raise RuntimeError("Home Assistant auth failed")
+
+        self._ctx.set_fact("ha.connected", True)
+        self._msg_id += 1
+        await ws.send_json(
+            {"id": self._msg_id, "type": "subscribe_events", "event_type": "state_changed"}
+        )
+
+        async for raw in ws:
+            if self._stop.is_set():
+                break
+            if raw.type == aiohttp.WSMsgType.TEXT:
+                self._handle_message(raw.data)
+
+    def _handle_message(self, text: str) -> None:
+        """Apply one websocket text frame; anything but a tracked state change is ignored."""
+
+        assert self._ctx
+        msg = json.loads(text)
+        if msg.get("type") != "event":
+            return
+        ev = msg.get("event", {})
+        if ev.get("event_type") != "state_changed":
+            return
+
+        data = ev.get("data", {})
+        entity = data.get("entity_id")
+        new_state = (data.get("new_state") or {}).get("state")
+
+        if entity == self._cfg.entity_sun:
+            self._ctx.set_fact("ha.sun_state", new_state)
+        elif entity == self._cfg.entity_production_w:
+            v = _to_float(new_state)
+            if v is not None:
+                self._ctx.set_fact("ha.production_w", v)
+        elif entity == self._cfg.entity_consumption_w:
+            v = _to_float(new_state)
+            if v is not None:
+                self._ctx.set_fact("ha.consumption_w", v)
+        else:
+            return
+
+        self._update_energy_good()
 
     def screensaver_inhibit(self, facts: dict[str, Any]) -> tuple[bool, str]:
         if facts.get("ha.energy_good"):
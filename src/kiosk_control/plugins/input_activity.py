@@ -1,56 +1,208 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import time
+from collections.abc import Callable, Iterable
 from contextlib import suppress
 from dataclasses import dataclass
 from typing import Any
 
 from kiosk_control.plugins.base import Plugin, PluginContext
+from kiosk_control.system.inotify import IN_ATTRIB, IN_CREATE, Inotify, InotifyError
+
+log = logging.getLogger(__name__)
+
+# Linux input event types/codes (linux/input-event-codes.h); kept local so the
+# classifier works without evdev installed.
+EV_KEY = 0x01
+EV_REL = 0x02
+EV_ABS = 0x03
+EV_SW = 0x05
+_BTN_MOUSE = range(0x110, 0x118)
+_BTN_DIGI = range(0x140, 0x150)  # BTN_TOOL_*, BTN_TOUCH, BTN_STYLUS
 
 
 @dataclass(frozen=True)
 class InputActivityConfig:
-    device_hint: str | None
+    device_hint: str | list[str] | None
+    min_interval_seconds: float = 1.0
+    hotplug: bool = True
+    input_dir: str = "/dev/input"
+
+    @property
+    def hints(self) -> list[str]:
+        if not self.device_hint:
+            return []
+        if isinstance(self.device_hint, str):
+            return [self.device_hint.lower()]
+        return [str(h).lower() for h in self.device_hint]
+
+
+def classify_event(etype: int, code: int) -> str | None:
+    """Map an evdev event to an activity kind, or None for sync/misc noise."""
+
+    if etype == EV_ABS:
+        return "touch"
+    if etype == EV_REL:
+        return "pointer"
+    if etype == EV_KEY:
+        if code in _BTN_DIGI:
+            return "touch"
+        if code in _BTN_MOUSE:
+            return "pointer"
+        return "key"
+    if etype == EV_SW:
+        return "switch"
+    return None
+
+
+class ActivityThrottle:
+    """Leading-edge rate limit: the first event passes, repeats within the interval do not."""
+
+    def __init__(self, min_interval_seconds: float):
+        self._interval = max(0.0, float(min_interval_seconds))
+        self._last: dict[str, float] = {}
+
+    def allow(self, key: str, now: float) -> bool:
+        last = self._last.get(key)
+        if last is not None and (now - last) < self._interval:
+            return False
+        self._last[key] = now
+        return True
 
 
 class InputActivityPlugin(Plugin):
+    """Watch every matching input device from the event loop's selector.
+
+    Device fds are registered with ``loop.add_reader`` (one epoll for all of
+    them); ``/dev/input`` is watched with inotify for hot-plugged devices.
+    Facts are written at most once per ``min_interval_seconds`` per key.
+    """
+
     name = "input_activity"
 
-    def __init__(self, cfg: InputActivityConfig):
+    def __init__(
+        self,
+        cfg: InputActivityConfig,
+        list_devices: Callable[[], Iterable[str]] | None = None,
+        open_device: Callable[[str], Any] | None = None,
+    ):
         self._cfg = cfg
-        self._task: asyncio.Task | None = None
-        self._stop = asyncio.Event()
+        self._list_devices = list_devices
+        self._open_device = open_device
+        self._throttle = ActivityThrottle(cfg.min_interval_seconds)
+        self._devices: dict[str, Any] = {}
+        self._ignored: set[str] = set()
+        self._inotify: Inotify | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ctx: PluginContext | None = None
 
     async def start(self, ctx: PluginContext) -> None:
-        try:
-            import evdev  # type: ignore
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError("evdev is required for input_activity plugin") from e
-
-        def match(dev: Any) -> bool:
-            if not self._cfg.device_hint:
-                return True
-            ident = f"{dev.name} {dev.phys} {dev.path}".lower()
-            return self._cfg.device_hint.lower() in ident
-
-        devices = [evdev.InputDevice(p) for p in evdev.list_devices()]
-        chosen = next((d for d in devices if match(d)), None)
-        if not chosen:
-            raise RuntimeError("No input device matched device_hint")
+        if self._list_devices is None or self._open_device is None:
+            try:
+                import evdev  # type: ignore
+            except Exception as e:  # pragma: no cover
+                raise RuntimeError("evdev is required for input_activity plugin") from e
+            self._list_devices = self._list_devices or evdev.list_devices
+            self._open_device = self._open_device or evdev.InputDevice
+
+        self._ctx = ctx
+        self._loop = asyncio.get_running_loop()
+        ctx.set_fact("activity.last_ts", time.time())
 
-        async def loop() -> None:
-            ctx.set_fact("activity.last_ts", time.time())
-            async for _ in chosen.async_read_loop():
-                ctx.set_fact("activity.last_ts", time.time())
-                if self._stop.is_set():
-                    break
+        if self._cfg.hotplug:
+            try:
+                self._inotify = Inotify()
+                self._inotify.add_watch(self._cfg.input_dir, IN_CREATE | IN_ATTRIB)
+                self._loop.add_reader(self._inotify.fileno(), self._on_hotplug)
+            except InotifyError as e:
+                log.warning("input hot-plug disabled: %s", e)
+                self._inotify = None
 
-        self._task = asyncio.create_task(loop())
+        self._scan()
+        if not self._devices and self._inotify is None:
+            raise RuntimeError("No input device matched device_hint")
 
     async def stop(self) -> None:
-        self._stop.set()
-        if self._task:
-            self._task.cancel()
-            with suppress(asyncio.CancelledError):
-                await self._task
+        for path in list(self._devices):
+            self._drop(path)
+        if self._inotify:
+            if self._loop:
+                self._loop.remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
+
+    def _match(self, dev: Any) -> bool:
+        hints = self._cfg.hints
+        if not hints:
+            return True
+        ident = f"{dev.name} {dev.phys} {dev.path}".lower()
+        return any(h in ident for h in hints)
+
+    def _scan(self) -> None:
+        assert self._list_devices and self._open_device and self._loop
+        for path in self._list_devices():
+            if path in self._devices or path in self._ignored:
+                continue
+            try:
+                dev = self._open_device(path)
+            except OSError:
+                # udev may not have applied permissions yet; IN_ATTRIB retries.
+                continue
+            if not self._match(dev):
+                self._ignored.add(path)
+                dev.close()
+                continue
+            self._devices[path] = dev
+            self._loop.add_reader(dev.fd, self._on_readable, path)
+            log.info("watching input device %s (%s)", path, dev.name)
+        if self._ctx:
+            self._ctx.set_fact("activity.devices", len(self._devices))
+
+    def _drop(self, path: str) -> None:
+        dev = self._devices.pop(path, None)
+        if dev is None:
+            return
+        if self._loop:
+            self._loop.remove_reader(dev.fd)
+        with suppress(OSError):
+            dev.close()
+        if self._ctx:
+            self._ctx.set_fact("activity.devices", len(self._devices))
+
+    def _on_hotplug(self) -> None:
+        assert self._inotify
+        events = self._inotify.read_events()
+        if any(name.startswith("event") for _wd, _mask, name in events):
+            # A re-created node may be a different device; re-check ignored ones too.
+            self._ignored.clear()
+            self._scan()
+
+    def _on_readable(self, path: str) -> None:
+        dev = self._devices.get(path)
+        if dev is None:
+            return
+        kinds: set[str] = set()
+        try:
+            for ev in dev.read():
+                kind = classify_event(ev.type, ev.code)
+                if kind:
+                    kinds.add(kind)
+        except BlockingIOError:
+            pass
+        except OSError:
+            log.info("input device %s went away", path)
+            self._drop(path)
+            return
+        if kinds:
+            self._record(kinds, time.time())
+
+    def _record(self, kinds: set[str], now: float) -> None:
+        assert self._ctx
+        if self._throttle.allow("activity.last_ts", now):
+            self._ctx.set_fact("activity.last_ts", now)
+        for kind in kinds:
+            key = f"activity.{kind}_ts"
+            if self._throttle.allow(key, now):
+                self._ctx.set_fact(key, now)
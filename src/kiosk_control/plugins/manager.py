@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+from collections.abc import Callable
+from contextlib import suppress
 from dataclasses import dataclass
 from typing import Any
 
 from kiosk_control.plugins.base import Plugin, PluginContext
 
+log = logging.getLogger(__name__)
+
 
 @dataclass
 class PluginManager:
@@ -17,6 +22,49 @@ class PluginManager:
     async def stop_all(self) -> None:
         await asyncio.gather(*(p.stop() for p in self.plugins), return_exceptions=True)
 
+    async def replace(
+        self,
+        name: str,
+        plugin: Plugin | None,
+        ctx: PluginContext,
+        fallback: Callable[[], Plugin | None] | None = None,
+    ) -> bool:
+        """Stop the plugin called ``name`` (if running) and start ``plugin`` in its place.
+
+        ``plugin`` is registered only once it has started. If it fails to start,
+        a plugin from ``fallback`` (a fresh copy of the old one; stopped plugins
+        are not restarted) takes the slot instead and False is returned.
+        """
+
+        idx = next((i for i, p in enumerate(self.plugins) if p.name == name), None)
+        if idx is not None:
+            old = self.plugins.pop(idx)
+            try:
+                await old.stop()
+            except Exception:
+                log.exception("plugin %s failed to stop", name)
+        pos = len(self.plugins) if idx is None else idx
+        if plugin is None:
+            return True
+        if await self._start(name, plugin, ctx):
+            self.plugins.insert(pos, plugin)
+            return True
+        previous = fallback() if fallback else None
+        if previous is not None and await self._start(name, previous, ctx):
+            self.plugins.insert(pos, previous)
+        return False
+
+    @staticmethod
+    async def _start(name: str, plugin: Plugin, ctx: PluginContext) -> bool:
+        try:
+            await plugin.start(ctx)
+        except Exception:
+            log.exception("plugin %s failed to start", name)
+            with suppress(Exception):
+                await plugin.stop()
+            return False
+        return True
+
     def screensaver_inhibit(self, facts: dict[str, Any]) -> tuple[bool, list[str]]:
         reasons: list[str] = []
         for p in self.plugins:
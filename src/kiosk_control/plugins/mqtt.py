@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+from kiosk_control.httpclient import shared_ssl_context
+from kiosk_control.plugins.base import Plugin, PluginContext
+from kiosk_control.plugins.selectors import MISSING, check_fact_template, compile_selector, select
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MqttTopicConfig:
+    # MQTT topic filter; "+" and "#" wildcards are allowed.
+    filter: str
+    # Fact key; "{1}", "{2}", ... are the topic levels matched by the wildcards.
+    fact: str
+    # Selector into a JSON payload (see the rest plugin); None uses the whole payload.
+    field: str | None = None
+    qos: int = 1
+
+
+@dataclass(frozen=True)
+class MqttConfig:
+    host: str
+    port: int = 1883
+    username: str | None = None
+    password: str | None = None
+    # Must be stable across restarts for the broker to keep the session.
+    client_id: str = "kiosk-control"
+    tls: bool = False
+    keepalive: int = 60
+    topics: list[MqttTopicConfig] = field(default_factory=list)
+    reconnect_min_seconds: float = 1.0
+    reconnect_max_seconds: float = 60.0
+
+
+def match_topic(topic_filter: str, topic: str) -> list[str] | None:
+    """Wildcard captures if ``topic`` matches ``topic_filter``, else None."""
+
+    f_levels = topic_filter.split("/")
+    t_levels = topic.split("/")
+    captures: list[str] = []
+    for i, level in enumerate(f_levels):
+        if level == "#":
+            captures.append("/".join(t_levels[i:]))
+            return captures
+        if i >= len(t_levels):
+            return None
+        if level == "+":
+            captures.append(t_levels[i])
+        elif level != t_levels[i]:
+            return None
+    return captures if len(f_levels) == len(t_levels) else None
+
+
+def decode_payload(payload: bytes) -> Any:
+    """JSON when it parses (numbers, booleans, objects), else the text."""
+
+    text = payload.decode("utf-8", errors="replace")
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class MqttPlugin(Plugin):
+    """Subscribe to MQTT topics and map messages to facts.
+
+    Messages are collected per event-loop turn and published with one
+    ``set_facts`` call, so a burst of retained values after (re)connecting wakes
+    the policy once. The client uses a persistent session (clean_session off)
+    so QoS 1 messages sent while it was away are delivered on reconnect.
+    """
+
+    name = "mqtt"
+
+    def __init__(self, cfg: MqttConfig):
+        for t in cfg.topics:
+            check_fact_template(t.filter, t.fact)
+        self._cfg = cfg
+        self._selectors = [(t, compile_selector(t.field) if t.field else None) for t in cfg.topics]
+        self._ctx: PluginContext | None = None
+        self._task: asyncio.Task | None = None
+        self._batch: dict[str, Any] = {}
+        self._flush_scheduled = False
+        self.messages = 0
+        self.batches = 0
+
+    async def start(self, ctx: PluginContext) -> None:
+        self._ctx = ctx
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._flush()
+
+    def handle(self, topic: str, payload: bytes) -> None:
+        """Queue the facts a message maps to; flushed on the next loop turn."""
+
+        self.messages += 1
+        value = decode_payload(payload)
+        for t, selector in self._selectors:
+            captures = match_topic(t.filter, topic)
+            if captures is None:
+                continue
+            v = value if selector is None else select(value, selector)
+            if v is MISSING:
+                continue
+            self._batch[t.fact.format(topic, *captures)] = v
+        if self._batch and not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._batch or not self._ctx:
+            return
+        batch, self._batch = self._batch, {}
+        self.batches += 1
+        self._ctx.set_facts(batch)
+        self._ctx.request_evaluate()
+
+    async def _run(self) -> None:
+        try:
+            import aiomqtt  # type: ignore
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError("aiomqtt is required for the mqtt plugin") from e
+
+        assert self._ctx
+        cfg = self._cfg
+        self._ctx.set_fact("mqtt.connected", False)
+        delay = cfg.reconnect_min_seconds
+        while True:
+            try:
+                async with aiomqtt.Client(
+                    cfg.host,
+                    cfg.port,
+                    username=cfg.username,
+                    password=cfg.password,
+                    identifier=cfg.client_id,
+                    clean_session=False,
+                    keepalive=cfg.keepalive,
+                    tls_context=shared_ssl_context() if cfg.tls else None,
+                ) as client:
+                    self._ctx.set_fact("mqtt.connected", True)
+                    delay = cfg.reconnect_min_seconds
+                    if cfg.topics:
+                        await client.subscribe([(t.filter, t.qos) for t in cfg.topics])
+                    async for message in client.messages:
+                        payload = message.payload
+                        if isinstance(payload, str):
+                            payload = payload.encode()
+                        elif not isinstance(payload, bytes | bytearray):
+                            payload = json.dumps(payload).encode()
+                        try:
+                            self.handle(str(message.topic), bytes(payload))
+                        except Exception:
+                            # One odd message must not end the subscription.
+                            log.exception("mqtt message on %s not handled", message.topic)
+            except aiomqtt.MqttError as e:
+                log.warning("mqtt connection lost: %s; retrying in %.0fs", e, delay)
+            self._ctx.set_fact("mqtt.connected", False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, cfg.reconnect_max_seconds)
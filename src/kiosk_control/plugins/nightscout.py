@@ -76,7 +76,10 @@ class NightscoutV3SocketPlugin(Plugin):
         self._ctx.set_fact("nightscout.connected", False)
         stale_task = asyncio.create_task(self._watch_stale())
 
-        sio = socketio.AsyncClient(reconnection=True, reconnection_attempts=0)
+        # None lets python-socketio open its own session (contexts without a shared one).
+        sio = socketio.AsyncClient(
+            reconnection=True, reconnection_attempts=0, http_session=self._ctx.http
+        )
         ns = "/storage"
 
         @sio.event(namespace=ns)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+from kiosk_control.plugins.base import Plugin, PluginContext
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PresenceSourceConfig:
+    # "file" (generic sysfs/file value), "gpio_sysfs" or "gpiochip".
+    kind: str
+    path: str = ""
+    gpio: int | None = None
+    line: int | None = None
+    active_value: str = "1"
+    # Numeric sources (e.g. a distance or lux value) are active at/above this.
+    threshold: float | None = None
+    invert: bool = False
+
+
+@dataclass(frozen=True)
+class PresenceConfig:
+    sources: list[PresenceSourceConfig] = field(default_factory=list)
+    poll_interval_seconds: float = 0.25
+    # Raw signal must stay active this long before presence is reported.
+    debounce_seconds: float = 0.2
+    # Presence is held this long after the last active reading (PIRs pulse).
+    hold_seconds: float = 30.0
+
+
+class PresenceSource(Protocol):
+    def read(self) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+class FileSource:
+    """Read a presence value from a sysfs attribute or any small text file."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        active_value: str = "1",
+        threshold: float | None = None,
+        invert: bool = False,
+    ):
+        self._path = Path(path)
+        self._active_value = active_value.strip()
+        self._threshold = threshold
+        self._invert = invert
+
+    def read(self) -> bool:
+        try:
+            raw = self._path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return False
+        if self._threshold is not None:
+            try:
+                active = float(raw) >= self._threshold
+            except ValueError:
+                return False
+        else:
+            active = raw == self._active_value
+        return active != self._invert
+
+    def close(self) -> None:
+        return None
+
+
+class GpioChipSource:
+    """Read one line of a GPIO character device (``/dev/gpiochipN``) via libgpiod v2."""
+
+    def __init__(self, chip: str, line: int, invert: bool = False):
+        try:
+            import gpiod  # type: ignore
+            from gpiod.line import Direction, Value  # type: ignore
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError("gpiod is required for gpiochip presence sources") from e
+
+        self._line = line
+        self._active = Value.ACTIVE
+        self._req = gpiod.request_lines(
+            chip,
+            consumer="kiosk-control",
+            config={line: gpiod.LineSettings(direction=Direction.INPUT, active_low=invert)},
+        )
+
+    def read(self) -> bool:
+        return self._req.get_value(self._line) == self._active
+
+    def close(self) -> None:
+        self._req.release()
+
+
+def open_source(cfg: PresenceSourceConfig) -> PresenceSource:
+    if cfg.kind == "file":
+        return FileSource(cfg.path, cfg.active_value, cfg.threshold, cfg.invert)
+    if cfg.kind == "gpio_sysfs":
+        path = cfg.path or f"/sys/class/gpio/gpio{cfg.gpio}/value"
+        return FileSource(path, "1", None, cfg.invert)
+    if cfg.kind == "gpiochip":
+        if cfg.line is None:
+            raise ValueError("gpiochip presence source requires line")
+        return GpioChipSource(cfg.path or "/dev/gpiochip0", cfg.line, cfg.invert)
+    raise ValueError(f"unknown presence source kind: {cfg.kind}")
+
+
+class Debouncer:
+    """Rise after ``rise_seconds`` of continuous activity, fall after ``hold_seconds`` without."""
+
+    def __init__(self, rise_seconds: float, hold_seconds: float):
+        self._rise = rise_seconds
+        self._hold = hold_seconds
+        self._active_since: float | None = None
+        self._last_active = 0.0
+        self.state = False
+
+    def update(self, raw: bool, now: float) -> bool:
+        if raw:
+            self._last_active = now
+            if self._active_since is None:
+                self._active_since = now
+            if not self.state and (now - self._active_since) >= self._rise:
+                self.state = True
+        else:
+            self._active_since = None
+            if self.state and (now - self._last_active) >= self._hold:
+                self.state = False
+        return self.state
+
+
+class PresencePlugin(Plugin):
+    """Report ``presence.detected`` from PIR/GPIO/sysfs sources to wake the screen early."""
+
+    name = "presence"
+
+    def __init__(self, cfg: PresenceConfig, sources: list[PresenceSource] | None = None):
+        self._cfg = cfg
+        self._sources = sources
+        self._debounce = Debouncer(cfg.debounce_seconds, cfg.hold_seconds)
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+        self._ctx: PluginContext | None = None
+
+    async def start(self, ctx: PluginContext) -> None:
+        if self._sources is None:
+            self._sources = [open_source(s) for s in self._cfg.sources]
+        if not self._sources:
+            raise RuntimeError("presence plugin has no sources configured")
+        self._ctx = ctx
+        ctx.set_fact("presence.detected", False)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        for src in self._sources or []:
+            with suppress(Exception):
+                src.close()
+
+    def _poll(self, now: float) -> None:
+        assert self._ctx and self._sources is not None
+        raw = any(src.read() for src in self._sources)
+        was = self._debounce.state
+        detected = self._debounce.update(raw, now)
+        if detected == was:
+            return
+        self._ctx.set_fact("presence.detected", detected)
+        # Both edges count as activity: arrival wakes the screen, departure starts the idle timer.
+        self._ctx.set_fact("activity.last_ts", now)
+        if detected:
+            self._ctx.set_fact("presence.last_ts", now)
+            self._ctx.request_evaluate()
+        log.debug("presence.detected=%s", detected)
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            self._poll(time.time())
+            await asyncio.sleep(self._cfg.poll_interval_seconds)
+
+    def screensaver_inhibit(self, facts: dict[str, Any]) -> tuple[bool, str]:
+        if facts.get("presence.detected"):
+            return True, "presence.detected"
+        return False, ""
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+from kiosk_control.httpclient import create_session
+from kiosk_control.plugins.base import Plugin, PluginContext
+from kiosk_control.plugins.selectors import MISSING, compile_selector, select
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RestEndpointConfig:
+    name: str
+    url: str
+    # Fact key -> selector, e.g. {"weather.temp_c": "$.current.temperature_2m"}.
+    facts: dict[str, str]
+    headers: dict[str, str] = field(default_factory=dict)
+    interval_seconds: float = 60.0
+    min_interval_seconds: float = 10.0
+    max_interval_seconds: float = 900.0
+    # Floor for the interval while the screen is off; None uses max_interval_seconds.
+    screen_off_interval_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class RestConfig:
+    endpoints: list[RestEndpointConfig] = field(default_factory=list)
+    # Requests in flight at once across all endpoints.
+    max_concurrency: int = 4
+    timeout_seconds: float = 10.0
+
+
+class AdaptiveInterval:
+    """Poll faster while values change, back off while they are stable or failing."""
+
+    def __init__(self, cfg: RestEndpointConfig):
+        self._cfg = cfg
+        self.seconds = cfg.interval_seconds
+
+    def update(self, changed: bool, failed: bool = False) -> float:
+        if failed:
+            self.seconds = min(self.seconds * 2, self._cfg.max_interval_seconds)
+        elif changed:
+            self.seconds = max(self.seconds / 2, self._cfg.min_interval_seconds)
+        else:
+            self.seconds = min(self.seconds * 1.5, self._cfg.max_interval_seconds)
+        return self.seconds
+
+    def next_delay(self, screen_on: bool) -> float:
+        if screen_on:
+            return self.seconds
+        floor = self._cfg.screen_off_interval_seconds
+        return max(self.seconds, self._cfg.max_interval_seconds if floor is None else floor)
+
+
+class _Endpoint:
+    def __init__(self, cfg: RestEndpointConfig):
+        self.cfg = cfg
+        self.selectors = {fact: compile_selector(sel) for fact, sel in cfg.facts.items()}
+        self.interval = AdaptiveInterval(cfg)
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.values: dict[str, Any] = {}
+
+
+class RestPollingPlugin(Plugin):
+    """Poll JSON endpoints and map selected values to facts.
+
+    Conditional requests (ETag / If-Modified-Since) make unchanged polls cost a
+    304 without a body. Facts ``rest.<name>.ok`` and ``rest.<name>.last_ts``
+    report each endpoint's health.
+    """
+
+    name = "rest"
+
+    def __init__(self, cfg: RestConfig):
+        self._cfg = cfg
+        self._endpoints = [_Endpoint(e) for e in cfg.endpoints]
+        self._ctx: PluginContext | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._owned_session = False
+        self._sem = asyncio.Semaphore(max(1, cfg.max_concurrency))
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self, ctx: PluginContext) -> None:
+        self._ctx = ctx
+        self._session = ctx.http
+        if self._session is None:
+            self._session = create_session()
+            self._owned_session = True
+        self._tasks = [asyncio.create_task(self._run(ep)) for ep in self._endpoints]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        if self._owned_session and self._session:
+            await self._session.close()
+        self._session = None
+
+    async def _run(self, ep: _Endpoint) -> None:
+        assert self._ctx
+        while True:
+            try:
+                changed = await self.poll(ep)
+                ep.interval.update(changed)
+            except (aiohttp.ClientError, TimeoutError, ValueError) as e:
+                log.warning("rest endpoint %s failed: %s", ep.cfg.name, e)
+                self._ctx.set_fact(f"rest.{ep.cfg.name}.ok", False)
+                ep.interval.update(False, failed=True)
+            screen_on = self._ctx.facts.get("screen.on", True) is not False
+            await asyncio.sleep(ep.interval.next_delay(screen_on))
+
+    async def poll(self, ep: _Endpoint) -> bool:
+        """Fetch once and publish facts; returns True if any fact value changed."""
+
+        assert self._ctx and self._session
+        headers = dict(ep.cfg.headers)
+        if ep.etag:
+            headers["If-None-Match"] = ep.etag
+        if ep.last_modified:
+            headers["If-Modified-Since"] = ep.last_modified
+        timeout = aiohttp.ClientTimeout(total=self._cfg.timeout_seconds)
+        async with (
+            self._sem,
+            self._session.get(ep.cfg.url, headers=headers, timeout=timeout) as resp,
+        ):
+            if resp.status == 304:
+                doc = MISSING
+            else:
+                resp.raise_for_status()
+                doc = await resp.json(content_type=None)
+                ep.etag = resp.headers.get("ETag")
+                ep.last_modified = resp.headers.get("Last-Modified")
+
+        self._ctx.set_fact(f"rest.{ep.cfg.name}.ok", True)
+        self._ctx.set_fact(f"rest.{ep.cfg.name}.last_ts", time.time())
+        if doc is MISSING:
+            return False
+
+        published = changed = False
+        for fact, steps in ep.selectors.items():
+            value = select(doc, steps)
+            if value is MISSING:
+                continue
+            previous = ep.values.get(fact, MISSING)
+            if previous != value:
+                ep.values[fact] = value
+                self._ctx.set_fact(fact, value)
+                published = True
+                # The first value is not a change; it should not speed up polling.
+                changed = changed or previous is not MISSING
+        if published:
+            self._ctx.request_evaluate()
+        return changed
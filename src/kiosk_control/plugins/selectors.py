@@ -0,0 +1,69 @@
+"""Picking fact values out of plugin payloads (REST bodies, MQTT messages and topics).
+
+config.validate() runs the same checks as the plugins, so a bad selector or fact
+template is a config error rather than a plugin that fails to start.
+"""
+
+from __future__ import annotations
+
+import re
+from string import Formatter
+from typing import Any
+
+# Returned by select() when the path does not exist (None is a valid JSON value).
+MISSING: Any = object()
+_STEP = re.compile(r"""\.([A-Za-z_][\w-]*)|\[(-?\d+)\]|\[["']([^"']*)["']\]""")
+
+
+def compile_selector(selector: str) -> tuple[str | int, ...]:
+    """Parse a JSONPath-style selector: ``$.a.b[0]["c.d"]`` (the leading ``$`` is optional)."""
+
+    s = selector.strip()
+    if s.startswith("$"):
+        s = s[1:]
+    if s and s[0] not in ".[":
+        s = "." + s
+    steps: list[str | int] = []
+    pos = 0
+    while pos < len(s):
+        m = _STEP.match(s, pos)
+        if not m:
+            raise ValueError(f"invalid selector {selector!r} at {s[pos:]!r}")
+        key, index, quoted = m.groups()
+        steps.append(int(index) if index is not None else key if key is not None else quoted)
+        pos = m.end()
+    return tuple(steps)
+
+
+def select(doc: Any, steps: tuple[str | int, ...]) -> Any:
+    """Value at ``steps`` in ``doc``, or ``MISSING``."""
+
+    cur = doc
+    for step in steps:
+        if not isinstance(cur, list if isinstance(step, int) else dict):
+            return MISSING
+        try:
+            cur = cur[step]
+        except (IndexError, KeyError):
+            return MISSING
+    return cur
+
+
+def check_fact_template(topic_filter: str, fact: str) -> None:
+    """Raise ValueError unless every placeholder of ``fact`` is filled by ``topic_filter``.
+
+    ``{0}`` is the whole topic, ``{1}``... the levels matched by the wildcards.
+    """
+
+    wildcards = sum(level in ("+", "#") for level in topic_filter.split("/"))
+    try:
+        fields = [name for _text, name, _spec, _conv in Formatter().parse(fact) if name is not None]
+    except ValueError as e:
+        raise ValueError(f"fact {fact!r}: {e}") from None
+    for name in fields:
+        if not name.isdigit():
+            raise ValueError(f"fact {fact!r}: only {{0}}..{{{wildcards}}} are allowed")
+        if int(name) > wildcards:
+            raise ValueError(
+                f"fact {fact!r}: {{{name}}} but {topic_filter!r} has {wildcards} wildcard(s)"
+            )
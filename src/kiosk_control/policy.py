@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import time
+from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import Any
 
@@ -40,6 +41,37 @@ def derive_alert(facts: dict[str, Any], cfg: PolicyConfig) -> bool:
     )
 
 
+def item_view(item: Any) -> str:
+    """View name of a playlist item (compiled PlaylistItem or raw mapping)."""
+
+    return str(item["view"] if isinstance(item, dict) else item.view)
+
+
+def item_eligible(item: Any, facts: dict[str, Any]) -> bool:
+    """Whether a playlist item's ``when`` condition (if any) holds."""
+
+    when = getattr(item, "when", None)
+    return when is None or bool(when(facts))
+
+
+def step_playlist(
+    playlist: Sequence[Any], index: int, step: int, facts: dict[str, Any]
+) -> tuple[int | None, list[str]]:
+    """Next index (by ``step``) whose item is eligible, and the views skipped on the way.
+
+    The index is None when no other item is eligible.
+    """
+
+    n = len(playlist)
+    skipped: list[str] = []
+    for _ in range(n):
+        index = (index + step) % n
+        if item_eligible(playlist[index], facts):
+            return index, skipped
+        skipped.append(item_view(playlist[index]))
+    return None, skipped
+
+
 @dataclass(frozen=True)
 class Decision:
     screen_on: bool
@@ -52,7 +84,7 @@ def evaluate(
     state: RuntimeState,
     facts: dict[str, Any],
     views: dict[str, str],
-    playlist: list[dict[str, Any]],
+    playlist: Sequence[Any],
     screensaver_inhibit: bool,
     now: float | None = None,
 ) -> Decision:
@@ -96,6 +128,6 @@ def evaluate(
     elif manual_active and state.manual_view in views:
         view = state.manual_view
     else:
-        view = str(playlist[state.playlist_index]["view"])
+        view = item_view(playlist[state.playlist_index])
 
     return Decision(screen_on=screen_on, view=view, why=why)
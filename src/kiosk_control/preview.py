@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Protocol
+
+from aiohttp import WSMsgType, web
+
+from kiosk_control.cdp import CdpError, FrameHandler
+from kiosk_control.config import PreviewConfig
+
+log = logging.getLogger(__name__)
+
+# Each viewer acks a frame once it has been decoded and drawn.
+_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>kiosk preview</title>
+<style>html, body { margin: 0; background: #111; }
+img { display: block; max-width: 100vw; max-height: 100vh; margin: auto; }</style></head>
+<body><img id="f" alt="waiting for frames">
+<script>
+const img = document.getElementById("f");
+const ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws");
+ws.binaryType = "blob";
+ws.onmessage = (ev) => {
+  const old = img.src;
+  img.onload = () => { if (old) URL.revokeObjectURL(old); ws.send("ack"); };
+  img.src = URL.createObjectURL(ev.data);
+};
+ws.onclose = () => { img.alt = "disconnected"; };
+</script></body></html>
+"""
+
+
+class ScreencastSource(Protocol):
+    async def start_screencast(
+        self, handler: FrameHandler, quality: int, max_width: int, max_height: int
+    ) -> None: ...
+
+    async def ack_screencast_frame(self, ack_id: int) -> None: ...
+
+    async def stop_screencast(self) -> None: ...
+
+
+@dataclass(eq=False)
+class _Viewer:
+    ws: web.WebSocketResponse
+    # A frame was sent and the viewer has not acked it yet.
+    busy: bool = False
+
+
+class PreviewServer:
+    """Serve a live view of the kiosk page.
+
+    At most one frame is in flight per viewer and Chromium's next frame is only
+    requested (acked) once every viewer has drawn the previous one, or after
+    ``ack_timeout_seconds`` for a stuck viewer, which then skips frames. Nothing
+    queues up anywhere, and the screencast runs only while someone is watching.
+    """
+
+    def __init__(
+        self, source: ScreencastSource, cfg: PreviewConfig, ack_timeout_seconds: float = 5.0
+    ):
+        self._source = source
+        self._cfg = cfg
+        self._ack_timeout = ack_timeout_seconds
+        self._viewers: set[_Viewer] = set()
+        self._frame: tuple[str, int] | None = None
+        self._frame_ready = asyncio.Event()
+        self._consumed = asyncio.Event()
+        self._pump: asyncio.Task | None = None
+        self._runner: web.AppRunner | None = None
+        self.frames_sent = 0
+
+        self.app = web.Application()
+        self.app.router.add_get("/", self._index)
+        self.app.router.add_get("/ws", self._ws)
+
+    @property
+    def streaming(self) -> bool:
+        return self._pump is not None
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._cfg.host, self._cfg.port).start()
+        log.info("preview on http://%s:%d/", self._cfg.host, self._cfg.port)
+
+    async def stop(self) -> None:
+        for viewer in list(self._viewers):
+            await viewer.ws.close()
+        await self._stop_streaming()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _index(self, _request: web.Request) -> web.Response:
+        return web.Response(text=_PAGE, content_type="text/html")
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        viewer = _Viewer(ws)
+        self._viewers.add(viewer)
+        try:
+            if self._pump is None:
+                await self._start_streaming()
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT and msg.data == "ack":
+                    viewer.busy = False
+                    self._consumed.set()
+        finally:
+            self._viewers.discard(viewer)
+            self._consumed.set()
+            if not self._viewers:
+                await self._stop_streaming()
+        return ws
+
+    def _on_frame(self, data: str, ack_id: int) -> None:
+        self._frame = (data, ack_id)
+        self._frame_ready.set()
+
+    async def _start_streaming(self) -> None:
+        self._pump = asyncio.create_task(self._run_pump())
+        try:
+            await self._source.start_screencast(
+                self._on_frame, self._cfg.quality, self._cfg.max_width, self._cfg.max_height
+            )
+        except CdpError as e:
+            log.warning("screencast failed to start: %s", e)
+
+    async def _stop_streaming(self) -> None:
+        pump, self._pump = self._pump, None
+        if pump is None:
+            return
+        pump.cancel()
+        with suppress(asyncio.CancelledError):
+            await pump
+        self._frame = None
+        self._frame_ready.clear()
+        with suppress(CdpError):
+            await self._source.stop_screencast()
+
+    async def _run_pump(self) -> None:
+        min_gap = 1.0 / self._cfg.max_fps
+        last_ack = 0.0
+        while True:
+            await self._frame_ready.wait()
+            self._frame_ready.clear()
+            if self._frame is None:
+                continue
+            data, ack_id = self._frame
+            jpeg = base64.b64decode(data)
+            for viewer in list(self._viewers):
+                if viewer.busy or viewer.ws.closed:
+                    continue
+                viewer.busy = True
+                with suppress(ConnectionError):
+                    await viewer.ws.send_bytes(jpeg)
+            self.frames_sent += 1
+
+            deadline = time.monotonic() + self._ack_timeout
+            while any(v.busy for v in self._viewers) and time.monotonic() < deadline:
+                self._consumed.clear()
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._consumed.wait(), deadline - time.monotonic())
+            delay = last_ack + min_gap - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            last_ack = time.monotonic()
+            await self._source.ack_screencast_frame(ack_id)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from kiosk_control.config import PlaylistItem
+
+DAY = 86400
+WEEK = 7 * DAY
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_GROUPS = {
+    "daily": tuple(range(7)),
+    "weekdays": tuple(range(5)),
+    "weekends": (5, 6),
+}
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    # 0 = Monday. A window whose end is not after its start runs past midnight,
+    # so a Friday 22:00-06:00 window ends on Saturday morning.
+    days: tuple[int, ...]
+    start: int  # seconds since local midnight
+    end: int
+
+
+@dataclass(frozen=True)
+class ScheduleConfig:
+    name: str
+    windows: tuple[TimeWindow, ...]
+    # Replaces the default playlist while active; empty keeps the default one.
+    playlist: tuple[PlaylistItem, ...] = ()
+    # The same for other displays, by display name.
+    displays: dict[str, tuple[PlaylistItem, ...]] = field(default_factory=dict)
+    # Keep the screen off while active unless there is an alert.
+    screen_off: bool = False
+
+
+@dataclass(frozen=True)
+class ActiveSchedule:
+    schedule: ScheduleConfig | None
+    # Wall-clock time of the next boundary, when the active schedule may change.
+    until: float = field(default=float("inf"))
+
+
+def parse_clock(text: str) -> int:
+    """``"HH:MM"`` or ``"HH:MM:SS"`` to seconds since midnight (``"24:00"`` allowed)."""
+
+    parts = str(text).split(":")
+    if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts):
+        raise ValueError(f"invalid time of day: {text!r}")
+    h, m, s = (int(p) for p in (*parts, "0")[:3])
+    if m > 59 or s > 59 or h * 3600 + m * 60 + s > DAY:
+        raise ValueError(f"invalid time of day: {text!r}")
+    return h * 3600 + m * 60 + s
+
+
+def parse_days(value: str | Sequence[str]) -> tuple[int, ...]:
+    """Day names (``mon``..``sun``) and groups (``daily``, ``weekdays``, ``weekends``)."""
+
+    names = [value] if isinstance(value, str) else list(value)
+    days: set[int] = set()
+    for name in names:
+        key = str(name).strip().lower()
+        if key in DAY_GROUPS:
+            days.update(DAY_GROUPS[key])
+        elif key[:3] in DAY_NAMES:
+            days.add(DAY_NAMES.index(key[:3]))
+        else:
+            raise ValueError(f"unknown day: {name!r}")
+    if not days:
+        raise ValueError("days must not be empty")
+    return tuple(sorted(days))
+
+
+def week_offset(ts: float) -> float:
+    """Seconds since local Monday 00:00 for wall-clock time ``ts``."""
+
+    t = time.localtime(ts)
+    return t.tm_wday * DAY + t.tm_hour * 3600 + t.tm_min * 60 + t.tm_sec + ts % 1
+
+
+def _local_time_at(ts: float, offset: float) -> float:
+    """Wall-clock time of week offset ``offset`` (may exceed a week), counted from the week of ``ts``.
+
+    Goes through mktime so a DST change in between moves the result with the clock.
+    """
+
+    t = time.localtime(ts)
+    days, secs = divmod(offset - t.tm_wday * DAY, DAY)
+    hh, rest = divmod(int(secs), 3600)
+    mm, ss = divmod(rest, 60)
+    local = (t.tm_year, t.tm_mon, t.tm_mday + int(days), hh, mm, ss, 0, 0, -1)
+    return time.mktime(local) + secs % 1
+
+
+class ScheduleIndex:
+    """The week cut into segments with a constant active schedule.
+
+    Windows are flattened once into sorted, non-overlapping segments, so a
+    lookup is a bisect over the boundaries and also yields when the answer
+    next changes. Where windows overlap, the schedule listed first wins.
+    """
+
+    def __init__(self, schedules: Sequence[ScheduleConfig]):
+        self.schedules = tuple(schedules)
+        intervals: list[tuple[int, int, int]] = []  # (start, end, priority)
+        for prio, sched in enumerate(self.schedules):
+            for w in sched.windows:
+                length = (w.end - w.start) % DAY or DAY
+                for day in w.days:
+                    start = day * DAY + w.start
+                    end = start + length
+                    intervals.append((start % WEEK, min(end, WEEK), prio))
+                    if end > WEEK:
+                        intervals.append((0, end - WEEK, prio))
+
+        cuts = sorted({0, WEEK} | {t for s, e, _ in intervals for t in (s, e)})
+        self._starts: list[int] = []
+        self._active: list[int | None] = []
+        for lo, hi in zip(cuts, cuts[1:], strict=False):
+            covering = [p for s, e, p in intervals if s <= lo and hi <= e]
+            active = min(covering) if covering else None
+            if self._active and self._active[-1] == active:
+                continue
+            self._starts.append(lo)
+            self._active.append(active)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def lookup(self, offset: float) -> tuple[ScheduleConfig | None, float]:
+        """Active schedule at ``offset`` seconds into the week and seconds until it may change."""
+
+        offset %= WEEK
+        i = bisect_right(self._starts, offset) - 1
+        active = self._active[i]
+        if len(self._starts) == 1:
+            return (None if active is None else self.schedules[active]), float("inf")
+        end = self._starts[i + 1] if i + 1 < len(self._starts) else WEEK + self._starts[0]
+        if i + 1 == len(self._starts) and self._active[0] == active:
+            # The last segment continues into the first one of the next week.
+            end = WEEK + (self._starts[1] if len(self._starts) > 1 else WEEK)
+        return (None if active is None else self.schedules[active]), end - offset
+
+    def at(self, ts: float) -> ActiveSchedule:
+        """Active schedule at wall-clock time ``ts`` (local time zone)."""
+
+        if not self.schedules:
+            return ActiveSchedule(None)
+        offset = week_offset(ts)
+        schedule, remaining = self.lookup(offset)
+        if remaining == float("inf"):
+            return ActiveSchedule(schedule)
+        until = _local_time_at(ts, offset + remaining)
+        return ActiveSchedule(schedule, until if until > ts else ts + remaining)
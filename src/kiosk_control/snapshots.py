@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import base64
+import html
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Full-screen screenshot with a banner whose age text keeps counting while shown.
+_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{title} (offline)</title>
+<style>
+html, body {{ margin: 0; height: 100%; background: #000; }}
+img {{ width: 100%; height: 100%; object-fit: contain; }}
+#banner {{ position: fixed; top: 0; left: 0; right: 0; padding: 6px 12px;
+  background: rgba(150, 40, 0, 0.85); color: #fff; font: 16px sans-serif; }}
+</style></head>
+<body><img src="{image}?{ts_ms}"><div id="banner"></div>
+<script>
+const captured = {ts_ms};
+function update() {{
+  const min = Math.round((Date.now() - captured) / 60000);
+  const age = min < 1 ? "less than a minute" : min < 120 ? min + " min" : Math.round(min / 60) + " h";
+  document.getElementById("banner").textContent = "Offline \\u2014 snapshot from " + age + " ago";
+}}
+update();
+setInterval(update, 30000);
+</script></body></html>
+"""
+
+
+def _stem(view: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", view)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class SnapshotCache:
+    """Last-good JPEG per view on disk, evicted least-recently-used above ``max_bytes``.
+
+    ``store`` does blocking file I/O and is meant to run in a worker thread; the
+    index is shared with the event loop under a lock.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # stem -> bytes on disk (image + page), least recently used first.
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        directory.mkdir(parents=True, exist_ok=True)
+        images = sorted(directory.glob("*.jpg"), key=lambda p: p.stat().st_mtime)
+        for image in images:
+            page = image.with_suffix(".html")
+            if page.exists():
+                self._entries[image.stem] = image.stat().st_size + page.stat().st_size
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self._entries.values())
+
+    def views(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, view: str) -> Path | None:
+        """Page showing the snapshot of ``view``, or None. Marks it recently used."""
+
+        stem = _stem(view)
+        with self._lock:
+            if stem not in self._entries:
+                return None
+            self._entries.move_to_end(stem)
+        return self.directory / f"{stem}.html"
+
+    def store(self, view: str, jpeg_b64: str, ts: float) -> None:
+        """Decode and write a snapshot (blocking), then evict over the size cap."""
+
+        stem = _stem(view)
+        image = base64.b64decode(jpeg_b64)
+        page = _PAGE.format(
+            title=html.escape(view), image=f"{stem}.jpg", ts_ms=int(ts * 1000)
+        ).encode()
+        _write_atomic(self.directory / f"{stem}.jpg", image)
+        _write_atomic(self.directory / f"{stem}.html", page)
+        with self._lock:
+            self._entries[stem] = len(image) + len(page)
+            self._entries.move_to_end(stem)
+            evict = []
+            total = sum(self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                total -= size
+                evict.append(old)
+        for old in evict:
+            log.info("evicting snapshot %s (cache over %d bytes)", old, self.max_bytes)
+            for suffix in (".jpg", ".html"):
+                (self.directory / f"{old}{suffix}").unlink(missing_ok=True)
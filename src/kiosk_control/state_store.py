@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from kiosk_control.config import StateConfig
+
+log = logging.getLogger(__name__)
+
+_VERSION = 1
+# Live connection state, values the controller derives or measures itself, and
+# activity.last_ts: a pre-restart touch must not count as recent activity (or, once
+# old, blank the screen straight after startup).
+_VOLATILE = frozenset(
+    {
+        "activity.last_ts",
+        "nightscout.alert",
+        "screen.on",
+        "schedule.active",
+        "state.restored_ts",
+    }
+)
+_VOLATILE_PREFIXES = ("browser.",)
+_VOLATILE_SUFFIXES = (".connected", ".restored")
+_MISSING: Any = object()
+
+
+@dataclass(frozen=True)
+class SavedState:
+    saved_ts: float
+    state: dict[str, Any]
+    # key -> (value, time the value was first seen)
+    facts: dict[str, tuple[Any, float]]
+
+
+def _persistable(key: str, value: Any) -> bool:
+    if key in _VOLATILE or key.startswith(_VOLATILE_PREFIXES) or key.endswith(_VOLATILE_SUFFIXES):
+        return False
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class StateStore:
+    """Track changes to state and facts and write them out debounced and rate-limited.
+
+    ``observe`` and ``due`` are cheap and run on the event loop; ``load`` and
+    ``write`` block and belong in a worker thread.
+    """
+
+    def __init__(self, cfg: StateConfig):
+        self._cfg = cfg
+        self.path = Path(cfg.path).expanduser()
+        self._state: dict[str, Any] = {}
+        self._facts: dict[str, tuple[Any, float]] = {}
+        self._version = 0
+        self._saved_version = 0
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._last_write = 0.0
+        self.writes = 0
+
+    @property
+    def dirty(self) -> bool:
+        return self._version != self._saved_version
+
+    def load(self) -> SavedState | None:
+        try:
+            doc = json.loads(self.path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning("ignoring unreadable state file %s: %s", self.path, e)
+            return None
+        if not isinstance(doc, dict) or doc.get("version") != _VERSION:
+            log.warning("ignoring state file %s with unknown format", self.path)
+            return None
+        facts = {
+            str(k): (v[0], float(v[1]))
+            for k, v in (doc.get("facts") or {}).items()
+            if isinstance(v, list) and len(v) == 2
+        }
+        saved = SavedState(
+            saved_ts=float(doc.get("saved_ts", 0.0)),
+            state=dict(doc.get("state") or {}),
+            facts=facts,
+        )
+        # Restored values keep their original age.
+        self._state = dict(saved.state)
+        self._facts = dict(facts)
+        return saved
+
+    def fresh_facts(self, saved: SavedState, now: float) -> dict[str, Any]:
+        """Saved facts young enough to restore."""
+
+        max_age = self._cfg.max_fact_age_seconds
+        return {k: v for k, (v, ts) in saved.facts.items() if now - ts <= max_age}
+
+    def observe(self, state: Mapping[str, Any], facts: Mapping[str, Any], now: float) -> None:
+        changed = dict(state) != self._state
+        if changed:
+            self._state = dict(state)
+        for key, value in facts.items():
+            if not _persistable(key, value):
+                continue
+            old = self._facts.get(key, (_MISSING, 0.0))[0]
+            if old is _MISSING or old != value or type(old) is not type(value):
+                self._facts[key] = (value, now)
+                changed = True
+        if not changed:
+            return
+        if not self.dirty:
+            self._first_change = now
+        self._version += 1
+        self._last_change = now
+
+    def due(self, now: float) -> bool:
+        if not self.dirty or now - self._last_write < self._cfg.min_interval_seconds:
+            return False
+        quiet = now - self._last_change >= self._cfg.debounce_seconds
+        return quiet or now - self._first_change >= self._cfg.min_interval_seconds
+
+    def document(self, now: float) -> tuple[int, bytes]:
+        doc = {
+            "version": _VERSION,
+            "saved_ts": now,
+            "state": self._state,
+            "facts": {k: [v, ts] for k, (v, ts) in self._facts.items()},
+        }
+        return self._version, json.dumps(doc, separators=(",", ":")).encode()
+
+    def write(self, data: bytes) -> None:
+        _write_atomic(self.path, data)
+
+    def mark_saved(self, version: int, now: float) -> None:
+        self._saved_version = version
+        self._last_write = now
+        self.writes += 1
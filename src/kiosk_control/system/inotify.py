@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import struct
+from pathlib import Path
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyError(OSError):
+    pass
+
+
+def _libc() -> ctypes.CDLL:
+    name = ctypes.util.find_library("c") or "libc.so.6"
+    return ctypes.CDLL(name, use_errno=True)
+
+
+class Inotify:
+    """Minimal non-blocking inotify wrapper for use with ``loop.add_reader``.
+
+    Raises InotifyError when inotify is not available (non-Linux, seccomp).
+    """
+
+    def __init__(self) -> None:
+        try:
+            self._libc = _libc()
+            fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            raise InotifyError(str(e)) from e
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise InotifyError(err, os.strerror(err))
+        self._fd = fd
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def add_watch(self, path: str | Path, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(path)), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise InotifyError(err, os.strerror(err), str(path))
+        return wd
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """Return pending ``(wd, mask, name)`` events; empty if none are queued."""
+
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        out: list[tuple[int, int, str]] = []
+        pos = 0
+        while pos + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, pos)
+            pos += _EVENT.size
+            name = buf[pos : pos + length].split(b"\0", 1)[0].decode(errors="replace")
+            pos += length
+            out.append((wd, mask, name))
+        return out
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
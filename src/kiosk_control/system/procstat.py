@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _stat_fields(proc: Path, pid: int) -> list[str] | None:
+    try:
+        raw = (proc / str(pid) / "stat").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    # comm may contain spaces/parens; fields after the last ")" are fixed.
+    return raw[raw.rfind(")") + 2 :].split()
+
+
+def process_tree(pid: int, proc: str | Path = "/proc") -> list[int]:
+    """Return ``pid`` and all of its descendants (Chromium spawns many processes)."""
+
+    root = Path(proc)
+    children: dict[int, list[int]] = {}
+    for entry in root.iterdir():
+        if not entry.name.isdigit():
+            continue
+        fields = _stat_fields(root, int(entry.name))
+        if fields is None:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+
+    out: list[int] = []
+    stack = [pid]
+    while stack:
+        p = stack.pop()
+        out.append(p)
+        stack.extend(children.get(p, []))
+    return out
+
+
+def cpu_seconds(pids: list[int], proc: str | Path = "/proc") -> float:
+    """Sum of user+system CPU time of ``pids`` in seconds."""
+
+    root = Path(proc)
+    ticks = 0
+    for pid in pids:
+        fields = _stat_fields(root, pid)
+        if fields is not None:
+            # utime and stime are fields 14 and 15 of /proc/<pid>/stat.
+            ticks += int(fields[11]) + int(fields[12])
+    return ticks / _CLK_TCK
+
+
+def rss_bytes(pids: list[int], proc: str | Path = "/proc") -> int:
+    """Sum of resident set sizes of ``pids`` (shared pages are counted per process)."""
+
+    root = Path(proc)
+    pages = 0
+    for pid in pids:
+        try:
+            pages += int((root / str(pid) / "statm").read_text(encoding="utf-8").split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return pages * _PAGE_SIZE
+
+
+def write_bytes(pids: list[int], proc: str | Path = "/proc") -> int:
+    """Bytes ``pids`` caused to be written to block devices (tmpfs writes are not counted)."""
+
+    root = Path(proc)
+    total = 0
+    for pid in pids:
+        try:
+            text = (root / str(pid) / "io").read_text(encoding="utf-8")
+        except OSError:
+            continue
+        for line in text.splitlines():
+            if line.startswith("write_bytes:"):
+                total += int(line.split()[1])
+                break
+    return total
+
+
+@dataclass
+class CpuAccounting:
+    """Split a process tree's CPU time by controller state (e.g. ``asleep``/``awake``)."""
+
+    state: str = "awake"
+    cpu_seconds: dict[str, float] = field(default_factory=dict)
+    wall_seconds: dict[str, float] = field(default_factory=dict)
+    _last_cpu: float | None = None
+    _last_wall: float = 0.0
+
+    def sample(self, cpu: float, wall: float, state: str | None = None) -> None:
+        """Credit time since the previous sample to the current state, then switch state."""
+
+        if self._last_cpu is not None:
+            self.cpu_seconds[self.state] = self.cpu_seconds.get(self.state, 0.0) + max(
+                0.0, cpu - self._last_cpu
+            )
+            self.wall_seconds[self.state] = self.wall_seconds.get(self.state, 0.0) + max(
+                0.0, wall - self._last_wall
+            )
+        self._last_cpu = cpu
+        self._last_wall = wall
+        if state is not None:
+            self.state = state
+
+    def cpu_percent(self, state: str) -> float:
+        wall = self.wall_seconds.get(state, 0.0)
+        return 100.0 * self.cpu_seconds.get(state, 0.0) / wall if wall else 0.0
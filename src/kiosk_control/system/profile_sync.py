@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import sqlite3
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Profile state worth keeping across restarts; everything else (caches, history,
+# GPU shader cache, crash reports) lives and dies in RAM.
+DEFAULT_SYNC_PATHS = (
+    "Local State",
+    "Default/Preferences",
+    "Default/Cookies",
+    "Default/Cookies-journal",
+    "Default/Local Storage",
+    "Default/IndexedDB",
+)
+
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+# SQLite rollback journal / WAL side files; only consistent once Chromium has exited.
+_SQLITE_SIDE_FILES = ("-journal", "-wal", "-shm")
+
+
+def _files(root: Path, rel: str) -> Iterator[Path]:
+    p = root / rel
+    if p.is_file():
+        yield p
+    elif p.is_dir():
+        for dirpath, _dirs, names in os.walk(p):
+            for name in names:
+                yield Path(dirpath) / name
+
+
+def _is_sqlite(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+
+
+def _live_unsafe(path: Path) -> bool:
+    """Files that cannot be copied consistently while Chromium writes them.
+
+    SQLite side files belong to a database that is backed up through SQLite
+    instead, and a LevelDB directory (one with a ``CURRENT`` file) is only
+    consistent as a whole.
+    """
+
+    return path.name.endswith(_SQLITE_SIDE_FILES) or (path.parent / "CURRENT").is_file()
+
+
+def _copy(src: Path, dst: Path) -> int:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".sync-tmp")
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return src.stat().st_size
+
+
+def _backup_sqlite(src: Path, dst: Path) -> int:
+    """Copy a live SQLite database through SQLite's backup API (a consistent snapshot)."""
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".sync-tmp")
+    tmp.unlink(missing_ok=True)
+    source = sqlite3.connect(f"{src.as_uri()}?mode=ro", uri=True)
+    try:
+        target = sqlite3.connect(tmp)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+    os.replace(tmp, dst)
+    return dst.stat().st_size
+
+
+class ProfileSync:
+    """Run a Chromium profile from RAM and copy selected paths back to disk.
+
+    ``runtime`` is the tmpfs directory Chromium uses, ``backing`` the persistent
+    one. Only files whose size or mtime changed since the last sync are written,
+    so an idle kiosk does not touch the SD card at all. All methods block.
+    """
+
+    def __init__(self, backing: Path, runtime: Path, paths: Sequence[str] = DEFAULT_SYNC_PATHS):
+        self.backing = backing
+        self.runtime = runtime
+        self.paths = tuple(paths)
+        self.bytes_written = 0
+        # Relative path -> (size, mtime_ns) as last copied to the backing store.
+        self._synced: dict[str, tuple[int, int]] = {}
+
+    def stage(self) -> None:
+        """Populate the runtime directory from the backing store.
+
+        Files already in ``runtime`` that are newer (left by a run that crashed
+        before its final sync) are kept.
+        """
+
+        self.runtime.mkdir(parents=True, exist_ok=True)
+        for rel in self.paths:
+            for src in _files(self.backing, rel):
+                name = src.relative_to(self.backing)
+                dst = self.runtime / name
+                st = src.stat()
+                if dst.exists() and dst.stat().st_mtime_ns >= st.st_mtime_ns:
+                    continue
+                _copy(src, dst)
+                self._synced[str(name)] = (st.st_size, st.st_mtime_ns)
+
+    def sync(self, final: bool = False) -> int:
+        """Copy changed files back and drop deleted ones. Returns bytes written.
+
+        While Chromium runs (``final`` false) SQLite databases are copied through
+        the backup API, and SQLite journals and LevelDB directories are left for
+        the ``final`` sync after Chromium has exited.
+        """
+
+        written = 0
+        seen: set[str] = set()
+        for rel in self.paths:
+            for src in _files(self.runtime, rel):
+                name = str(src.relative_to(self.runtime))
+                seen.add(name)
+                try:
+                    if not final and _live_unsafe(src):
+                        continue
+                    st = src.stat()
+                    sig = (st.st_size, st.st_mtime_ns)
+                    if self._synced.get(name) == sig:
+                        continue
+                    if not final and _is_sqlite(src):
+                        written += _backup_sqlite(src, self.backing / name)
+                    else:
+                        written += _copy(src, self.backing / name)
+                except FileNotFoundError:
+                    # Chromium removed it mid-walk (LevelDB compaction); next sync catches up.
+                    seen.discard(name)
+                    continue
+                except sqlite3.Error as e:
+                    # Locked or mid-write; the on-disk copy stays as it was until next time.
+                    log.debug("profile sync skipped %s: %s", name, e)
+                    continue
+                self._synced[name] = sig
+        for name in set(self._synced) - seen:
+            (self.backing / name).unlink(missing_ok=True)
+            del self._synced[name]
+        self.bytes_written += written
+        return written
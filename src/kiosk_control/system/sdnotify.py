@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+
+log = logging.getLogger(__name__)
+
+
+class SdNotifier:
+    """Minimal ``sd_notify(3)``: datagrams to ``$NOTIFY_SOCKET``; a no-op without it.
+
+    Tests pass ``address`` (a local datagram socket path) instead of the environment.
+    """
+
+    def __init__(self, address: str | None = None, watchdog_usec: int | None = None):
+        env = os.environ
+        addr = address if address is not None else env.get("NOTIFY_SOCKET", "")
+        if addr.startswith("@"):
+            addr = "\0" + addr[1:]  # abstract namespace
+        self._address = addr or None
+
+        if watchdog_usec is None:
+            # WATCHDOG_PID, when set, names the process systemd expects pings from.
+            pid = env.get("WATCHDOG_PID")
+            usec = env.get("WATCHDOG_USEC", "")
+            if usec.isdigit() and (not pid or pid == str(os.getpid())):
+                watchdog_usec = int(usec)
+        self.watchdog_seconds = watchdog_usec / 1e6 if watchdog_usec else None
+
+        self._sock: socket.socket | None = None
+        if self._address:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC)
+            self._sock.setblocking(False)
+
+    @property
+    def enabled(self) -> bool:
+        return self._sock is not None
+
+    def notify(self, *fields: str) -> bool:
+        """Send ``KEY=value`` fields in one datagram; False if not delivered."""
+
+        if self._sock is None or self._address is None:
+            return False
+        try:
+            self._sock.sendto("\n".join(fields).encode(), self._address)
+        except OSError as e:
+            # Never block or fail the controller because the manager is busy.
+            log.debug("sd_notify failed: %s", e)
+            return False
+        return True
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
@@ -20,13 +20,14 @@ def _load(path: str | Path) -> dict[str, Any]:
 def _build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(prog="kiosk-overlay")
     ap.add_argument("--version", action="version", version=__version__)
-    ap.add_argument("-c", "--config", required=True)
+    # Only the optional `overlay:` section is read; views come from the controller.
+    ap.add_argument("-c", "--config")
     return ap
 
 
 def main() -> None:
     args = _build_parser().parse_args()
-    cfg = _load(args.config)
+    cfg = _load(args.config) if args.config else {}
 
     # Import Gtk lazily so the base package remains importable on non-GUI systems.
     try:
@@ -39,12 +40,19 @@ def main() -> None:
             "kiosk-overlay requires GTK3 + PyGObject (apt install python3-gi gir1.2-gtk-3.0)"
         ) from e
 
-    from kiosk_overlay.model import ShutdownConfirm
+    from kiosk_overlay.model import (
+        CollapseTimer,
+        ControllerState,
+        OptimisticState,
+        ShutdownConfirm,
+    )
 
     bus_name = "io.github.kiosk_control"
     obj_path = "/io/github/kiosk_control"
     iface_name = bus_name
 
+    # One proxy on the shared session connection; all calls below are async so a
+    # busy controller never blocks the GTK main loop.
     proxy = Gio.DBusProxy.new_for_bus_sync(
         Gio.BusType.SESSION,
         Gio.DBusProxyFlags.NONE,
@@ -57,105 +65,180 @@ def main() -> None:
 
     overlay_cfg = cfg.get("overlay", {})
     hide_after = float(overlay_cfg.get("collapse_after_seconds", 5.0))
-
-    views = list((cfg.get("views") or {}).keys())
+    call_timeout_ms = int(float(overlay_cfg.get("call_timeout_seconds", 5.0)) * 1000)
 
     confirm = ShutdownConfirm()
+    optimistic = OptimisticState()
+
+    def call(method: str, params: GLib.Variant | None, callback: Any = None) -> None:
+        proxy.call(method, params, Gio.DBusCallFlags.NONE, call_timeout_ms, None, callback, None)
 
     class Overlay(Gtk.Window):
+        """Collapsed by default; the expanded bar is built on first expand.
+
+        Nothing is scheduled while collapsed: the collapse timer is one-shot and
+        the power-confirm reset is cancelled on collapse.
+        """
+
         def __init__(self) -> None:
             super().__init__(title="kiosk-overlay")
             self.set_decorated(False)
             self.set_keep_above(True)
             self.stick()
 
-            self._expanded = True
-            self._last_touch = GLib.get_monotonic_time()
+            self._timer = CollapseTimer(
+                hide_after, GLib.timeout_add, GLib.source_remove, self._on_collapse
+            )
+            self._power_reset: int | None = None
+            self._expanded_box: Gtk.Box | None = None
+            self._btn_auto: Gtk.Button | None = None
+            self._btn_power: Gtk.Button | None = None
+            self._view_buttons: dict[str, Gtk.Button] = {}
 
             self._collapsed = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-            self._expanded_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-
             self._btn_expand = Gtk.Button(label="⋯")
             self._btn_expand.connect("clicked", self._on_expand)
             self._collapsed.pack_start(self._btn_expand, True, True, 0)
 
-            def add(btn: Gtk.Button) -> None:
-                self._expanded_box.pack_start(btn, True, True, 0)
+            self._stack = Gtk.Stack()
+            self._stack.add_named(self._collapsed, "collapsed")
+            self._stack.set_visible_child_name("collapsed")
+            self.add(self._stack)
+
+            proxy.connect("g-signal", self._on_signal)
 
-            btn_auto = Gtk.Button(label="Auto")
-            btn_auto.connect("clicked", self._call0, "SetAuto")
-            add(btn_auto)
+        def _build_expanded(self) -> None:
+            box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+
+            self._btn_auto = Gtk.Button(label="Auto")
+            self._btn_auto.connect("clicked", self._call0, "SetAuto")
+            box.pack_start(self._btn_auto, True, True, 0)
 
             btn_prev = Gtk.Button(label="Prev")
             btn_prev.connect("clicked", self._call0, "Prev")
-            add(btn_prev)
+            box.pack_start(btn_prev, True, True, 0)
 
             btn_next = Gtk.Button(label="Next")
             btn_next.connect("clicked", self._call0, "Next")
-            add(btn_next)
-
-            for v in views:
-                b = Gtk.Button(label=v)
-                b.connect("clicked", self._set_view, v)
-                add(b)
+            box.pack_start(btn_next, True, True, 0)
 
             self._btn_power = Gtk.Button(label="Power Off")
             self._btn_power.connect("clicked", self._power_off)
-            add(self._btn_power)
-
-            self._stack = Gtk.Stack()
-            self._stack.add_named(self._expanded_box, "expanded")
-            self._stack.add_named(self._collapsed, "collapsed")
-            self._stack.set_visible_child_name("expanded")
-            self.add(self._stack)
-
-            GLib.timeout_add(250, self._tick)
+            box.pack_end(self._btn_power, True, True, 0)
+
+            self._expanded_box = box
+            self._stack.add_named(box, "expanded")
+            box.show_all()
+            call("GetViews", None, self._on_views_reply)
+
+        def _on_views_reply(
+            self, source: Gio.DBusProxy, res: Gio.AsyncResult, _data: object
+        ) -> None:
+            try:
+                (names,) = source.call_finish(res).unpack()
+            except GLib.Error:
+                return
+            assert self._expanded_box
+            for v in names:
+                b = Gtk.Button(label=v)
+                b.connect("clicked", self._set_view, v)
+                self._expanded_box.pack_start(b, True, True, 0)
+                b.show()
+                self._view_buttons[v] = b
+            self._render(optimistic.current)
 
         def _touch(self) -> None:
-            self._last_touch = GLib.get_monotonic_time()
-            if not self._expanded:
-                self._expanded = True
+            was_expanded = self._timer.expanded
+            self._timer.touch()
+            if not was_expanded:
+                if self._expanded_box is None:
+                    self._build_expanded()
                 self._stack.set_visible_child_name("expanded")
+                call("GetState", None, self._on_state_reply)
 
-        def _tick(self) -> bool:
-            if self._expanded:
-                idle_s = (GLib.get_monotonic_time() - self._last_touch) / 1_000_000
-                if idle_s >= hide_after:
-                    self._expanded = False
-                    self._stack.set_visible_child_name("collapsed")
-            return True
+        def _on_collapse(self) -> None:
+            self._stack.set_visible_child_name("collapsed")
+            if self._power_reset is not None:
+                GLib.source_remove(self._power_reset)
+                self._reset_power()
 
         def _on_expand(self, *_: object) -> None:
             self._touch()
 
-        def _call0(self, _btn: Gtk.Button, method: str) -> None:
+        def _render(self, state: ControllerState) -> None:
+            if not self._timer.expanded:
+                return
+            for name, btn in self._view_buttons.items():
+                ctx = btn.get_style_context()
+                if name == state.view:
+                    ctx.add_class("suggested-action")
+                else:
+                    ctx.remove_class("suggested-action")
+            if self._btn_auto:
+                auto_ctx = self._btn_auto.get_style_context()
+                if state.manual:
+                    auto_ctx.remove_class("suggested-action")
+                else:
+                    auto_ctx.add_class("suggested-action")
+
+        def _act(self, action: str, arg: str) -> None:
             self._touch()
-            proxy.call_sync(method, None, Gio.DBusCallFlags.NONE, -1, None)
-            proxy.call_sync("Wake", GLib.Variant("(s)", ("ui",)), Gio.DBusCallFlags.NONE, -1, None)
+            self._render(optimistic.predict(action, arg))
+            call("Act", GLib.Variant("(sss)", (action, arg, "ui")), self._on_act_reply)
+
+        def _on_act_reply(self, source: Gio.DBusProxy, res: Gio.AsyncResult, _data: object) -> None:
+            try:
+                source.call_finish(res)
+            except GLib.Error:
+                self._render(optimistic.revert())
+                return
+            # StateChanged is only sent when the state changes (not for "next" on a
+            # one-item playlist), so settle the prediction with the controller's answer.
+            call("GetState", None, self._on_state_reply)
+
+        def _on_state_reply(
+            self, source: Gio.DBusProxy, res: Gio.AsyncResult, _data: object
+        ) -> None:
+            try:
+                reply = source.call_finish(res)
+            except GLib.Error:
+                return
+            optimistic.confirm(ControllerState(*reply.unpack()))
+            self._render(optimistic.current)
+
+        def _on_signal(
+            self, _proxy: Gio.DBusProxy, _sender: str, signal: str, params: GLib.Variant
+        ) -> None:
+            if signal != "StateChanged":
+                return
+            optimistic.confirm(ControllerState(*params.unpack()))
+            self._render(optimistic.current)
+
+        def _call0(self, _btn: Gtk.Button, method: str) -> None:
+            self._act(method, "")
 
         def _set_view(self, _btn: Gtk.Button, view: str) -> None:
-            self._touch()
-            proxy.call_sync(
-                "SetView", GLib.Variant("(s)", (view,)), Gio.DBusCallFlags.NONE, -1, None
-            )
-            proxy.call_sync("Wake", GLib.Variant("(s)", ("ui",)), Gio.DBusCallFlags.NONE, -1, None)
+            self._act("SetView", view)
 
         def _power_off(self, *_: object) -> None:
             self._touch()
+            assert self._btn_power
             now = time.time()
             if confirm.consume_if_armed(now):
-                proxy.call_sync(
-                    "PowerOff", GLib.Variant("(s)", ("ui",)), Gio.DBusCallFlags.NONE, -1, None
-                )
+                call("PowerOff", GLib.Variant("(s)", ("ui",)))
                 self._btn_power.set_label("Powering off…")
                 self._btn_power.set_sensitive(False)
                 return
             confirm.arm(now)
             self._btn_power.set_label("Confirm")
-            GLib.timeout_add(3000, self._reset_power)
+            if self._power_reset is not None:
+                GLib.source_remove(self._power_reset)
+            self._power_reset = GLib.timeout_add(3000, self._reset_power)
 
         def _reset_power(self) -> bool:
-            self._btn_power.set_label("Power Off")
+            self._power_reset = None
+            if self._btn_power:
+                self._btn_power.set_label("Power Off")
             return False
 
     win = Overlay()
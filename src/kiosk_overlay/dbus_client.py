@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Callable
 from dataclasses import dataclass
 
 from dbus_next.aio import MessageBus
 
+from kiosk_overlay.model import ControllerState
+
 BUS = "io.github.kiosk_control"
 OBJ = "/io/github/kiosk_control"
 
@@ -14,8 +18,8 @@ class KioskDbusClient:
     iface: object
 
     @classmethod
-    async def connect(cls) -> KioskDbusClient:
-        bus = await MessageBus().connect()
+    async def connect(cls, bus_address: str | None = None) -> KioskDbusClient:
+        bus = await MessageBus(bus_address=bus_address).connect()
         introspection = await bus.introspect(BUS, OBJ)
         obj = bus.get_proxy_object(BUS, OBJ, introspection)
         iface = obj.get_interface(BUS)
@@ -42,5 +46,22 @@ class KioskDbusClient:
     async def power_off(self, reason: str = "ui") -> bool:
         return bool(await self.iface.call_power_off(reason))
 
+    async def act(self, action: str, arg: str = "", reason: str = "ui") -> bool:
+        """Run a command and wake the screen in a single round-trip."""
+
+        return bool(await self.iface.call_act(action, arg, reason))
+
+    async def get_state(self) -> ControllerState:
+        return ControllerState(*await self.iface.call_get_state())
+
+    async def get_views(self) -> list[str]:
+        return list(await self.iface.call_get_views())
+
+    async def get_metrics(self) -> dict[str, object]:
+        return json.loads(await self.iface.call_get_metrics())
+
+    def on_state_changed(self, cb: Callable[[ControllerState], None]) -> None:
+        self.iface.on_state_changed(lambda *args: cb(ControllerState(*args)))
+
     async def close(self) -> None:
         self.bus.disconnect()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
 
 
@@ -21,3 +22,97 @@ class ShutdownConfirm:
             self.armed_until_ts = 0.0
             return True
         return False
+
+
+@dataclass(frozen=True)
+class ControllerState:
+    """Controller state as published by the StateChanged D-Bus signal."""
+
+    view: str = ""
+    screen_on: bool = True
+    manual: bool = False
+    why: str = ""
+
+
+@dataclass
+class OptimisticState:
+    """Show the expected result of a press before the controller replies.
+
+    The prediction is dropped as soon as the controller confirms a state
+    (StateChanged, or the GetState sent once Act succeeds) or the call fails.
+    """
+
+    confirmed: ControllerState = ControllerState()
+    pending: ControllerState | None = None
+
+    @property
+    def current(self) -> ControllerState:
+        return self.pending or self.confirmed
+
+    def predict(self, action: str, arg: str = "") -> ControllerState:
+        cur = self.current
+        if action == "SetView":
+            nxt = ControllerState(view=arg, screen_on=True, manual=True, why="manual_override")
+        elif action == "SetAuto":
+            nxt = ControllerState(view=cur.view, screen_on=True, manual=False, why=cur.why)
+        elif action in ("Next", "Prev"):
+            # The target view is only known to the controller.
+            nxt = ControllerState(view=cur.view, screen_on=True, manual=True, why="manual_override")
+        else:
+            nxt = cur
+        self.pending = nxt
+        return nxt
+
+    def confirm(self, state: ControllerState) -> None:
+        self.confirmed = state
+        self.pending = None
+
+    def revert(self) -> ControllerState:
+        self.pending = None
+        return self.confirmed
+
+
+class CollapseTimer:
+    """One-shot collapse timer that is rescheduled on every touch.
+
+    ``schedule(ms, fn)`` and ``cancel(source_id)`` follow ``GLib.timeout_add`` /
+    ``GLib.source_remove`` so the timer can be driven headless in tests. While
+    collapsed no source is pending, so an idle overlay never wakes the CPU.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float,
+        schedule: Callable[[int, Callable[[], bool]], int],
+        cancel: Callable[[int], object],
+        on_collapse: Callable[[], None],
+    ) -> None:
+        self._timeout_ms = max(1, int(timeout_seconds * 1000))
+        self._schedule = schedule
+        self._cancel = cancel
+        self._on_collapse = on_collapse
+        self._source: int | None = None
+        self.expanded = False
+
+    @property
+    def pending(self) -> bool:
+        return self._source is not None
+
+    def touch(self) -> None:
+        self.expanded = True
+        if self._source is not None:
+            self._cancel(self._source)
+        self._source = self._schedule(self._timeout_ms, self._fire)
+
+    def collapse(self) -> None:
+        if self._source is not None:
+            self._cancel(self._source)
+            self._source = None
+        if self.expanded:
+            self.expanded = False
+            self._on_collapse()
+
+    def _fire(self) -> bool:
+        self._source = None
+        self.collapse()
+        return False
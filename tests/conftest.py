@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from fakes import FakeCdp, KioskFactory
+
+from kiosk_control.cdp import ChromiumKiosk
+
+
+@pytest.fixture
+def make_kiosk() -> KioskFactory:
+    """``make_kiosk(results=None, **kiosk_kwargs)``: a ChromiumKiosk attached to a FakeCdp."""
+
+    def make(
+        results: dict[str, Any] | None = None,
+        session_id: str = "S",
+        target_id: str | None = None,
+        **kwargs: Any,
+    ) -> tuple[ChromiumKiosk, FakeCdp]:
+        k = ChromiumKiosk("chromium", "/tmp/x", [], **kwargs)
+        cdp = FakeCdp(results)
+        k._cdp = cdp  # type: ignore[assignment]
+        k._session_id = session_id
+        k._target_id = target_id
+        return k, cdp
+
+    return make
+
+
+@pytest.fixture
+def make_config() -> Callable[..., dict[str, Any]]:
+    """``make_config(**sections)``: a minimal valid raw config; ``chromium`` keys are merged."""
+
+    def make(**sections: Any) -> dict[str, Any]:
+        chromium = {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []}
+        chromium.update(sections.pop("chromium", {}))
+        return {
+            "security": {"allow_insecure": True},
+            "chromium": chromium,
+            "views": {"a": "http://a"},
+            "playlist": [{"view": "a", "seconds": 10}],
+            "policy": {
+                "idle_off_seconds": 60,
+                "hypo_threshold_mmol": 5,
+                "trending_guard_mmol": 0.5,
+            },
+            "screen": {"backlight_sysfs": "/tmp"},
+            **sections,
+        }
+
+    return make
+
+
+@pytest.fixture
+def chromium_bin() -> str:
+    """Path of an installed Chromium; the test is skipped without one."""
+
+    for name in ("chromium", "chromium-browser", "google-chrome", "headless_shell"):
+        found = shutil.which(name)
+        if found:
+            return found
+    pytest.skip("Chromium not installed")
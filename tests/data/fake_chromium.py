@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Stand-in Chromium for end-to-end tests: a DevTools websocket with one page target.
+
+Started by ``ChromiumKiosk`` like the real browser (``--user-data-dir=...``), it
+writes ``DevToolsActivePort`` and answers the CDP methods the controller uses
+with minimal results; ``Target.createTarget`` opens further (pretend) windows,
+each attached with its own session. Every ``Page.navigate`` is appended to
+``<user-data-dir>/navigations.jsonl`` with the wall-clock time it arrived and
+the session it was sent on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import websockets
+
+_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+
+_RESULTS: dict[str, dict[str, Any]] = {
+    "Target.getTargets": {
+        "targetInfos": [{"targetId": "page-1", "type": "page", "url": "about:blank"}]
+    },
+    "Browser.getWindowForTarget": {"windowId": 1},
+    "Runtime.evaluate": {"result": {"type": "number", "value": 1}},
+    "Runtime.getHeapUsage": {"usedSize": 8_000_000, "totalSize": 16_000_000},
+    "Performance.getMetrics": {
+        "metrics": [
+            {"name": "JSHeapUsedSize", "value": 8_000_000},
+            {"name": "Nodes", "value": 500},
+        ]
+    },
+    "Page.captureScreenshot": {"data": _PNG},
+    "Page.getLayoutMetrics": {"cssVisualViewport": {"clientWidth": 800, "clientHeight": 480}},
+}
+
+
+async def _serve(profile: Path) -> None:
+    log = (profile / "navigations.jsonl").open("a", encoding="utf-8", buffering=1)
+
+    targets = itertools.count(2)
+
+    async def handler(ws: Any) -> None:
+        async for raw in ws:
+            msg = json.loads(raw)
+            method = msg.get("method", "")
+            params = msg.get("params", {})
+            result = _RESULTS.get(method, {})
+            if method == "Target.createTarget":
+                result = {"targetId": f"page-{next(targets)}"}
+            elif method == "Target.attachToTarget":
+                # One session per target, so navigations can be told apart per window.
+                result = {"sessionId": "session-" + params["targetId"].removeprefix("page-")}
+            elif method == "Page.navigate":
+                entry = {
+                    "ts": time.time(),
+                    "url": params.get("url", ""),
+                    "session": msg.get("sessionId"),
+                }
+                log.write(json.dumps(entry) + "\n")
+                result = {"frameId": "frame-1"}
+            reply: dict[str, Any] = {"id": msg["id"], "result": result}
+            if "sessionId" in msg:
+                reply["sessionId"] = msg["sessionId"]
+            await ws.send(json.dumps(reply))
+
+    async with websockets.serve(handler, "127.0.0.1", 0, max_size=None) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        tmp = profile / "DevToolsActivePort.tmp"
+        tmp.write_text(f"{port}\n/devtools/browser/fake\n", encoding="utf-8")
+        os.replace(tmp, profile / "DevToolsActivePort")
+        await asyncio.Future()
+
+
+def main() -> None:
+    profile = next(a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--user-data-dir="))
+    asyncio.run(_serve(Path(profile)))
+
+
+if __name__ == "__main__":
+    main()
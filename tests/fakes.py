@@ -0,0 +1,37 @@
+"""Test doubles shared by several test modules (fixtures using them are in conftest.py)."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from kiosk_control.cdp import ChromiumKiosk
+
+
+class FakeCdp:
+    """Stands in for ``CdpClient``: records calls and answers from ``results``.
+
+    ``results`` maps a method to its result, or to a callable taking the params;
+    other methods return ``{}``.
+    """
+
+    def __init__(self, results: dict[str, Any] | None = None) -> None:
+        self.results = results or {}
+        self.calls: list[tuple[str, Any]] = []
+        self.session_ids: list[str | None] = []
+        self.listeners: dict[str, list[Callable[..., None]]] = {}
+
+    def on(self, method: str, handler: Callable[..., None]) -> None:
+        self.listeners.setdefault(method, []).append(handler)
+
+    async def call(self, method: str, params: Any = None, session_id: str | None = None) -> Any:
+        self.calls.append((method, params))
+        self.session_ids.append(session_id)
+        result = self.results.get(method, {})
+        return result(params) if callable(result) else result
+
+    def methods(self) -> list[str]:
+        return [m for m, _ in self.calls]
+
+
+KioskFactory = Callable[..., tuple[ChromiumKiosk, FakeCdp]]
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from pathlib import Path
+from typing import Any
+
+import pytest
+import websockets
 
-from kiosk_control.cdp import parse_devtools_active_port
 from kiosk_control import cdp
+from kiosk_control.cdp import CdpClient, parse_devtools_active_port
 
 
 def test_parse_devtools_active_port_token(tmp_path: Path) -> None:
@@ -26,3 +32,23 @@ def test_needs_user_fallback_false_for_root(monkeypatch) -> None:
     monkeypatch.setattr(cdp.os, "geteuid", lambda: 0)
     monkeypatch.setattr(cdp.os, "access", lambda *_args, **_kw: False)
     assert cdp._needs_user_fallback(Path("/var/lib/kiosk-control/chrome-profile")) is False
+
+
+async def test_late_reply_to_abandoned_call_keeps_reader_alive() -> None:
+    async def slow_echo(ws: Any) -> None:
+        async for raw in ws:
+            msg = json.loads(raw)
+            if msg["method"] == "Slow":
+                await asyncio.sleep(0.2)
+            await ws.send(json.dumps({"id": msg["id"], "result": {"ok": msg["method"]}}))
+
+    async with websockets.serve(slow_echo, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        client = CdpClient(f"ws://127.0.0.1:{port}")
+        await client.connect()
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(client.call("Slow"), 0.05)
+        await asyncio.sleep(0.3)  # the reply arrives after the caller gave up
+        assert await asyncio.wait_for(client.call("Fast"), 1.0) == {"ok": "Fast"}
+        assert client._ws
+        await client._ws.close()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from typing import Any
+
 import pytest
 
 from kiosk_control.config import ConfigError, validate
@@ -38,3 +41,96 @@ def test_allow_insecure_allows_http() -> None:
         "screen": {"backlight_sysfs": "/tmp"},
     }
     validate(cfg)
+
+
+def test_plugin_sections_are_typed(make_config: Callable[..., dict[str, Any]]) -> None:
+    cfg = validate(
+        make_config(
+            plugins={
+                # Disabled plugins may be incomplete.
+                "homeassistant": {"enabled": False},
+                "rest": {
+                    "enabled": True,
+                    "timeout_seconds": "5",
+                    "endpoints": [{"name": "w", "url": "http://w", "facts": {"t": "$.t"}}],
+                },
+            }
+        )
+    )
+    assert cfg.plugins["rest"]["timeout_seconds"] == 5.0
+    assert cfg.plugins["homeassistant"] == {"enabled": False}
+
+
+@pytest.mark.parametrize(
+    ("plugins", "path"),
+    [
+        ({"mqtt": {"enabled": "maybe", "host": "h"}}, r"plugins\.mqtt\.enabled"),
+        ({"mqtt": {"enabled": True, "host": "h", "tls": 2}}, r"plugins\.mqtt\.tls"),
+        ({"mqtt": {"enabled": True}}, r"plugins\.mqtt\.host"),
+        (
+            {"presence": {"enabled": True, "sources": [{"kind": "pir"}]}},
+            r"plugins\.presence\.sources\[0\]\.kind",
+        ),
+        (
+            {"rest": {"enabled": True, "endpoints": [{"name": "w", "url": "http://w"}]}},
+            r"plugins\.rest\.endpoints\[0\]\.facts",
+        ),
+        ({"mqtt": {"enabled": True, "host": "h", "topics": "x"}}, r"plugins\.mqtt\.topics"),
+        (
+            {
+                "mqtt": {
+                    "enabled": True,
+                    "host": "h",
+                    "topics": [{"filter": "a/+", "fact": "a.{2}"}],
+                }
+            },
+            r"plugins\.mqtt\.topics\[0\]\.fact",
+        ),
+        (
+            {
+                "rest": {
+                    "enabled": True,
+                    "endpoints": [{"name": "w", "url": "u", "facts": {"t": "$["}}],
+                }
+            },
+            r"plugins\.rest\.endpoints\[0\]\.facts\.t",
+        ),
+    ],
+)
+def test_plugin_section_errors_name_the_key(
+    make_config: Callable[..., dict[str, Any]], plugins: dict[str, Any], path: str
+) -> None:
+    with pytest.raises(ConfigError, match=path):
+        validate(make_config(plugins=plugins))
+
+
+def test_unknown_plugin_keys_are_ignored_with_a_warning(
+    make_config: Callable[..., dict[str, Any]], caplog: pytest.LogCaptureFixture
+) -> None:
+    cfg = validate(
+        make_config(
+            plugins={
+                "weather": {"enabled": True},
+                "presence": {
+                    "enabled": True,
+                    "hold_secs": 5,
+                    "sources": [{"kind": "file", "path": "/x", "pth": "/x"}],
+                },
+            }
+        )
+    )
+    assert "weather" not in cfg.plugins
+    assert "hold_secs" not in cfg.plugins["presence"]
+    assert cfg.plugins["presence"]["sources"] == [{"kind": "file", "path": "/x"}]
+    warned = caplog.text
+    for path in ("plugins.weather", "plugins.presence.hold_secs", "sources[0].pth"):
+        assert path in warned
+
+
+def test_boolean_words(make_config: Callable[..., dict[str, Any]]) -> None:
+    # bool("no") would be True; quoted words mean what they say.
+    assert validate(make_config(state={"enabled": "no"})).state.enabled is False
+    assert validate(make_config(state={"enabled": "Yes"})).state.enabled is True
+    assert validate(make_config(state={"enabled": 0})).state.enabled is False
+    with pytest.raises(ConfigError, match=r"state\.enabled"):
+        validate(make_config(state={"enabled": "sometimes"}))
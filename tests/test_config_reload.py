@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from kiosk_control import config as config_mod
+from kiosk_control.config import ConfigError, diff, load, validate
+from kiosk_control.controller import Controller
+
+
+def _cfg(**overrides: Any) -> dict[str, Any]:
+    cfg: dict[str, Any] = {
+        "security": {"allow_insecure": True},
+        "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+        "views": {"a": "http://a", "b": "http://b"},
+        "playlist": [{"view": "a", "seconds": 10}, {"view": "b", "seconds": 5}],
+        "policy": {
+            "idle_off_seconds": 60,
+            "manual_timeout_seconds": 10,
+            "hypo_threshold_mmol": 5,
+            "trending_guard_mmol": 0.5,
+        },
+        "screen": {"backlight_sysfs": "/tmp"},
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+def test_error_path_names_playlist_item() -> None:
+    cfg = _cfg(playlist=[{"view": "a", "seconds": 10}, {"view": "a", "seconds": "x"}])
+    with pytest.raises(ConfigError, match=r"playlist\[1\]\.seconds"):
+        validate(cfg)
+
+
+def test_error_path_names_missing_policy_key() -> None:
+    cfg = _cfg(policy={"idle_off_seconds": 60, "trending_guard_mmol": 0.5})
+    with pytest.raises(ConfigError, match=r"policy\.hypo_threshold_mmol"):
+        validate(cfg)
+
+
+def test_load_caches_until_file_changes(tmp_path: Path, monkeypatch) -> None:
+    p = tmp_path / "kiosk.yaml"
+    p.write_text(yaml.safe_dump(_cfg()), encoding="utf-8")
+
+    calls = 0
+    real_load = yaml.load
+
+    def counting_load(*args: Any, **kwargs: Any) -> Any:
+        nonlocal calls
+        calls += 1
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(config_mod.yaml, "load", counting_load)
+    first = load(p)
+    assert load(p) is first
+    assert calls == 1
+
+    p.write_text(
+        yaml.safe_dump(_cfg(views={"a": "http://a2"}, playlist=[{"view": "a", "seconds": 1}]))
+    )
+    assert load(p).views["a"].url == "http://a2"
+    assert calls == 2
+
+
+def test_diff_reports_changed_sections_and_plugins() -> None:
+    old = validate(_cfg(plugins={"presence": {"enabled": False}}))
+    new = validate(
+        _cfg(
+            playlist=[{"view": "b", "seconds": 5}],
+            plugins={"presence": {"enabled": False, "hold_seconds": 5}},
+        )
+    )
+    d = diff(old, new)
+    assert d.sections == {"playlist"}
+    assert d.plugins == {"presence"}
+    assert not diff(old, validate(_cfg(plugins={"presence": {"enabled": False}})))
+
+
+class _NoBrowser:
+    def __getattr__(self, name: str) -> Any:
+        raise AssertionError(f"browser touched during reload: {name}")
+
+
+async def test_apply_config_updates_playlist_without_touching_browser() -> None:
+    ctl = Controller(validate(_cfg()))
+    ctl._chromium = ctl._main.window = _NoBrowser()  # type: ignore[assignment]
+    ctl._main.current_view = "b"
+    ctl.state.playlist_index = 1
+
+    new = validate(
+        _cfg(
+            views={"a": "http://a", "b": "http://b-new"},
+            playlist=[{"view": "a", "seconds": 3}],
+            policy={
+                "idle_off_seconds": 5,
+                "hypo_threshold_mmol": 4,
+                "trending_guard_mmol": 0.5,
+            },
+        )
+    )
+    await ctl.apply_config(new)
+
+    assert ctl.state.playlist_index == 0
+    assert ctl._main.playlist[0].seconds == 3
+    assert ctl._policy_cfg.idle_off_seconds == 5
+    # The URL of the visible view changed, so it is re-navigated on the next tick.
+    assert ctl._main.current_view is None
+
+
+async def test_reload_keeps_running_plugin_when_new_section_is_broken(tmp_path: Path) -> None:
+    sensor = tmp_path / "pir"
+    sensor.write_text("0", encoding="utf-8")
+    good = {"enabled": True, "sources": [{"kind": "file", "path": str(sensor)}]}
+    ctl = Controller(validate(_cfg(plugins={"presence": good})))
+    ctl._chromium = ctl._main.window = _NoBrowser()  # type: ignore[assignment]
+    await ctl._pm.start_all(ctl._ctx)
+    try:
+        base = validate(_cfg(playlist=[{"view": "b", "seconds": 5}], plugins={"presence": good}))
+        broken = [
+            # Fails to build: unknown source key.
+            {"enabled": True, "sources": [{"kind": "file", "path": str(sensor), "pth": "x"}]},
+            # Fails to start: no sources.
+            {"enabled": True, "sources": []},
+        ]
+        for section in broken:
+            await ctl.apply_config(replace(base, plugins={"presence": section}))
+            assert ctl.cfg.plugins["presence"] == good
+            (plugin,) = ctl._pm.plugins
+            assert plugin.name == "presence" and plugin._task and not plugin._task.done()
+        # The rest of the reload still applied.
+        assert [item.view for item in ctl._main.playlist] == ["b"]
+    finally:
+        await ctl._pm.stop_all()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from kiosk_control.dbus_service import Callbacks, dispatch_action
+from kiosk_overlay.model import ControllerState, OptimisticState
+
+
+def _callbacks(calls: list[tuple[str, str]]) -> Callbacks:
+    return Callbacks(
+        set_view=lambda v: calls.append(("set_view", v)),
+        set_auto=lambda: calls.append(("set_auto", "")),
+        next_view=lambda: calls.append(("next", "")),
+        prev_view=lambda: calls.append(("prev", "")),
+        wake=lambda r: calls.append(("wake", r)),
+        sleep=lambda r: calls.append(("sleep", r)),
+        power_off=lambda r: True,
+        get_state=lambda: ("a", True, False, "recent_activity"),
+        get_views=lambda: ["a", "b"],
+        get_metrics=lambda: "{}",
+        dump_log=lambda _limit: "[]",
+        set_display_view=lambda _display, _view: True,
+        get_displays=lambda: [],
+    )
+
+
+def test_act_runs_command_then_wake() -> None:
+    calls: list[tuple[str, str]] = []
+    assert dispatch_action(_callbacks(calls), "SetView", "energy", "ui") is True
+    assert calls == [("set_view", "energy"), ("wake", "ui")]
+
+
+def test_act_rejects_unknown_action_without_waking() -> None:
+    calls: list[tuple[str, str]] = []
+    assert dispatch_action(_callbacks(calls), "PowerOff", "", "ui") is False
+    assert calls == []
+
+
+def test_optimistic_state_predicts_and_confirms() -> None:
+    st = OptimisticState(confirmed=ControllerState(view="a", manual=False))
+    assert st.predict("SetView", "b").view == "b"
+    assert st.current.manual is True
+
+    st.confirm(ControllerState(view="b", manual=True, why="manual_override"))
+    assert st.pending is None
+    assert st.current.view == "b"
+
+
+def test_optimistic_state_reverts_on_failure() -> None:
+    st = OptimisticState(confirmed=ControllerState(view="a"))
+    st.predict("SetView", "b")
+    assert st.revert().view == "a"
+    assert st.current.view == "a"
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from kiosk_control.config import ConfigError, WindowConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.display import Display
+from kiosk_control.memory_watchdog import MemoryWatchdog
+from kiosk_control.metrics import Metrics
+
+FAKE_CHROMIUM = Path(__file__).parent / "data" / "fake_chromium.py"
+
+
+def _raw(tmp_path: Path, displays: list[dict[str, Any]]) -> dict[str, Any]:
+    chromium = tmp_path / "chromium"
+    chromium.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_CHROMIUM}" "$@"\n')
+    chromium.chmod(0o755)
+    return {
+        "security": {"allow_insecure": True},
+        "chromium": {
+            "bin": str(chromium),
+            "user_data_dir": str(tmp_path / "profile"),
+            "extra_flags": [],
+        },
+        "views": {"a": "http://a", "b": "http://b", "c": "http://c"},
+        "playlist": [{"view": "a", "seconds": 10}],
+        "policy": {"idle_off_seconds": 60, "hypo_threshold_mmol": 4, "trending_guard_mmol": 0.5},
+        "screen": {"backlight_sysfs": str(tmp_path)},
+        "displays": displays,
+    }
+
+
+def _right(**screen: Any) -> dict[str, Any]:
+    return {
+        "name": "right",
+        "window": {"x": 1920, "width": 1280, "height": 800},
+        "playlist": [{"view": "b", "seconds": 30}, {"view": "c", "seconds": 30}],
+        "screen": screen,
+    }
+
+
+def test_displays_config(tmp_path: Path) -> None:
+    cfg = validate(_raw(tmp_path, [_right(power_off_command=["wlr-randr", "--off"])]))
+    (right,) = cfg.displays
+    assert right.window == WindowConfig(x=1920, y=0, width=1280, height=800, fullscreen=True)
+    assert [item.view for item in right.playlist] == ["b", "c"]
+    assert right.screen.backlight_sysfs == ""
+    assert right.power_off_command == ("wlr-randr", "--off")
+
+    with pytest.raises(ConfigError, match=r"displays\[0\].window"):
+        validate(_raw(tmp_path, [{"name": "x", "playlist": [{"view": "a", "seconds": 5}]}]))
+    with pytest.raises(ConfigError, match="primary display"):
+        validate(_raw(tmp_path, [{**_right(), "name": "main"}]))
+    with pytest.raises(ConfigError, match="unique"):
+        validate(_raw(tmp_path, [_right(), _right()]))
+    with pytest.raises(ConfigError, match=r"displays\[0\].playlist"):
+        validate(_raw(tmp_path, [{**_right(), "playlist": [{"view": "nope", "seconds": 5}]}]))
+    raw = _raw(tmp_path, [_right()])
+    raw["schedules"] = [_evening(left=[{"view": "c", "seconds": 5}])]
+    with pytest.raises(ConfigError, match=r"schedules\[0\].displays.left: unknown display"):
+        validate(raw)
+
+
+def _evening(**displays: Any) -> dict[str, Any]:
+    return {
+        "name": "evening",
+        "windows": [{"days": "daily", "start": "00:00", "end": "24:00"}],
+        "playlist": [{"view": "c", "seconds": 20}],
+        "displays": displays,
+    }
+
+
+def test_schedule_playlists_apply_to_every_display(tmp_path: Path) -> None:
+    raw = _raw(tmp_path, [_right()])
+    raw["schedules"] = [_evening(right=[{"view": "a", "seconds": 15}])]
+    ctl = Controller(validate(raw))
+    (dcfg,) = ctl.cfg.displays
+    right = ctl._display(dcfg, window=None)  # type: ignore[arg-type]
+    ctl._displays = [right]
+
+    ctl._update_schedule(time.time())
+    assert [item.view for item in ctl._main.playlist] == ["c"]
+    assert [item.view for item in right.playlist] == ["a"]
+
+
+def _navigations(tmp_path: Path) -> list[tuple[str | None, str]]:
+    log = tmp_path / "profile" / "navigations.jsonl"
+    return [(e["session"], e["url"]) for e in map(json.loads, log.read_text().splitlines())]
+
+
+async def test_controller_drives_a_second_window(tmp_path: Path) -> None:
+    ctl = Controller(validate(_raw(tmp_path, [_right()])))
+    await ctl._chromium.start()
+    try:
+        await ctl._apply_displays(ctl.cfg.displays)
+        (right,) = ctl._displays
+        assert right.window._session_id == "session-2"
+
+        now = time.time()
+        ctl.facts["activity.last_ts"] = now
+        await ctl._tick_display(right, now, False)
+        assert _navigations(tmp_path) == [("session-2", "http://b")]
+
+        assert ctl.set_display_view("right", "c")
+        assert not ctl.set_display_view("left", "c")
+        assert not ctl.set_display_view("right", "nope")
+        await ctl._tick_display(right, time.time(), False)
+        assert _navigations(tmp_path)[-1] == ("session-2", "http://c")
+        displays = dict((name, rest) for name, *rest in ctl.get_displays())
+        assert displays["right"][:3] == ["c", True, True]
+        assert displays["main"][2] is False
+
+        assert ctl.set_display_view("right", "")
+        assert not right.manual_active(time.time())
+
+        assert ctl.metrics.snapshot()["display.right.navigations.full"] == 2
+
+        # A reload without the display closes its window.
+        await ctl._apply_displays([])
+        assert ctl._displays == []
+    finally:
+        await ctl._chromium.close()
+
+
+async def test_first_playlist_item_gets_its_full_time(tmp_path: Path) -> None:
+    ctl = Controller(validate(_raw(tmp_path, [_right()])))
+    await ctl._chromium.start()
+    try:
+        await ctl._apply_displays(ctl.cfg.displays)
+        (right,) = ctl._displays
+        now = time.time()
+        ctl.facts["activity.last_ts"] = now
+        await ctl._tick_display(right, now, False)
+        await ctl._tick_display(right, now + 1, False)
+        assert _navigations(tmp_path) == [("session-2", "http://b")]
+
+        # The step happens after this tick's decision; the next tick shows it.
+        ctl.facts["activity.last_ts"] = now + 31
+        await ctl._tick_display(right, now + 31, False)
+        await ctl._tick_display(right, now + 32, False)
+        assert _navigations(tmp_path)[-1] == ("session-2", "http://c")
+    finally:
+        await ctl._chromium.close()
+
+
+async def test_display_power_command_and_backlight(tmp_path: Path) -> None:
+    sysfs = tmp_path / "bl"
+    sysfs.mkdir()
+    for name in ("bl_power", "brightness"):
+        (sysfs / name).write_text("0", encoding="utf-8")
+    marker = tmp_path / "off"
+    raw = _right(backlight_sysfs=str(sysfs), power_off_command=["touch", str(marker)])
+    cfg = validate(_raw(tmp_path, [raw]))
+    (dcfg,) = cfg.displays
+    memwatch = MemoryWatchdog(cfg.chromium.memory_watchdog)
+    display = Display(dcfg, None, Metrics(), cfg.chromium, memwatch)  # type: ignore[arg-type]
+
+    await display.set_screen(False)
+    assert (sysfs / "brightness").read_text() == "40"
+    assert not display.screen_on
+    # The command runs beside the tick instead of holding it up.
+    assert display._power_task is not None and not marker.exists()
+    await display.stop()
+    assert marker.exists()
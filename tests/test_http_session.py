@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import socketio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from kiosk_control.config import HttpConfig
+from kiosk_control.httpclient import create_session, shared_ssl_context
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.homeassistant import HomeAssistantConfig, HomeAssistantWsPlugin
+from kiosk_control.plugins.nightscout import NightscoutConfig, NightscoutV3SocketPlugin
+
+
+async def test_session_pools_per_host_and_caches_dns() -> None:
+    session = create_session(HttpConfig(limit=8, limit_per_host=2, dns_ttl_seconds=60))
+    try:
+        conn = session.connector
+        assert conn is not None
+        assert (conn.limit, conn.limit_per_host) == (8, 2)
+        assert conn.use_dns_cache  # type: ignore[attr-defined]
+    finally:
+        await session.close()
+    assert shared_ssl_context() is shared_ssl_context()
+
+
+async def _fake_home_assistant(request: web.Request) -> web.WebSocketResponse:
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    await ws.send_json({"type": "auth_required"})
+    assert (await ws.receive_json())["access_token"] == "t"
+    await ws.send_json({"type": "auth_ok"})
+    await ws.receive_json()  # subscribe_events
+    for entity, state in (("sun.sun", "above_horizon"), ("sensor.p", "900"), ("sensor.c", "300")):
+        await ws.send_json(
+            {
+                "type": "event",
+                "event": {
+                    "event_type": "state_changed",
+                    "data": {"entity_id": entity, "new_state": {"state": state}},
+                },
+            }
+        )
+    await ws.receive()
+    return ws
+
+
+def _ha_config(url: str) -> HomeAssistantConfig:
+    return HomeAssistantConfig(
+        ws_url=url,
+        token="t",
+        entity_sun="sun.sun",
+        entity_production_w="sensor.p",
+        entity_consumption_w="sensor.c",
+        min_surplus_w=500,
+        require_sun_above_horizon=True,
+        reconnect_min_seconds=0.01,
+    )
+
+
+async def test_home_assistant_uses_shared_session() -> None:
+    app = web.Application()
+    app.router.add_get("/api/websocket", _fake_home_assistant)
+    async with TestServer(app) as server:
+        session = create_session()
+        ctx = PluginContext({}, http=session)
+        plugin = HomeAssistantWsPlugin(_ha_config(str(server.make_url("/api/websocket"))))
+        await plugin.start(ctx)
+        try:
+            for _ in range(200):
+                if ctx.facts.get("ha.energy_good"):
+                    break
+                await asyncio.sleep(0.01)
+            assert ctx.facts["ha.connected"] is True
+            assert ctx.facts["ha.energy_good"] is True
+        finally:
+            await plugin.stop()
+            assert not session.closed  # owned by the controller, not the plugin
+            await session.close()
+
+
+async def test_home_assistant_reconnects() -> None:
+    connections = 0
+
+    async def flaky(request: web.Request) -> web.WebSocketResponse:
+        nonlocal connections
+        connections += 1
+        if connections == 1:
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await ws.close()  # dropped before the handshake
+            return ws
+        return await _fake_home_assistant(request)
+
+    app = web.Application()
+    app.router.add_get("/api/websocket", flaky)
+    async with TestServer(app) as server:
+        session = create_session()
+        ctx = PluginContext({}, http=session)
+        plugin = HomeAssistantWsPlugin(_ha_config(str(server.make_url("/api/websocket"))))
+        await plugin.start(ctx)
+        try:
+            for _ in range(200):
+                if ctx.facts.get("ha.energy_good"):
+                    break
+                await asyncio.sleep(0.01)
+            assert connections == 2
+            assert ctx.facts["ha.connected"] is True
+            assert ctx.facts["ha.energy_good"] is True
+        finally:
+            await plugin.stop()
+            await session.close()
+
+
+async def test_nightscout_passes_shared_session(monkeypatch) -> None:
+    seen: dict[str, Any] = {}
+
+    class FakeClient:
+        def __init__(self, **kwargs: Any) -> None:
+            seen.update(kwargs)
+
+        def event(self, namespace: str | None = None) -> Any:
+            return lambda f: f
+
+        def on(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+        async def connect(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+        async def disconnect(self) -> None:
+            pass
+
+    monkeypatch.setattr(socketio, "AsyncClient", FakeClient)
+    session = create_session()
+    plugin = NightscoutV3SocketPlugin(
+        NightscoutConfig(base_url="http://ns", access_token="x", collections=[], stale_seconds=60)
+    )
+    await plugin.start(PluginContext({}, http=session))
+    await asyncio.sleep(0.05)
+    await plugin.stop()
+    await session.close()
+    assert seen["http_session"] is session
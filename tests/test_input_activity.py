@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import suppress
+from pathlib import Path
+from types import SimpleNamespace
+
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.input_activity import (
+    EV_ABS,
+    EV_KEY,
+    ActivityThrottle,
+    InputActivityConfig,
+    InputActivityPlugin,
+    classify_event,
+)
+
+EV_SYN = 0x00
+BTN_TOUCH = 0x14A
+KEY_A = 30
+
+
+class FakeDevice:
+    """evdev.InputDevice stand-in backed by a pipe so the loop selector sees it."""
+
+    def __init__(self, path: str, name: str) -> None:
+        self.path = path
+        self.name = name
+        self.phys = ""
+        self._r, self._w = os.pipe()
+        os.set_blocking(self._r, False)
+        self.fd = self._r
+        self._queue: list[SimpleNamespace] = []
+        self.closed = False
+
+    def push(self, *events: tuple[int, int]) -> None:
+        self._queue.extend(SimpleNamespace(type=t, code=c, value=1) for t, c in events)
+        os.write(self._w, b"x")
+
+    def read(self):
+        with suppress(BlockingIOError):
+            os.read(self._r, 4096)
+        if not self._queue:
+            raise BlockingIOError
+        events, self._queue = self._queue, []
+        yield from events
+
+    def close(self) -> None:
+        self.closed = True
+        os.close(self._r)
+        os.close(self._w)
+
+
+def _plugin(devices: dict[str, FakeDevice], **cfg) -> InputActivityPlugin:
+    return InputActivityPlugin(
+        InputActivityConfig(**cfg),
+        list_devices=lambda: list(devices),
+        open_device=lambda p: devices[p],
+    )
+
+
+def test_classify_event() -> None:
+    assert classify_event(EV_ABS, 0) == "touch"
+    assert classify_event(EV_KEY, BTN_TOUCH) == "touch"
+    assert classify_event(EV_KEY, KEY_A) == "key"
+    assert classify_event(EV_SYN, 0) is None
+
+
+def test_throttle_is_leading_edge() -> None:
+    t = ActivityThrottle(1.0)
+    assert t.allow("k", 10.0) is True
+    assert t.allow("k", 10.5) is False
+    assert t.allow("k", 11.0) is True
+
+
+async def test_watches_all_matching_devices_and_throttles(tmp_path: Path) -> None:
+    devices = {
+        "/dev/input/event0": FakeDevice("/dev/input/event0", "FT5406 touchscreen"),
+        "/dev/input/event1": FakeDevice("/dev/input/event1", "USB keyboard"),
+        "/dev/input/event2": FakeDevice("/dev/input/event2", "HDMI CEC"),
+    }
+    ctx = PluginContext({})
+    plugin = _plugin(
+        devices,
+        device_hint=["ft5406", "keyboard"],
+        min_interval_seconds=60.0,
+        input_dir=str(tmp_path),
+    )
+    await plugin.start(ctx)
+    try:
+        assert ctx.facts["activity.devices"] == 2
+        assert devices["/dev/input/event2"].closed
+
+        writes: list[str] = []
+        orig = ctx.set_fact
+        ctx.set_fact = lambda k, v: (writes.append(k), orig(k, v))  # type: ignore[method-assign]
+
+        for _ in range(200):
+            devices["/dev/input/event0"].push((EV_ABS, 0), (EV_SYN, 0))
+            await asyncio.sleep(0)
+        devices["/dev/input/event1"].push((EV_KEY, KEY_A))
+        await asyncio.sleep(0.01)
+
+        assert writes.count("activity.last_ts") == 1
+        assert writes.count("activity.touch_ts") == 1
+        assert writes.count("activity.key_ts") == 1
+    finally:
+        await plugin.stop()
+
+
+async def test_hotplug_picks_up_new_device(tmp_path: Path) -> None:
+    devices: dict[str, FakeDevice] = {}
+    ctx = PluginContext({})
+    plugin = _plugin(devices, device_hint=None, input_dir=str(tmp_path))
+    await plugin.start(ctx)
+    try:
+        assert ctx.facts["activity.devices"] == 0
+        path = str(tmp_path / "event5")
+        devices[path] = FakeDevice(path, "PIR sensor")
+        (tmp_path / "event5").write_text("", encoding="utf-8")
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if ctx.facts["activity.devices"] == 1:
+                break
+        assert ctx.facts["activity.devices"] == 1
+    finally:
+        await plugin.stop()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from fakes import KioskFactory
+
+from kiosk_control.config import LivenessConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.liveness import LivenessChecker
+
+CFG = LivenessConfig(
+    enabled=True,
+    heartbeat_failures=2,
+    min_interval_seconds=10,
+    max_interval_seconds=80,
+    stall_seconds=300,
+)
+
+
+def test_interval_backs_off_while_healthy() -> None:
+    c = LivenessChecker(CFG)
+    c.reset("a", 0)
+    intervals = []
+    for i in range(5):
+        assert c.observe(i * 100.0, True, frame=str(i)) is None
+        intervals.append(c.interval)
+    assert intervals == [20, 40, 80, 80, 80]
+    # One missed heartbeat is suspicious: sample fast again, but do not reload yet.
+    assert c.observe(600, False) is None
+    assert c.interval == 10
+    assert c.observe(610, False) == "hung"
+
+
+def test_unchanged_frames_mean_frozen() -> None:
+    c = LivenessChecker(CFG)
+    c.reset("a", 0)
+    assert c.observe(0, True, frame="x") is None
+    assert c.observe(100, True, frame="x") is None
+    assert c.interval == 40  # still within the first half of stall_seconds
+    assert c.observe(160, True, frame="x") is None
+    assert c.interval == 10
+    assert c.observe(300, True, frame="x") == "frozen"
+
+
+def test_views_without_frames_only_use_heartbeat() -> None:
+    c = LivenessChecker(CFG)
+    c.reset("a", 0)
+    for t in range(0, 10_000, 100):
+        assert c.observe(float(t), True) is None
+
+
+async def test_frame_hash_uses_downscaled_clip(make_kiosk: KioskFactory) -> None:
+    viewport = {"pageX": 0, "pageY": 0, "clientWidth": 1280, "clientHeight": 800}
+    k, cdp = make_kiosk(
+        {
+            "Page.getLayoutMetrics": {"cssVisualViewport": viewport},
+            "Page.captureScreenshot": {"data": "AAAA"},
+        }
+    )
+    assert await k.frame_hash() == await k.frame_hash()
+    shot = next(p for m, p in cdp.calls if m == "Page.captureScreenshot")
+    assert shot["clip"] == {"x": 0, "y": 0, "width": 1280, "height": 800, "scale": 0.1}
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.alive = True
+        self.actions: list[tuple[str, str]] = []
+
+    async def heartbeat(self, timeout_seconds: float = 2.0) -> bool:
+        return self.alive
+
+    async def frame_hash(self, scale: float = 0.1) -> str:
+        return "same"
+
+    async def recycle(self, url: str) -> None:
+        self.actions.append(("recycle", url))
+
+    async def navigate(self, url: str, soft: bool = False) -> bool:
+        self.actions.append(("navigate", url))
+        return False
+
+
+@pytest.fixture
+def controller(make_config: Callable[..., dict[str, Any]]) -> tuple[Controller, FakeBrowser]:
+    cfg = make_config(
+        chromium={"liveness": {"enabled": True, "stall_seconds": 0}},
+        views={"a": "http://a", "clock": {"url": "http://clock", "should_change": True}},
+        playlist=[{"view": "a", "seconds": 600}],
+    )
+    ctl = Controller(validate(cfg))
+    browser = FakeBrowser()
+    ctl._chromium = ctl._main.window = browser  # type: ignore[assignment]
+    return ctl, browser
+
+
+async def test_hung_page_is_recycled(controller: tuple[Controller, FakeBrowser]) -> None:
+    ctl, browser = controller
+    ctl._main.current_view = "a"
+    browser.alive = False
+    await ctl._check_liveness()
+    assert browser.actions == []
+    await ctl._check_liveness()
+    assert browser.actions == [("recycle", "http://a")]
+    assert ctl.metrics.get("liveness.hung.a") == 1
+
+
+async def test_frozen_render_is_reloaded(controller: tuple[Controller, FakeBrowser]) -> None:
+    ctl, browser = controller
+    ctl._main.current_view = "clock"
+    await ctl._check_liveness()
+    await ctl._check_liveness()
+    assert browser.actions == [("navigate", "http://clock")]
+
+    # Screen off: the page is frozen on purpose and never checked.
+    browser.actions.clear()
+    ctl._main.screen_on = False
+    for _ in range(3):
+        await ctl._check_liveness()
+    assert browser.actions == []
@@ -0,0 +1,346 @@
+"""End-to-end load harness: the real controller process against local stand-ins.
+
+``kiosk-control run`` is started as a subprocess with a fake Chromium
+(``data/fake_chromium.py``, which logs every ``Page.navigate``), a Home
+Assistant websocket that blasts ``state_changed`` events, a Nightscout
+Socket.IO server, a backlight directory and a private D-Bus session bus.
+While HA events stream in, Nightscout readings toggle the hypo alert; the time
+from a reading to the resulting navigation is the decision latency. CPU time
+and RSS of the controller process come from ``/proc``.
+
+The defaults keep the run short; scale it up for soak runs and keep the report:
+
+    KIOSK_LOAD_SECONDS=600 KIOSK_LOAD_RATE=5000 KIOSK_LOAD_REPORT=load.json \\
+        python -m pytest tests/test_load.py -s
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aiohttp import web
+
+from kiosk_overlay.dbus_client import KioskDbusClient
+
+socketio = pytest.importorskip("socketio")
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("dbus-daemon") is None or not Path("/proc/self/stat").exists(),
+    reason="needs dbus-daemon and /proc",
+)
+
+SECONDS = float(os.environ.get("KIOSK_LOAD_SECONDS", "4"))
+RATE = int(os.environ.get("KIOSK_LOAD_RATE", "5000"))
+
+# Regression gates. Generous for shared CI machines; a kiosk ticks every 250 ms.
+MAX_DECISION_P95_MS = 1000.0
+MAX_DRAIN_MS = 2000.0
+MAX_CPU_US_PER_EVENT = 1000.0
+MAX_RSS_GROWTH_MB = 32.0
+
+FAKE_CHROMIUM = Path(__file__).parent / "data" / "fake_chromium.py"
+URL_A = "http://a.invalid/"
+URL_B = "http://b.invalid/"
+URL_NS = "http://nightscout.invalid/"
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _cpu_seconds(pid: int) -> float:
+    # Fields after the parenthesised command name; utime and stime are 14 and 15.
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _rss_mb(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class FakeHomeAssistant:
+    """``/api/websocket``: accepts any token, then streams events on demand."""
+
+    def __init__(self) -> None:
+        self.subscribed = asyncio.Event()
+        self._ws: web.WebSocketResponse | None = None
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required"})
+        await ws.receive_json()
+        await ws.send_json({"type": "auth_ok"})
+        sub = await ws.receive_json()
+        await ws.send_json({"id": sub["id"], "type": "result", "success": True})
+        self._ws = ws
+        self.subscribed.set()
+        async for _msg in ws:
+            pass
+        return ws
+
+    async def blast(self, n: int, rate: int) -> None:
+        """Send ``n`` events at ``rate``/s; the last sets production to ``n``."""
+
+        assert self._ws is not None
+        loop = asyncio.get_running_loop()
+        batch = max(1, rate // 100)
+        t0 = loop.time()
+        for i in range(1, n + 1):
+            entity = "sensor.production" if i % 2 or i == n else "sensor.consumption"
+            event = {"entity_id": entity, "new_state": {"state": str(i)}}
+            await self._ws.send_str(
+                json.dumps(
+                    {"type": "event", "event": {"event_type": "state_changed", "data": event}}
+                )
+            )
+            if i % batch == 0:
+                await asyncio.sleep(max(0.0, t0 + i / rate - loop.time()))
+
+
+class FakeNightscout:
+    """APIv3 ``/storage`` namespace: acknowledges subscriptions, pushes entries."""
+
+    def __init__(self) -> None:
+        self.sio = socketio.AsyncServer(async_mode="aiohttp")
+        self.subscribed = asyncio.Event()
+        self.sio.on("subscribe", self._on_subscribe, namespace="/storage")
+
+    async def _on_subscribe(self, _sid: str, _data: Any) -> dict[str, Any]:
+        self.subscribed.set()
+        return {"success": True, "collections": ["entries"]}
+
+    async def entry(self, sgv: float) -> None:
+        doc = {"sgv": sgv, "direction": "Flat", "date": int(time.time() * 1000)}
+        await self.sio.emit("create", {"colName": "entries", "doc": doc}, namespace="/storage")
+
+
+class Navigations:
+    """Tails the fake browser's navigation log."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._pos = 0
+        self.log: list[tuple[float, str]] = []
+
+    def _poll(self) -> None:
+        if not self._path.exists():
+            return
+        with self._path.open(encoding="utf-8") as f:
+            f.seek(self._pos)
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                self._pos += len(line.encode())
+                rec = json.loads(line)
+                self.log.append((rec["ts"], rec["url"]))
+
+    async def wait(self, urls: set[str], since: float, timeout: float = 10.0) -> float:
+        """Wall-clock time of the first navigation to one of ``urls`` after ``since``."""
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._poll()
+            for ts, url in self.log:
+                if ts >= since and url in urls:
+                    return ts
+            await asyncio.sleep(0.005)
+        raise TimeoutError(f"no navigation to {sorted(urls)} since {since}: {self.log[-5:]}")
+
+
+@pytest.fixture
+def bus_address() -> Any:
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    assert daemon.stdout
+    yield daemon.stdout.readline().strip()
+    daemon.terminate()
+    daemon.wait(5)
+
+
+def _config(tmp_path: Path, port: int, n: int) -> Path:
+    chromium = tmp_path / "chromium"
+    chromium.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_CHROMIUM}" "$@"\n')
+    chromium.chmod(0o755)
+    backlight = tmp_path / "backlight"
+    backlight.mkdir()
+    for name in ("bl_power", "brightness"):
+        (backlight / name).write_text("0", encoding="utf-8")
+    cfg = {
+        "security": {"allow_insecure": True},
+        "chromium": {
+            "bin": str(chromium),
+            "user_data_dir": str(tmp_path / "profile"),
+            "extra_flags": [],
+        },
+        "views": {"a": URL_A, "b": URL_B, "nightscout": URL_NS},
+        # "a" gives way to "b" once the last HA event has been processed.
+        "playlist": [
+            {"view": "a", "seconds": 3600, "when": f"ha.production_w != {n}"},
+            {"view": "b", "seconds": 3600},
+        ],
+        "policy": {
+            "idle_off_seconds": 3600,
+            "manual_timeout_seconds": 600,
+            "hypo_threshold_mmol": 4.0,
+            "trending_guard_mmol": 0.5,
+        },
+        "screen": {"backlight_sysfs": str(backlight)},
+        "plugins": {
+            "homeassistant": {
+                "enabled": True,
+                "ws_url": f"ws://127.0.0.1:{port}/api/websocket",
+                "token": "x",
+                "entity_sun": "sun.sun",
+                "entity_production_w": "sensor.production",
+                "entity_consumption_w": "sensor.consumption",
+                "min_surplus_w": 10**9,
+                "require_sun_above_horizon": False,
+            },
+            "nightscout": {
+                "enabled": True,
+                "base_url": f"http://127.0.0.1:{port}",
+                "access_token": "x",
+                "collections": ["entries"],
+                "stale_seconds": 900,
+            },
+        },
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(json.dumps(cfg), encoding="utf-8")  # JSON is YAML
+    return path
+
+
+async def _connect(bus_address: str, proc: subprocess.Popen, log: Path) -> KioskDbusClient:
+    deadline = time.monotonic() + 20
+    while True:
+        try:
+            return await KioskDbusClient.connect(bus_address)
+        except Exception as e:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                tail = log.read_text()[-4000:]
+                raise AssertionError(f"controller did not come up:\n{tail}") from e
+            await asyncio.sleep(0.1)
+
+
+async def test_controller_under_load(tmp_path: Path, bus_address: str) -> None:
+    n = max(2, int(RATE * SECONDS))
+    ha, ns = FakeHomeAssistant(), FakeNightscout()
+    app = web.Application()
+    app.router.add_get("/api/websocket", ha.handler)
+    ns.sio.attach(app)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    run_dir = tmp_path / "run"
+    run_dir.mkdir(mode=0o700)
+    env = {**os.environ, "DBUS_SESSION_BUS_ADDRESS": bus_address, "XDG_RUNTIME_DIR": str(run_dir)}
+    env.pop("NOTIFY_SOCKET", None)
+    log = tmp_path / "controller.log"
+    with log.open("wb") as out:
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "from kiosk_control.cli import main; main()",
+                "run",
+                "-c",
+                str(_config(tmp_path, port, n)),
+            ],
+            env=env,
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    navs = Navigations(tmp_path / "profile" / "navigations.jsonl")
+    client: KioskDbusClient | None = None
+    try:
+        client = await _connect(bus_address, proc, log)
+        await navs.wait({URL_A}, 0.0, timeout=20)
+        await asyncio.wait_for(ha.subscribed.wait(), 20)
+        await asyncio.wait_for(ns.subscribed.wait(), 20)
+        await asyncio.sleep(0.5)  # let start-up allocations settle
+
+        cpu0, rss0, started = _cpu_seconds(proc.pid), _rss_mb(proc.pid), time.time()
+        blast = asyncio.create_task(ha.blast(n, RATE))
+        decisions: list[float] = []
+        dbus: list[float] = []
+        while not blast.done():
+            sent = time.time()
+            await ns.entry(50)  # 2.8 mmol/l: alert
+            decisions.append(await navs.wait({URL_NS}, sent) - sent)
+            sent = time.time()
+            await ns.entry(120)
+            decisions.append(await navs.wait({URL_A, URL_B}, sent) - sent)
+            t0 = time.perf_counter()
+            await client.get_state()
+            dbus.append(time.perf_counter() - t0)
+            await asyncio.sleep(0.1)
+        await blast
+        sent_all = time.time()
+        drained = await navs.wait({URL_B}, started)
+        cpu = _cpu_seconds(proc.pid) - cpu0
+        rss = _rss_mb(proc.pid)
+        metrics = await client.get_metrics()
+    finally:
+        if client:
+            await client.close()
+        proc.send_signal(signal.SIGINT)
+        with suppress(subprocess.TimeoutExpired):
+            proc.wait(15)
+        with suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)  # the fake browser, if left behind
+        proc.wait()
+        await runner.cleanup()
+
+    report = {
+        "events": n,
+        "rate_per_s": RATE,
+        "seconds": sent_all - started,
+        "decision_latency": _stats(decisions),
+        "dbus_get_state": _stats(dbus),
+        "drain_ms": max(0.0, drained - sent_all) * 1000,
+        "cpu_us_per_event": cpu / n * 1e6,
+        "rss_mb": rss,
+        "rss_growth_mb": rss - rss0,
+        "loop": {k: v for k, v in metrics.items() if k.startswith("loop.")},
+        "navigations": len(navs.log),
+    }
+    print(json.dumps(report, indent=2))
+    if path := os.environ.get("KIOSK_LOAD_REPORT"):
+        Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    assert report["decision_latency"]["p95_ms"] < MAX_DECISION_P95_MS
+    assert report["drain_ms"] < MAX_DRAIN_MS
+    assert report["cpu_us_per_event"] < MAX_CPU_US_PER_EVENT
+    assert report["rss_growth_mb"] < MAX_RSS_GROWTH_MB
+    assert metrics.get("loop.stalls", 0) == 0
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from kiosk_control import logs
+from kiosk_control.config import ConfigError, LoggingConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.policy import Decision
+
+
+def _record(msg: str, *args: object, name: str = "kiosk_control.test") -> logging.LogRecord:
+    return logging.LogRecord(name, logging.WARNING, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_per_message_template() -> None:
+    now = [0.0]
+    limiter = logs.RateLimitFilter(burst=3, window=60, clock=lambda: now[0])
+    passed = [limiter.filter(_record("reconnect to %s failed", f"host{i}")) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    # Another template (or logger) has its own budget.
+    assert limiter.filter(_record("other"))
+    assert limiter.filter(_record("reconnect to %s failed", "x", name="kiosk_control.other"))
+    assert limiter.suppressed == 7
+
+    now[0] = 61.0
+    rec = _record("reconnect to %s failed", "host")
+    assert limiter.filter(rec)
+    assert rec.suppressed == 7  # type: ignore[attr-defined]
+
+
+@pytest.fixture
+def setup_json() -> tuple[io.StringIO, logs.LogSetup]:
+    stream = io.StringIO()
+    handle = logs.setup(LoggingConfig(format="json", ring_size=5, rate_limit_burst=2), stream)
+    yield stream, handle
+    handle.stop()
+    logs._context.clear()
+
+
+def test_records_are_written_off_thread_as_json_with_context(
+    setup_json: tuple[io.StringIO, logs.LogSetup],
+) -> None:
+    stream, handle = setup_json
+    writers: list[str] = []
+    real = handle.ring.emit
+
+    def spy(record: logging.LogRecord) -> None:
+        writers.append(threading.current_thread().name)
+        real(record)
+
+    handle.ring.emit = spy  # type: ignore[method-assign]
+    log = logging.getLogger("kiosk_control.test")
+    logs.set_context(view="energy", why="energy_good")
+    for i in range(4):
+        log.warning("plugin %s disconnected", "ha", extra={"attempt": i})
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        log.exception("tick failed")
+    handle.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["msg"] for line in lines] == ["plugin ha disconnected"] * 2 + ["tick failed"]
+    first = lines[0]
+    assert first["level"] == "WARNING" and first["logger"] == "kiosk_control.test"
+    assert first["view"] == "energy" and first["why"] == "energy_good"
+    assert first["attempt"] == 0
+    assert "RuntimeError: boom" in lines[2]["exc"]
+    assert writers and threading.main_thread().name not in writers
+
+    assert [r["msg"] for r in handle.ring.recent(1)] == ["tick failed"]
+    assert handle.limiter.suppressed == 2
+
+
+def test_text_format_appends_fields() -> None:
+    record = _record("decision: %s", "a")
+    record.why = "recent_activity"
+    line = logs.TextFormatter().format(record)
+    assert line.endswith("decision: a (why=recent_activity)")
+
+
+async def test_controller_dumps_recent_records_and_logs_decisions(
+    setup_json: tuple[io.StringIO, logs.LogSetup],
+) -> None:
+    _stream, handle = setup_json
+    ctl = Controller(
+        validate(
+            {
+                "security": {"allow_insecure": True},
+                "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+                "views": {"a": "http://a"},
+                "playlist": [{"view": "a", "seconds": 10}],
+                "policy": {
+                    "idle_off_seconds": 60,
+                    "hypo_threshold_mmol": 4,
+                    "trending_guard_mmol": 0.5,
+                },
+                "screen": {"backlight_sysfs": "/tmp"},
+            }
+        )
+    )
+    ctl._log_decision(Decision(screen_on=True, view="a", why="recent_activity"))
+    ctl._log_decision(Decision(screen_on=True, view="a", why="recent_activity"))
+    handle.listener.stop()  # flush the queue
+    handle.listener.start()
+
+    dumped = json.loads(ctl.dump_log(10))
+    decisions = [r for r in dumped if r["msg"].startswith("decision")]
+    assert len(decisions) == 1
+    assert decisions[0]["why"] == "recent_activity" and decisions[0]["screen_on"] is True
+    assert json.loads(ctl.get_metrics())["log.suppressed"] == 0
+
+
+def test_logging_config_validation() -> None:
+    base = {
+        "security": {"allow_insecure": True},
+        "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+        "views": {"a": "http://a"},
+        "playlist": [{"view": "a", "seconds": 10}],
+        "policy": {"idle_off_seconds": 60, "hypo_threshold_mmol": 4, "trending_guard_mmol": 0.5},
+        "screen": {"backlight_sysfs": "/tmp"},
+    }
+    assert validate({**base, "logging": {"level": "debug"}}).logging.level == "DEBUG"
+    with pytest.raises(ConfigError, match="logging.format"):
+        validate({**base, "logging": {"format": "xml"}})
+    with pytest.raises(ConfigError, match="logging.level"):
+        validate({**base, "logging": {"level": "loud"}})
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fakes import FakeCdp, KioskFactory
+
+from kiosk_control.cdp import ChromiumKiosk
+from kiosk_control.config import MemoryWatchdogConfig, WindowConfig
+from kiosk_control.memory_watchdog import MemorySample, MemoryWatchdog
+from kiosk_control.system import procstat
+from kiosk_control.system.procstat import rss_bytes
+
+
+def test_watchdog_marks_view_once_and_keeps_series() -> None:
+    wd = MemoryWatchdog(MemoryWatchdogConfig(enabled=True, heap_limit_mb=100, history=3))
+    assert wd.record("ha", MemorySample(1, 50, 300)) is None
+    assert wd.record("ha", MemorySample(2, 120, 300)) == "heap"
+    assert wd.record("ha", MemorySample(3, 130, 300)) is None  # already pending
+    wd.record("ha", MemorySample(4, 140, 300))
+    assert len(wd.series["ha"]) == 3
+    assert wd.pending("ha") and not wd.pending("energy")
+
+    wd.clear("ha")
+    assert not wd.pending("ha")
+
+
+def test_watchdog_rss_limit_fires_one_refresh() -> None:
+    wd = MemoryWatchdog(MemoryWatchdogConfig(enabled=True, rss_limit_mb=500))
+    assert wd.record("ha", MemorySample(1, 10, 499)) is None
+    assert wd.record("ha", MemorySample(2, 10, 501)) == "rss"
+    # Browser-wide: whichever view is visible gets the refresh, and only once.
+    assert wd.record("energy", MemorySample(3, 10, 520)) is None
+    assert wd.pending("energy") and not wd.pending(None)
+
+    wd.refreshed("energy")
+    assert not wd.pending("ha") and not wd.pending("energy")
+    # Still over the limit after the refresh: no refresh loop until it drops below.
+    assert wd.record("ha", MemorySample(4, 10, 510)) is None
+    assert wd.record("ha", MemorySample(5, 10, 400)) is None
+    assert wd.record("ha", MemorySample(6, 10, 505)) == "rss"
+
+
+def test_rss_bytes_from_statm(tmp_path: Path) -> None:
+    for pid, resident in ((10, 100), (11, 50)):
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "statm").write_text(f"9999 {resident} 0 0 0 0 0\n")
+    assert rss_bytes([10, 11, 12], proc=tmp_path) == 150 * procstat._PAGE_SIZE
+
+
+RESULTS = {
+    "Performance.getMetrics": {"metrics": [{"name": "Nodes", "value": 1200}]},
+    "Runtime.getHeapUsage": {"usedSize": 64 * 2**20, "totalSize": 80 * 2**20},
+    "Target.createTarget": {"targetId": "T2"},
+    "Target.attachToTarget": {"sessionId": "S2"},
+    "Browser.getWindowForTarget": {"windowId": 7},
+}
+
+
+@pytest.fixture
+def kiosk(make_kiosk: KioskFactory) -> tuple[ChromiumKiosk, FakeCdp]:
+    return make_kiosk(RESULTS, session_id="S1", target_id="T1")
+
+
+async def test_sample_memory_combines_metrics_and_heap(
+    kiosk: tuple[ChromiumKiosk, FakeCdp],
+) -> None:
+    k, _cdp = kiosk
+    m = await k.sample_memory()
+    assert m["Nodes"] == 1200
+    assert m["HeapUsed"] == 64 * 2**20
+
+
+async def test_recycle_swaps_target_and_closes_old(kiosk: tuple[ChromiumKiosk, FakeCdp]) -> None:
+    k, cdp = kiosk
+    await k.recycle("https://ha.example/lovelace/0")
+    methods = cdp.methods()
+    assert methods.index("Target.createTarget") < methods.index("Target.closeTarget")
+    close = cdp.calls.index(("Target.closeTarget", {"targetId": "T1"}))
+    assert cdp.session_ids[close] is None  # sent to the browser, not the old page
+    assert k._session_id == "S2"
+
+
+async def test_recycle_keeps_a_secondary_window_in_place(
+    kiosk: tuple[ChromiumKiosk, FakeCdp],
+) -> None:
+    k, cdp = kiosk
+    bounds = WindowConfig(x=1920, y=0, width=1280, height=800, fullscreen=True)
+    await k.recycle("https://ha.example/lovelace/1", bounds)
+    created = cdp.calls[cdp.methods().index("Target.createTarget")][1]
+    assert created == {"url": "https://ha.example/lovelace/1", "newWindow": True}
+    placed = [p["bounds"] for m, p in cdp.calls if m == "Browser.setWindowBounds"]
+    assert {"left": 1920, "top": 0, "width": 1280, "height": 800} in placed
+    assert cdp.methods().index("Browser.setWindowBounds") < cdp.methods().index(
+        "Target.closeTarget"
+    )
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import struct
+from typing import Any
+
+import pytest
+
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.mqtt import (
+    MqttConfig,
+    MqttPlugin,
+    MqttTopicConfig,
+    match_topic,
+)
+from kiosk_control.plugins.selectors import check_fact_template
+
+
+def test_match_topic() -> None:
+    assert match_topic("sensors/+/temp", "sensors/kitchen/temp") == ["kitchen"]
+    assert match_topic("sensors/#", "sensors/a/b") == ["a/b"]
+    assert match_topic("sensors/+/temp", "sensors/kitchen/humidity") is None
+    assert match_topic("a/b", "a/b/c") is None
+    assert match_topic("a/b/c", "a/b") is None
+
+
+def test_fact_template_must_fit_topic_filter() -> None:
+    check_fact_template("sensors/+/temp", "sensor.{1}.temp")
+    check_fact_template("weather", "weather.{0}")
+    for fact in ("sensor.{2}.temp", "sensor.{room}", "sensor.{"):
+        with pytest.raises(ValueError, match="fact"):
+            MqttPlugin(
+                MqttConfig(host="x", topics=[MqttTopicConfig(filter="sensors/+/t", fact=fact)])
+            )
+
+
+class CountingContext(PluginContext):
+    def __init__(self) -> None:
+        super().__init__({}, wakeup=asyncio.Event())
+        self.batches: list[dict[str, Any]] = []
+
+    def set_facts(self, values: Any) -> None:
+        self.batches.append(dict(values))
+        super().set_facts(values)
+
+
+def _plugin(port: int = 1883) -> MqttPlugin:
+    return MqttPlugin(
+        MqttConfig(
+            host="127.0.0.1",
+            port=port,
+            client_id="kiosk-test",
+            topics=[
+                MqttTopicConfig(filter="sensors/+/temp", fact="sensor.{1}.temp"),
+                MqttTopicConfig(filter="weather", fact="weather.wind", field="$.wind.speed"),
+            ],
+            reconnect_min_seconds=0.05,
+        )
+    )
+
+
+async def test_burst_is_published_as_one_batch() -> None:
+    ctx = CountingContext()
+    plugin = _plugin()
+    plugin._ctx = ctx
+    for i in range(100):
+        plugin.handle(f"sensors/room{i % 5}/temp", str(20 + i).encode())
+    plugin.handle("weather", b'{"wind": {"speed": 7.5}}')
+    plugin.handle("weather", b"not json")  # selector does not match text: ignored
+    await asyncio.sleep(0)
+    assert len(ctx.batches) == 1
+    assert ctx.facts["sensor.room4.temp"] == 119
+    assert ctx.facts["weather.wind"] == 7.5
+    assert ctx.wakeup is not None and ctx.wakeup.is_set()
+
+
+# --- minimal MQTT 3.1.1 broker stand-in -------------------------------------
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        n, digit = divmod(n, 128)
+        out.append(digit | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def _str(s: str) -> bytes:
+    b = s.encode()
+    return struct.pack("!H", len(b)) + b
+
+
+class Broker:
+    """Enough of MQTT 3.1.1 for one client: retained messages and persistent sessions."""
+
+    def __init__(self) -> None:
+        self.retained: dict[str, bytes] = {}
+        # client id -> subscribed filters (kept when clean_session is off)
+        self.sessions: dict[str, list[str]] = {}
+        self.offline_queue: dict[str, list[tuple[str, bytes]]] = {}
+        self.connects: list[tuple[str, bool, bool]] = []  # (id, clean_session, session_present)
+        self._writers: dict[str, asyncio.StreamWriter] = {}
+        self._next_id = 0
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._client, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self.drop_clients()
+        assert self.server
+        self.server.close()
+        await self.server.wait_closed()
+
+    def drop_clients(self) -> None:
+        for w in self._writers.values():
+            w.close()
+        self._writers.clear()
+
+    def publish(self, topic: str, payload: bytes, retain: bool = False) -> None:
+        if retain:
+            self.retained[topic] = payload
+        for cid, filters in self.sessions.items():
+            if not any(match_topic(f, topic) is not None for f in filters):
+                continue
+            if cid in self._writers:
+                self._send_publish(self._writers[cid], topic, payload)
+            else:
+                self.offline_queue.setdefault(cid, []).append((topic, payload))
+
+    def _send_publish(self, w: asyncio.StreamWriter, topic: str, payload: bytes) -> None:
+        self._next_id += 1
+        body = _str(topic) + struct.pack("!H", self._next_id) + payload
+        w.write(bytes([0x32]) + _varint(len(body)) + body)  # QoS 1
+
+    async def _read_packet(self, r: asyncio.StreamReader) -> tuple[int, bytes]:
+        first = (await r.readexactly(1))[0]
+        mult, length = 1, 0
+        while True:
+            digit = (await r.readexactly(1))[0]
+            length += (digit & 0x7F) * mult
+            mult *= 128
+            if not digit & 0x80:
+                break
+        return first, await r.readexactly(length)
+
+    async def _client(self, r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+        cid = ""
+        try:
+            while True:
+                first, body = await self._read_packet(r)
+                kind = first >> 4
+                if kind == 1:  # CONNECT
+                    name_len = struct.unpack("!H", body[:2])[0]
+                    flags = body[2 + name_len + 1]
+                    pos = 2 + name_len + 4
+                    cid_len = struct.unpack("!H", body[pos : pos + 2])[0]
+                    cid = body[pos + 2 : pos + 2 + cid_len].decode()
+                    clean = bool(flags & 0x02)
+                    present = not clean and cid in self.sessions
+                    if clean or cid not in self.sessions:
+                        self.sessions[cid] = []
+                    self.connects.append((cid, clean, present))
+                    self._writers[cid] = w
+                    w.write(bytes([0x20, 2, int(present), 0]))
+                    for topic, payload in self.offline_queue.pop(cid, []):
+                        self._send_publish(w, topic, payload)
+                elif kind == 8:  # SUBSCRIBE
+                    pid, pos, granted, new = body[:2], 2, [], []
+                    while pos < len(body):
+                        n = struct.unpack("!H", body[pos : pos + 2])[0]
+                        f = body[pos + 2 : pos + 2 + n].decode()
+                        granted.append(min(body[pos + 2 + n], 1))
+                        new.append(f)
+                        pos += 3 + n
+                    self.sessions[cid].extend(new)
+                    w.write(bytes([0x90]) + _varint(2 + len(granted)) + pid + bytes(granted))
+                    for topic, payload in self.retained.items():
+                        if any(match_topic(f, topic) is not None for f in new):
+                            self._send_publish(w, topic, payload)
+                elif kind == 12:  # PINGREQ
+                    w.write(bytes([0xD0, 0]))
+                elif kind == 14:  # DISCONNECT
+                    break
+                await w.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if self._writers.get(cid) is w:
+                del self._writers[cid]
+            w.close()
+
+
+async def _wait_for(pred: Any, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    while not pred():
+        if loop.time() > end:
+            raise AssertionError("condition not met")
+        await asyncio.sleep(0.01)
+
+
+async def test_retained_values_and_persistent_session() -> None:
+    pytest.importorskip("aiomqtt")
+    broker = Broker()
+    port = await broker.start()
+    broker.publish("sensors/hall/temp", b"19.5", retain=True)
+    broker.publish("weather", b'{"wind": {"speed": 3}}', retain=True)
+
+    ctx = CountingContext()
+    plugin = _plugin(port)
+    await plugin.start(ctx)
+    try:
+        await _wait_for(lambda: "weather.wind" in ctx.facts)
+        assert ctx.facts["sensor.hall.temp"] == 19.5
+        assert ctx.facts["mqtt.connected"] is True
+        assert broker.connects[0] == ("kiosk-test", False, False)
+
+        # Connection drops; a message sent meanwhile is kept by the broker session.
+        broker.drop_clients()
+        await _wait_for(lambda: ctx.facts["mqtt.connected"] is False)
+        broker.publish("sensors/hall/temp", b"21", retain=True)
+        await _wait_for(lambda: ctx.facts["sensor.hall.temp"] == 21)
+        assert broker.connects[-1] == ("kiosk-test", False, True)
+    finally:
+        await plugin.stop()
+        await broker.close()
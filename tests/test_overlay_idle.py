@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from kiosk_overlay.model import CollapseTimer
+
+
+class FakeScheduler:
+    """GLib.timeout_add stand-in on virtual time that counts wakeups."""
+
+    def __init__(self) -> None:
+        self.now_ms = 0
+        self.wakeups = 0
+        self._next_id = 0
+        self._sources: dict[int, tuple[int, Callable[[], bool]]] = {}
+
+    def timeout_add(self, ms: int, fn: Callable[[], bool]) -> int:
+        self._next_id += 1
+        self._sources[self._next_id] = (self.now_ms + ms, fn)
+        return self._next_id
+
+    def source_remove(self, source_id: int) -> bool:
+        return self._sources.pop(source_id, None) is not None
+
+    def advance(self, seconds: float) -> None:
+        end = self.now_ms + int(seconds * 1000)
+        while True:
+            due = [(t, sid) for sid, (t, _fn) in self._sources.items() if t <= end]
+            if not due:
+                break
+            t, sid = min(due)
+            self.now_ms = t
+            _t, fn = self._sources.pop(sid)
+            self.wakeups += 1
+            if fn():
+                self._sources[sid] = (t, fn)
+        self.now_ms = end
+
+    @property
+    def pending(self) -> int:
+        return len(self._sources)
+
+
+def test_collapse_timer_idles_after_collapse() -> None:
+    sched = FakeScheduler()
+    collapsed: list[bool] = []
+    timer = CollapseTimer(
+        5.0, sched.timeout_add, sched.source_remove, lambda: collapsed.append(True)
+    )
+
+    timer.touch()
+    sched.advance(2)
+    timer.touch()  # rescheduled, not stacked
+    assert sched.pending == 1
+
+    sched.advance(3600)
+    assert collapsed == [True]
+    assert timer.expanded is False
+    assert sched.pending == 0
+    # One wakeup for the collapse, none for the hour spent collapsed.
+    assert sched.wakeups == 1
+
+
+def test_collapse_timer_starts_collapsed_without_sources() -> None:
+    sched = FakeScheduler()
+    timer = CollapseTimer(5.0, sched.timeout_add, sched.source_remove, lambda: None)
+    sched.advance(86400)
+    assert timer.expanded is False
+    assert sched.pending == 0
+    assert sched.wakeups == 0
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from kiosk_control.conditions import compile_condition
+from kiosk_control.config import ConfigError, validate
+from kiosk_control.controller import Controller
+
+
+@pytest.mark.parametrize(
+    ("source", "facts", "expected"),
+    [
+        ("ha.production_w > 100", {"ha.production_w": 250.5}, True),
+        ("ha.production_w > 100", {"ha.production_w": 0}, False),
+        ("ha.production_w > 100", {}, False),
+        ("ha.production_w > 100", {"ha.production_w": "unavailable"}, False),
+        ("nightscout.stale == false", {"nightscout.stale": False}, True),
+        ("nightscout.stale == false", {}, False),
+        ("not nightscout.stale", {}, True),
+        ("weather.kind == 'rain' or weather.kind == \"snow\"", {"weather.kind": "snow"}, True),
+        ("a >= -2 and (b or not c)", {"a": -2, "c": False}, True),
+        ("a >= -2 and (b or not c)", {"a": -2, "c": True}, False),
+        ("rest.my-api.ok", {"rest.my-api.ok": True}, True),
+        ("x != null", {"x": 0}, True),
+    ],
+)
+def test_condition(source: str, facts: dict[str, Any], expected: bool) -> None:
+    assert compile_condition(source)(facts) is expected
+
+
+@pytest.mark.parametrize("source", ["", "a >", "a > > 1", "(a", "a ~ 1", "and"])
+def test_invalid_condition(source: str) -> None:
+    with pytest.raises(ValueError):
+        compile_condition(source)
+
+
+def _cfg(**overrides: Any) -> dict[str, Any]:
+    cfg: dict[str, Any] = {
+        "security": {"allow_insecure": True},
+        "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+        "views": {"ha": "http://ha", "energy": "http://energy", "ns": "http://ns"},
+        "playlist": [
+            {"view": "ha", "seconds": 10},
+            {"view": "energy", "seconds": 10, "when": "ha.production_w > 100"},
+            {"view": "ns", "seconds": 10, "when": "nightscout.stale == false"},
+        ],
+        "policy": {
+            "idle_off_seconds": 60,
+            "manual_timeout_seconds": 10,
+            "hypo_threshold_mmol": 4,
+            "trending_guard_mmol": 0.5,
+        },
+        "screen": {"backlight_sysfs": "/tmp"},
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+def test_config_compiles_once_and_names_bad_item() -> None:
+    a, b = validate(_cfg()), validate(_cfg())
+    assert a.playlist[1].when is not None
+    assert a.playlist[1].when.source == "ha.production_w > 100"
+    assert a.playlist == b.playlist  # compares by source, so reloads do not diff
+
+    bad = _cfg(playlist=[{"view": "ha", "seconds": 10, "when": "ha.x >"}])
+    with pytest.raises(ConfigError, match=r"playlist\[0\]\.when"):
+        validate(bad)
+
+
+def test_cycling_skips_items_and_counts_them() -> None:
+    ctl = Controller(validate(_cfg()))
+    ctl.facts.update({"ha.production_w": 0, "nightscout.stale": False})
+
+    assert ctl._main.step(1, ctl.facts)
+    assert ctl.state.playlist_index == 2  # energy skipped at night
+    assert ctl._main.step(1, ctl.facts)
+    assert ctl.state.playlist_index == 0
+    assert ctl.metrics.get("playlist.skipped.energy") == 1
+
+    # Solar comes up while energy would be next; Nightscout goes stale.
+    ctl.facts.update({"ha.production_w": 900, "nightscout.stale": True})
+    ctl._main.step(1, ctl.facts)
+    assert ctl.state.playlist_index == 1
+    ctl._main.step(1, ctl.facts)
+    assert ctl.state.playlist_index == 0
+    assert ctl.metrics.get("playlist.skipped.ns") == 1
+
+
+def test_current_item_is_left_when_its_condition_fails() -> None:
+    ctl = Controller(validate(_cfg()))
+    ctl.facts.update({"ha.production_w": 900})
+    ctl.state.playlist_index = 1
+    ctl._main.skip_ineligible(100.0, ctl.facts)
+    assert ctl.state.playlist_index == 1
+
+    ctl.facts["ha.production_w"] = 50
+    ctl._main.skip_ineligible(200.0, ctl.facts)
+    assert ctl.state.playlist_index == 0  # "ns" has no stale fact yet, so it is skipped too
+    assert ctl.state.last_switch_ts == 200.0
+    assert ctl.metrics.get("playlist.skipped.energy") == 1
+    assert ctl.metrics.get("playlist.skipped.ns") == 1
+
+
+def test_nothing_eligible_stays_put() -> None:
+    ctl = Controller(
+        validate(_cfg(playlist=[{"view": "energy", "seconds": 5, "when": "ha.production_w > 1"}]))
+    )
+    ctl._main.skip_ineligible(1.0, ctl.facts)
+    assert not ctl._main.step(1, ctl.facts)
+    assert ctl.state.playlist_index == 0
+    assert ctl.metrics.get("playlist.skipped.energy") is None
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.presence import (
+    Debouncer,
+    FileSource,
+    PresenceConfig,
+    PresencePlugin,
+)
+
+
+def test_debouncer_rise_and_hold() -> None:
+    d = Debouncer(rise_seconds=0.5, hold_seconds=10.0)
+    assert d.update(True, 0.0) is False
+    assert d.update(True, 0.6) is True
+    # A PIR pulse gap shorter than hold keeps presence.
+    assert d.update(False, 5.0) is True
+    assert d.update(False, 10.7) is False
+
+
+def test_debouncer_ignores_glitch() -> None:
+    d = Debouncer(rise_seconds=0.5, hold_seconds=1.0)
+    d.update(True, 0.0)
+    assert d.update(False, 0.1) is False
+    assert d.update(True, 0.2) is False
+
+
+def test_file_source_threshold(tmp_path: Path) -> None:
+    value = tmp_path / "in_proximity_raw"
+    value.write_text("120\n", encoding="utf-8")
+    src = FileSource(value, threshold=200)
+    assert src.read() is False
+    value.write_text("250\n", encoding="utf-8")
+    assert src.read() is True
+
+
+async def test_simulated_sysfs_gpio_wakes_controller(tmp_path: Path) -> None:
+    value = tmp_path / "value"
+    value.write_text("0\n", encoding="utf-8")
+    wakeup = asyncio.Event()
+    ctx = PluginContext({}, wakeup=wakeup)
+    plugin = PresencePlugin(
+        PresenceConfig(poll_interval_seconds=0.01, debounce_seconds=0.0, hold_seconds=0.05),
+        sources=[FileSource(value)],
+    )
+    await plugin.start(ctx)
+    try:
+        await asyncio.sleep(0.03)
+        assert ctx.facts["presence.detected"] is False
+        assert not wakeup.is_set()
+
+        value.write_text("1\n", encoding="utf-8")
+        await asyncio.wait_for(wakeup.wait(), 1.0)
+        assert ctx.facts["presence.detected"] is True
+        assert "activity.last_ts" in ctx.facts
+        assert plugin.screensaver_inhibit(ctx.facts) == (True, "presence.detected")
+
+        value.write_text("0\n", encoding="utf-8")
+        await asyncio.sleep(0.15)
+        assert ctx.facts["presence.detected"] is False
+    finally:
+        await plugin.stop()
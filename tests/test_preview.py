@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+
+import pytest
+from aiohttp import WSMsgType
+from aiohttp.test_utils import TestClient, TestServer
+
+from kiosk_control.cdp import FrameHandler
+from kiosk_control.config import PreviewConfig
+from kiosk_control.preview import PreviewServer
+
+
+class FakeSource:
+    def __init__(self) -> None:
+        self.handler: FrameHandler | None = None
+        self.acks: list[int] = []
+        self.stopped = 0
+
+    async def start_screencast(
+        self, handler: FrameHandler, quality: int, max_width: int, max_height: int
+    ) -> None:
+        self.handler = handler
+
+    async def ack_screencast_frame(self, ack_id: int) -> None:
+        self.acks.append(ack_id)
+
+    async def stop_screencast(self) -> None:
+        self.handler = None
+        self.stopped += 1
+
+    def emit(self, payload: bytes, ack_id: int) -> None:
+        assert self.handler
+        self.handler(base64.b64encode(payload).decode(), ack_id)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+async def test_frames_are_acked_only_after_viewer_consumes() -> None:
+    source = FakeSource()
+    server = PreviewServer(source, PreviewConfig(enabled=True, max_fps=1000))
+    async with TestClient(TestServer(server.app)) as client:
+        page = await client.get("/")
+        assert "WebSocket" in await page.text()
+        assert source.handler is None  # nobody watching, no screencast
+
+        ws = await client.ws_connect("/ws")
+        await _settle()
+        assert server.streaming
+        source.emit(b"jpeg-1", 1)
+        msg = await ws.receive(timeout=2)
+        assert msg.type == WSMsgType.BINARY and msg.data == b"jpeg-1"
+        await _settle()
+        assert source.acks == []
+
+        await ws.send_str("ack")
+        await _settle()
+        assert source.acks == [1]
+
+        await ws.close()
+        await _settle()
+        assert not server.streaming
+        assert source.stopped == 1
+
+
+async def test_stuck_viewer_skips_frames_without_blocking_others() -> None:
+    source = FakeSource()
+    server = PreviewServer(source, PreviewConfig(enabled=True, max_fps=1000), 0.1)
+    async with TestClient(TestServer(server.app)) as client:
+        fast = await client.ws_connect("/ws")
+        stuck = await client.ws_connect("/ws")
+        await _settle()
+        source.emit(b"a", 1)
+        assert (await fast.receive(timeout=2)).data == b"a"
+        assert (await stuck.receive(timeout=2)).data == b"a"
+        await fast.send_str("ack")
+        await asyncio.sleep(0.2)
+        assert source.acks == [1]  # released by the timeout
+
+        source.emit(b"b", 2)
+        assert (await fast.receive(timeout=2)).data == b"b"
+        await fast.send_str("ack")
+        # The stuck viewer still holds "a" and is skipped instead of queueing "b".
+        with pytest.raises(asyncio.TimeoutError):
+            await stuck.receive(timeout=0.1)
+        await asyncio.sleep(0.2)
+        assert source.acks == [1, 2]
+        await fast.close()
+        await stuck.close()
+
+
+async def test_max_fps_delays_ack() -> None:
+    source = FakeSource()
+    server = PreviewServer(source, PreviewConfig(enabled=True, max_fps=5))
+    async with TestClient(TestServer(server.app)) as client:
+        ws = await client.ws_connect("/ws")
+        await _settle()
+        loop = asyncio.get_running_loop()
+        times = []
+        for i in (1, 2, 3):
+            source.emit(b"f", i)
+            await ws.receive(timeout=2)
+            await ws.send_str("ack")
+            while len(source.acks) < i:
+                await asyncio.sleep(0.005)
+            times.append(loop.time())
+        assert times[2] - times[0] >= 0.35
+        await ws.close()
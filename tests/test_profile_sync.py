@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+from kiosk_control.cdp import ChromiumKiosk
+from kiosk_control.config import ProfileConfig
+from kiosk_control.system.procstat import write_bytes
+from kiosk_control.system.profile_sync import ProfileSync
+
+
+def _write(path: Path, data: str, mtime_ns: int | None = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(data, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_stage_copies_only_selected_paths(tmp_path: Path) -> None:
+    disk, ram = tmp_path / "disk", tmp_path / "ram"
+    _write(disk / "Default" / "Cookies", "c")
+    _write(disk / "Default" / "Local Storage" / "leveldb" / "000003.log", "ls")
+    _write(disk / "Default" / "Cache" / "data_0", "cache")
+    sync = ProfileSync(disk, ram, ["Default/Cookies", "Default/Local Storage"])
+    sync.stage()
+    assert (ram / "Default" / "Cookies").read_text() == "c"
+    assert (ram / "Default" / "Local Storage" / "leveldb" / "000003.log").exists()
+    assert not (ram / "Default" / "Cache").exists()
+    # Nothing changed since staging: nothing to write.
+    assert sync.sync() == 0
+
+
+def test_stage_keeps_newer_runtime_files(tmp_path: Path) -> None:
+    disk, ram = tmp_path / "disk", tmp_path / "ram"
+    _write(disk / "Local State", "old", mtime_ns=1_000_000_000)
+    _write(ram / "Local State", "newer", mtime_ns=2_000_000_000)
+    sync = ProfileSync(disk, ram, ["Local State"])
+    sync.stage()
+    assert (ram / "Local State").read_text() == "newer"
+    assert sync.sync() == len("newer")
+    assert (disk / "Local State").read_text() == "newer"
+
+
+def test_sync_is_incremental_and_mirrors_deletes(tmp_path: Path) -> None:
+    disk, ram = tmp_path / "disk", tmp_path / "ram"
+    ldb = ram / "Default" / "Local Storage" / "leveldb"
+    _write(ldb / "000003.log", "aaaa")
+    _write(ldb / "CURRENT", "MANIFEST-1")
+    sync = ProfileSync(disk, ram, ["Default/Local Storage"])
+    assert sync.sync(final=True) == 4 + 10
+    assert sync.sync(final=True) == 0
+
+    (ldb / "000003.log").unlink()
+    _write(ldb / "000005.ldb", "bb")
+    assert sync.sync(final=True) == 2
+    assert sorted(p.name for p in (disk / "Default" / "Local Storage" / "leveldb").iterdir()) == [
+        "000005.ldb",
+        "CURRENT",
+    ]
+    assert sync.bytes_written == 16
+
+
+def test_live_sync_backs_up_sqlite_and_leaves_journals_and_leveldb(tmp_path: Path) -> None:
+    disk, ram = tmp_path / "disk", tmp_path / "ram"
+    (ram / "Default").mkdir(parents=True)
+    db = sqlite3.connect(ram / "Default" / "Cookies")
+    db.execute("CREATE TABLE cookies (name TEXT)")
+    db.execute("INSERT INTO cookies VALUES ('session')")
+    db.commit()
+    _write(ram / "Default" / "Cookies-journal", "")  # truncated after each commit
+    _write(ram / "Default" / "Local Storage" / "leveldb" / "CURRENT", "MANIFEST-1")
+    sync = ProfileSync(
+        disk, ram, ["Default/Cookies", "Default/Cookies-journal", "Default/Local Storage"]
+    )
+
+    # Chromium still has the database open.
+    assert sync.sync() > 0
+    copy = sqlite3.connect(disk / "Default" / "Cookies")
+    assert copy.execute("SELECT name FROM cookies").fetchall() == [("session",)]
+    copy.close()
+    assert not (disk / "Default" / "Cookies-journal").exists()
+    assert not (disk / "Default" / "Local Storage").exists()
+    db.close()
+
+    sync.sync(final=True)
+    assert (disk / "Default" / "Cookies-journal").exists()
+    assert (disk / "Default" / "Local Storage" / "leveldb" / "CURRENT").exists()
+
+
+async def test_close_runs_final_sync(tmp_path: Path) -> None:
+    disk, ram = tmp_path / "disk", tmp_path / "ram"
+    _write(ram / "Default" / "Cookies", "session")
+    kiosk = ChromiumKiosk("chromium", str(disk), [], profile=ProfileConfig(tmpfs=True))
+    kiosk.profile_sync = ProfileSync(disk, ram, ["Default/Cookies"])
+    await kiosk.close()
+    assert (disk / "Default" / "Cookies").read_text() == "session"
+
+
+def test_write_bytes_sums_tree(tmp_path: Path) -> None:
+    for pid, n in ((10, 4096), (11, 8192)):
+        d = tmp_path / str(pid)
+        d.mkdir()
+        (d / "io").write_text(
+            f"rchar: 1\nwchar: 99999\nread_bytes: 0\nwrite_bytes: {n}\ncancelled_write_bytes: 0\n"
+        )
+    assert write_bytes([10, 11, 12], tmp_path) == 12288
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import websockets
+from aiohttp import web
+from fakes import KioskFactory
+
+from kiosk_control.cdp import CdpClient, ChromiumKiosk, RequestPolicy
+from kiosk_control.config import validate
+
+
+async def test_policy_applied_only_on_change(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk()
+    ads = RequestPolicy(block_urls=("*doubleclick*",), block_resource_types=("Font",))
+    await k.prepare_view("a", ads)
+    await k.prepare_view("b", ads)
+    assert cdp.calls == [
+        (
+            "Fetch.enable",
+            {
+                "patterns": [
+                    {"urlPattern": "*doubleclick*", "requestStage": "Request"},
+                    {"urlPattern": "*", "resourceType": "Font", "requestStage": "Request"},
+                ]
+            },
+        ),
+    ]
+    cdp.calls.clear()
+    await k.prepare_view("c", RequestPolicy())
+    assert cdp.calls == [("Fetch.disable", None)]
+
+
+async def test_network_domain_only_for_traffic_stats(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk({"Target.attachToTarget": {"sessionId": "S2"}})
+    await k._attach("T2")
+    assert "Network.enable" not in cdp.methods()
+    assert "Network.requestWillBeSent" not in cdp.listeners
+
+    cdp.calls.clear()
+    await k.prepare_view("a", RequestPolicy(traffic_stats=True))
+    await k.prepare_view("b", RequestPolicy(traffic_stats=True))
+    assert cdp.methods() == ["Network.enable"]
+    assert len(cdp.listeners["Network.requestWillBeSent"]) == 1
+    cdp.calls.clear()
+    await k.prepare_view("c", RequestPolicy())
+    assert cdp.methods() == ["Network.disable"]
+
+
+async def test_traffic_is_attributed_to_current_view(make_kiosk: KioskFactory) -> None:
+    k, _cdp = make_kiosk()
+    await k.prepare_view("energy", RequestPolicy(traffic_stats=True))
+    k._on_request({}, "S")
+    k._on_request({}, "S")
+    k._on_loading_finished({"encodedDataLength": 1500}, "S")
+    k._on_request_paused({"requestId": "r1"}, "S")
+    # Events from another (e.g. recycled) target are ignored.
+    k._on_request({}, "OTHER")
+    k._on_request_paused({"requestId": "r2"}, "OTHER")
+    await asyncio.sleep(0)
+    stats = k.network_stats["energy"]
+    assert (stats.requests, stats.bytes, stats.blocked) == (2, 1500, 1)
+
+
+async def test_paused_requests_are_failed(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk()
+    k._on_request_paused({"requestId": "r1"}, "S")
+    await asyncio.sleep(0)
+    assert cdp.calls == [
+        ("Fetch.failRequest", {"requestId": "r1", "errorReason": "BlockedByClient"})
+    ]
+
+
+async def test_client_dispatches_events_to_listeners() -> None:
+    async def server(ws: Any) -> None:
+        async for raw in ws:
+            msg = json.loads(raw)
+            await ws.send(
+                json.dumps(
+                    {"method": "Network.requestWillBeSent", "params": {"x": 1}, "sessionId": "S"}
+                )
+            )
+            await ws.send(json.dumps({"id": msg["id"], "result": {}}))
+
+    async with websockets.serve(server, "127.0.0.1", 0) as srv:
+        port = srv.sockets[0].getsockname()[1]
+        client = CdpClient(f"ws://127.0.0.1:{port}")
+        seen: list[tuple[dict, str | None]] = []
+        client.on("Network.requestWillBeSent", lambda p, s: seen.append((p, s)))
+        client.on("Network.requestWillBeSent", lambda p, s: 1 / 0)  # logged, not fatal
+        await client.connect()
+        try:
+            assert await client.call("Network.enable") == {}
+        finally:
+            assert client._ws
+            await client._ws.close()
+    assert seen == [({"x": 1}, "S")]
+
+
+def test_view_block_lists_parse(make_config: Callable[..., dict[str, Any]]) -> None:
+    views = {"a": {"url": "https://a", "block_urls": ["*ads*"], "block_resource_types": ["Media"]}}
+    cfg = validate(make_config(views=views))
+    assert cfg.views["a"].block_urls == ("*ads*",)
+    assert cfg.views["a"].block_resource_types == ("Media",)
+    assert cfg.views["a"].traffic_stats is False
+
+
+PAGE = """<!doctype html>
+<html><head>
+<link rel="stylesheet" href="/style.css">
+<script src="/ads.js"></script>
+<style>@font-face { font-family: F; src: url(/font.woff2); } body { font-family: F; }</style>
+</head><body>hello</body></html>
+"""
+
+
+async def test_blocking_with_real_chromium(tmp_path: Path, chromium_bin: str) -> None:
+    hits: list[str] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        hits.append(request.path)
+        if request.path == "/":
+            return web.Response(text=PAGE, content_type="text/html")
+        return web.Response(body=b"x" * 1000, content_type="application/octet-stream")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    kiosk = ChromiumKiosk(
+        chromium_bin,
+        str(tmp_path / "profile"),
+        ["--headless=new", "--remote-debugging-port=0", "--no-first-run", "about:blank"],
+    )
+    await kiosk.start()
+    try:
+        await kiosk.prepare_view(
+            "dash",
+            RequestPolicy(
+                block_urls=("*ads.js",), block_resource_types=("Font",), traffic_stats=True
+            ),
+        )
+        await kiosk.navigate(f"http://127.0.0.1:{port}/")
+        for _ in range(100):
+            if await kiosk.evaluate("document.readyState") == "complete":
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.2)
+        stats = kiosk.network_stats["dash"]
+        assert "/" in hits and "/style.css" in hits
+        assert "/ads.js" not in hits and "/font.woff2" not in hits
+        assert stats.blocked >= 1
+        assert stats.bytes >= 1000
+    finally:
+        kiosk.terminate()
+        await runner.cleanup()
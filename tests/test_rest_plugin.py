@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from kiosk_control.httpclient import create_session
+from kiosk_control.plugins.base import PluginContext
+from kiosk_control.plugins.rest import (
+    AdaptiveInterval,
+    RestConfig,
+    RestEndpointConfig,
+    RestPollingPlugin,
+    _Endpoint,
+)
+
+
+def test_adaptive_interval() -> None:
+    cfg = RestEndpointConfig(
+        name="w", url="", facts={}, interval_seconds=40, min_interval_seconds=10,
+        max_interval_seconds=100, screen_off_interval_seconds=300,
+    )  # fmt: skip
+    iv = AdaptiveInterval(cfg)
+    assert iv.update(changed=True) == 20
+    assert iv.update(changed=True) == 10
+    assert iv.update(changed=True) == 10
+    assert iv.update(changed=False) == 15
+    assert iv.update(changed=False, failed=True) == 30
+    assert iv.next_delay(screen_on=True) == 30
+    assert iv.next_delay(screen_on=False) == 300
+
+
+class Api:
+    def __init__(self) -> None:
+        self.temp = 10
+        self.bodies = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def weather(self, request: web.Request) -> web.Response:
+        etag = f'"t{self.temp}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304)
+        self.bodies += 1
+        return web.json_response({"current": {"temp": self.temp}}, headers={"ETag": etag})
+
+    async def slow(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return web.json_response({"v": request.match_info["n"]})
+
+
+def _app(api: Api) -> web.Application:
+    app = web.Application()
+    app.router.add_get("/weather", api.weather)
+    app.router.add_get("/slow/{n}", api.slow)
+    return app
+
+
+async def test_conditional_requests_skip_unchanged_bodies() -> None:
+    api = Api()
+    async with TestServer(_app(api)) as server, create_session() as session:
+        ep_cfg = RestEndpointConfig(
+            name="weather",
+            url=str(server.make_url("/weather")),
+            facts={"weather.temp": "$.current.temp"},
+        )
+        ctx = PluginContext({}, wakeup=asyncio.Event(), http=session)
+        plugin = RestPollingPlugin(RestConfig(endpoints=[ep_cfg]))
+        plugin._ctx, plugin._session = ctx, session
+        ep = _Endpoint(ep_cfg)
+
+        assert await plugin.poll(ep) is False  # first value, not a change
+        assert ctx.facts["weather.temp"] == 10 and ctx.wakeup.is_set()
+        ctx.wakeup.clear()
+        assert await plugin.poll(ep) is False
+        assert (api.bodies, api.not_modified) == (1, 1)
+        assert not ctx.wakeup.is_set()
+
+        api.temp = 11
+        assert await plugin.poll(ep) is True
+        assert ctx.facts["weather.temp"] == 11
+        assert ctx.facts["rest.weather.ok"] is True
+
+
+async def test_endpoints_run_concurrently_within_limit() -> None:
+    api = Api()
+    async with TestServer(_app(api)) as server:
+        endpoints = [
+            RestEndpointConfig(
+                name=f"s{i}", url=str(server.make_url(f"/slow/{i}")), facts={f"slow.{i}": "v"}
+            )
+            for i in range(6)
+        ]
+        ctx = PluginContext({})
+        plugin = RestPollingPlugin(RestConfig(endpoints=endpoints, max_concurrency=2))
+        await plugin.start(ctx)
+        try:
+            for _ in range(100):
+                if all(f"slow.{i}" in ctx.facts for i in range(6)):
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await plugin.stop()
+        assert [ctx.facts[f"slow.{i}"] for i in range(6)] == [str(i) for i in range(6)]
+        assert api.max_in_flight == 2
+
+
+async def test_failures_are_reported_and_back_off() -> None:
+    ctx = PluginContext({})
+    ep_cfg = RestEndpointConfig(
+        name="down", url="http://127.0.0.1:9/x", facts={}, interval_seconds=5
+    )
+    plugin = RestPollingPlugin(RestConfig(endpoints=[ep_cfg], timeout_seconds=1))
+    await plugin.start(ctx)
+    try:
+        for _ in range(100):
+            if "rest.down.ok" in ctx.facts:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await plugin.stop()
+    assert ctx.facts["rest.down.ok"] is False
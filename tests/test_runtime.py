@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from kiosk_control import display, runtime
+from kiosk_control.config import EventLoopConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.policy import Decision
+
+
+async def _probe() -> tuple[str, str]:
+    loop = asyncio.get_running_loop()
+    name = await asyncio.to_thread(lambda: threading.current_thread().name)
+    return type(loop).__module__, name
+
+
+def test_run_uses_sized_named_executor() -> None:
+    module, thread = runtime.run(_probe(), EventLoopConfig(executor_workers=2))
+    assert module.startswith("asyncio")
+    assert thread.startswith("kiosk-io")
+
+
+def test_run_under_uvloop() -> None:
+    pytest.importorskip("uvloop")
+    module, _thread = runtime.run(_probe(), EventLoopConfig(uvloop=True))
+    assert module.startswith("uvloop")
+    # The command-line flag wins over the config.
+    module, _thread = runtime.run(_probe(), EventLoopConfig(uvloop=True), use_uvloop=False)
+    assert module.startswith("asyncio")
+
+
+async def test_backlight_written_off_the_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for name in ("bl_power", "brightness"):
+        (tmp_path / name).write_text("0", encoding="utf-8")
+    cfg = validate(
+        {
+            "security": {"allow_insecure": True},
+            "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+            "views": {"a": "http://a"},
+            "playlist": [{"view": "a", "seconds": 10}],
+            "policy": {
+                "idle_off_seconds": 60,
+                "hypo_threshold_mmol": 4,
+                "trending_guard_mmol": 0.5,
+            },
+            "screen": {"backlight_sysfs": str(tmp_path), "brightness_dim": 7},
+        }
+    )
+    ctl = Controller(cfg)
+    writers: list[str] = []
+    real = display._write_backlight
+
+    def spy(*args: object) -> None:
+        writers.append(threading.current_thread().name)
+        real(*args)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(display, "_write_backlight", spy)
+    await ctl._apply(Decision(screen_on=False, view="a", why="idle"), time.time())
+    assert (tmp_path / "bl_power").read_text() == "1"
+    assert (tmp_path / "brightness").read_text() == "7"
+    assert ctl.facts["screen.on"] is False
+    assert writers and writers[0] != threading.main_thread().name
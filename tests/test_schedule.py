@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import calendar
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from kiosk_control.config import ConfigError, validate
+from kiosk_control.controller import Controller
+from kiosk_control.policy import Decision
+from kiosk_control.schedule import (
+    DAY,
+    WEEK,
+    ScheduleConfig,
+    ScheduleIndex,
+    TimeWindow,
+    parse_clock,
+    parse_days,
+)
+
+# Monday 2024-01-01 00:00 UTC.
+MONDAY = calendar.timegm((2024, 1, 1, 0, 0, 0))
+
+
+@pytest.fixture
+def utc(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _cfg(**overrides: Any) -> dict[str, Any]:
+    cfg: dict[str, Any] = {
+        "security": {"allow_insecure": True},
+        "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+        "views": {"a": "http://a", "b": "http://b", "c": "http://c"},
+        "playlist": [{"view": "a", "seconds": 10}, {"view": "b", "seconds": 5}],
+        "policy": {
+            "idle_off_seconds": 60,
+            "manual_timeout_seconds": 10,
+            "hypo_threshold_mmol": 4,
+            "trending_guard_mmol": 0.5,
+        },
+        "screen": {"backlight_sysfs": "/tmp"},
+        "schedules": [
+            {
+                "name": "night",
+                "windows": [{"days": "daily", "start": "23:00", "end": "06:30"}],
+                "screen_off": True,
+            },
+            {
+                "name": "work",
+                "windows": [{"days": "weekdays", "start": "06:00", "end": "18:00"}],
+                "playlist": [{"view": "c", "seconds": 30}],
+            },
+        ],
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+def test_parse_clock_and_days() -> None:
+    assert parse_clock("06:30") == 6 * 3600 + 30 * 60
+    assert parse_clock("24:00") == DAY
+    with pytest.raises(ValueError):
+        parse_clock("25:00")
+    assert parse_days("weekends") == (5, 6)
+    assert parse_days(["Monday", "wed", "weekends"]) == (0, 2, 5, 6)
+    with pytest.raises(ValueError):
+        parse_days(["someday"])
+
+
+def test_config_errors_name_the_window() -> None:
+    bad = _cfg(schedules=[{"windows": [{"start": 390, "end": "07:00"}]}])
+    with pytest.raises(ConfigError, match=r"schedules\[0\]\.windows\[0\]\.start"):
+        validate(bad)
+    bad = _cfg(schedules=[{"windows": [{"start": "06:00", "end": "07:00"}], "playlist": []}])
+    with pytest.raises(ConfigError, match=r"schedules\[0\]\.playlist"):
+        validate(bad)
+
+
+def test_overlap_goes_to_first_schedule_and_midnight_wraps() -> None:
+    night = ScheduleConfig("night", (TimeWindow(tuple(range(7)), 23 * 3600, 6 * 3600 + 1800),))
+    work = ScheduleConfig("work", (TimeWindow(tuple(range(5)), 6 * 3600, 18 * 3600),))
+    index = ScheduleIndex([night, work])
+
+    assert index.lookup(6 * 3600 + 60) == (night, 29 * 60)  # Monday 06:01
+    assert index.lookup(7 * 3600) == (work, 11 * 3600)
+    assert index.lookup(18 * 3600) == (None, 5 * 3600)
+    # Sunday 23:30 runs into Monday 06:30 across the week boundary.
+    sched, remaining = index.lookup(WEEK - 1800)
+    assert sched is night and remaining == 1800 + 6 * 3600 + 1800
+    # Saturday: no work window.
+    assert index.lookup(5 * DAY + 12 * 3600) == (None, 11 * 3600)
+
+
+def test_week_of_virtual_time(utc: None) -> None:
+    ctl = Controller(validate(_cfg()))
+    calls = 0
+    real_at = ctl._schedules.at
+
+    def counting_at(ts: float) -> Any:
+        nonlocal calls
+        calls += 1
+        return real_at(ts)
+
+    ctl._schedules.at = counting_at  # type: ignore[method-assign]
+
+    # Tick every minute for a week; lookups only happen at boundaries.
+    timeline: list[tuple[float, str | None, bool, tuple[str, ...]]] = []
+    for now in range(MONDAY, MONDAY + WEEK, 60):
+        ctl._update_schedule(now)
+        decision = ctl._screen_off_override(Decision(True, "a", "playlist"))
+        state = (ctl.facts.get("schedule.active"), decision.screen_on)
+        if not timeline or timeline[-1][1:3] != state:
+            views = tuple(item.view for item in ctl._main.playlist)
+            timeline.append((now, *state, views))
+
+    def at(day: int, hh: int, mm: int = 0) -> int:
+        return MONDAY + day * DAY + hh * 3600 + mm * 60
+
+    monday = [t for t in timeline if t[0] < at(1, 0)]
+    assert monday == [
+        (at(0, 0), "night", False, ("a", "b")),
+        (at(0, 6, 30), "work", True, ("c",)),
+        (at(0, 18), None, True, ("a", "b")),
+        (at(0, 23), "night", False, ("a", "b")),
+    ]
+    saturday = [t for t in timeline if at(5, 0) <= t[0] < at(6, 0)]
+    assert saturday == [
+        (at(5, 6, 30), None, True, ("a", "b")),
+        (at(5, 23), "night", False, ("a", "b")),
+    ]
+    # 7 nights + 5 working days, each with its start and end.
+    assert len(timeline) == 1 + 5 * 3 + 2 * 2
+    assert calls == len(timeline)
+
+
+def test_alert_overrides_screen_off_window(utc: None) -> None:
+    ctl = Controller(validate(_cfg()))
+    ctl._update_schedule(MONDAY + 2 * 3600)
+    assert not ctl._screen_off_override(Decision(True, "a", "playlist")).screen_on
+    ctl.facts["nightscout.alert"] = True
+    assert ctl._screen_off_override(Decision(True, "a", "alert")).screen_on
+
+
+def test_boundary_follows_dst(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TZ", "Europe/Amsterdam")
+    time.tzset()
+    try:
+        day = ScheduleConfig("day", (TimeWindow(tuple(range(7)), 8 * 3600, 20 * 3600),))
+        index = ScheduleIndex([day])
+        # Saturday 2024-03-30 21:00 CET; clocks go forward overnight.
+        ts = time.mktime((2024, 3, 30, 21, 0, 0, 0, 0, -1))
+        until = index.at(ts).until
+        assert time.localtime(until)[:5] == (2024, 3, 31, 8, 0)
+        assert until - ts == 10 * 3600
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fakes import KioskFactory
+
+from kiosk_control import controller
+from kiosk_control.config import ScreenOffConfig, validate
+from kiosk_control.system.procstat import CpuAccounting, cpu_seconds, process_tree
+
+
+async def test_freeze_and_resume(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk(screen_off=ScreenOffConfig(mode="freeze"))
+    await k.suspend()
+    await k.suspend()  # idempotent
+    assert cdp.methods().count("Page.setWebLifecycleState") == 1
+    assert ("Page.setWebLifecycleState", {"state": "frozen"}) in cdp.calls
+
+    cdp.calls.clear()
+    assert await k.resume() is False
+    assert ("Page.setWebLifecycleState", {"state": "active"}) in cdp.calls
+    assert ("Emulation.setCPUThrottlingRate", {"rate": 1}) in cdp.calls
+    assert "Page.reload" not in cdp.methods()
+
+
+async def test_resume_reloads_stale_page(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk(screen_off=ScreenOffConfig(mode="freeze", refresh_after_seconds=0))
+    await k.suspend()
+    await k.resume()
+    assert "Page.reload" in cdp.methods()
+
+
+async def test_blank_mode_requests_renavigation(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk(screen_off=ScreenOffConfig(mode="blank"))
+    await k.suspend()
+    assert cdp.calls == [("Page.navigate", {"url": "about:blank"})]
+    assert await k.resume() is True
+
+
+def _fake_proc(root: Path, pid: int, ppid: int, utime: int, stime: int) -> None:
+    d = root / str(pid)
+    d.mkdir()
+    fields = ["S", str(ppid)] + ["0"] * 9 + [str(utime), str(stime)] + ["0"] * 10
+    (d / "stat").write_text(f"{pid} (chromium (gpu)) " + " ".join(fields), encoding="utf-8")
+
+
+def test_process_tree_cpu(tmp_path: Path) -> None:
+    _fake_proc(tmp_path, 100, 1, 50, 50)
+    _fake_proc(tmp_path, 101, 100, 100, 0)
+    _fake_proc(tmp_path, 102, 101, 0, 100)
+    _fake_proc(tmp_path, 200, 1, 999, 999)
+    pids = process_tree(100, proc=tmp_path)
+    assert sorted(pids) == [100, 101, 102]
+    assert cpu_seconds(pids, proc=tmp_path) > 0
+    assert cpu_seconds(pids, proc=tmp_path) < cpu_seconds([100, 101, 102, 200], proc=tmp_path)
+
+
+def test_cpu_accounting_splits_by_state() -> None:
+    acc = CpuAccounting()
+    acc.sample(cpu=0.0, wall=0.0, state="awake")
+    acc.sample(cpu=5.0, wall=10.0, state="asleep")
+    acc.sample(cpu=5.1, wall=110.0, state="awake")
+    assert acc.cpu_seconds == pytest.approx({"awake": 5.0, "asleep": 0.1})
+    assert acc.cpu_percent("awake") == pytest.approx(50.0)
+    assert acc.cpu_percent("asleep") == pytest.approx(0.1)
+
+
+class _Browser:
+    pid = os.getpid()
+    profile_sync = None
+    network_stats: dict[str, Any] = {}
+
+
+async def test_metrics_walk_proc_off_the_event_loop(
+    make_config: Callable[..., dict[str, Any]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    threads: list[str] = []
+
+    def tree(pid: int) -> list[int]:
+        threads.append(threading.current_thread().name)
+        return process_tree(pid)
+
+    monkeypatch.setattr(controller, "process_tree", tree)
+    ctl = controller.Controller(validate(make_config()))
+    ctl._chromium = _Browser()  # type: ignore[assignment]
+    await ctl._sample_proc()
+    assert threads and threading.main_thread().name not in threads
+    metrics = json.loads(ctl.get_metrics())
+    assert "browser.cpu_seconds.awake" in metrics and "browser.disk_write_bytes" in metrics
+    assert metrics["proc.sampled_ts"] > 0
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from kiosk_control.plugins.selectors import MISSING, compile_selector, select
+
+DOC = {"current": {"temp": 12.5, "wind.speed": 3}, "alerts": [{"title": "Storm"}]}
+
+
+@pytest.mark.parametrize(
+    ("selector", "expected"),
+    [
+        ("$.current.temp", 12.5),
+        ("current.temp", 12.5),
+        ('$.current["wind.speed"]', 3),
+        ("$.alerts[0].title", "Storm"),
+        ("$.alerts[-1].title", "Storm"),
+        ("$.alerts[1].title", None),
+        ("$.current.temp.x", None),
+    ],
+)
+def test_selectors(selector: str, expected: Any) -> None:
+    value = select(DOC, compile_selector(selector))
+    assert (None if value is MISSING else value) == expected
+
+
+def test_invalid_selector() -> None:
+    with pytest.raises(ValueError):
+        compile_selector("$.a[")
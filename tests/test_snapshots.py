@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import base64
+from pathlib import Path
+from typing import Any
+
+from kiosk_control.config import validate
+from kiosk_control.controller import Controller
+from kiosk_control.policy import Decision
+from kiosk_control.snapshots import SnapshotCache
+
+
+def _jpeg(n: int) -> str:
+    return base64.b64encode(b"\xff\xd8" + b"x" * n).decode()
+
+
+def test_store_and_get(tmp_path: Path) -> None:
+    cache = SnapshotCache(tmp_path, max_bytes=10**6)
+    assert cache.get("ha/energy") is None
+    cache.store("ha/energy", _jpeg(100), ts=1000.0)
+    page = cache.get("ha/energy")
+    assert page is not None and page.name == "ha_energy.html"
+    text = page.read_text(encoding="utf-8")
+    assert 'src="ha_energy.jpg?1000000"' in text and "const captured = 1000000;" in text
+    assert (tmp_path / "ha_energy.jpg").read_bytes().startswith(b"\xff\xd8")
+    # The index is rebuilt from disk.
+    assert SnapshotCache(tmp_path, max_bytes=10**6).views() == ["ha_energy"]
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    probe = SnapshotCache(tmp_path / "probe", max_bytes=10**6)
+    probe.store("x", _jpeg(1000), ts=0)
+    one = probe.total_bytes
+
+    cache = SnapshotCache(tmp_path / "c", max_bytes=2 * one + 10)
+    cache.store("a", _jpeg(1000), ts=0)
+    cache.store("b", _jpeg(1000), ts=0)
+    cache.get("a")  # b is now least recently used
+    cache.store("c", _jpeg(1000), ts=0)
+    assert cache.views() == ["a", "c"]
+    assert not (tmp_path / "c" / "b.jpg").exists()
+    assert cache.total_bytes <= cache.max_bytes
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.navigation_error: str | None = None
+        self.shown: list[str] = []
+        self.down = False
+
+    async def prepare_view(self, label: str, policy: Any) -> None:
+        pass
+
+    async def navigate(self, url: str, soft: bool = False) -> bool:
+        self.navigation_error = "net::ERR_CONNECTION_REFUSED" if self.down else None
+        self.shown.append(url)
+        return False
+
+    async def show_file(self, path: Path) -> None:
+        self.shown.append(path.as_uri())
+
+    async def capture_screenshot(self, quality: int = 70) -> str:
+        return _jpeg(10)
+
+
+def _controller(tmp_path: Path) -> tuple[Controller, FakeBrowser]:
+    cfg = validate(
+        {
+            "security": {"allow_insecure": True},
+            "chromium": {
+                "bin": "chromium",
+                "user_data_dir": "/tmp/x",
+                "extra_flags": [],
+                "snapshots": {
+                    "enabled": True,
+                    "dir": str(tmp_path),
+                    "capture_after_seconds": 5,
+                    "retry_seconds": 30,
+                },
+            },
+            "views": {"a": "http://a"},
+            "playlist": [{"view": "a", "seconds": 600}],
+            "policy": {"idle_off_seconds": 60, "hypo_threshold_mmol": 5, "trending_guard_mmol": 1},
+            "screen": {"backlight_sysfs": str(tmp_path)},
+        }
+    )
+    ctl = Controller(cfg)
+    browser = FakeBrowser()
+    ctl._chromium = ctl._main.window = browser  # type: ignore[assignment]
+    return ctl, browser
+
+
+async def test_capture_after_paint_and_fallback(tmp_path: Path) -> None:
+    ctl, browser = _controller(tmp_path)
+    show_a = Decision(screen_on=True, view="a", why="playlist")
+
+    await ctl._apply(show_a, now=100.0)
+    assert browser.shown == ["http://a"]
+    await ctl._apply(show_a, now=104.0)
+    assert ctl._main._capture_task is None
+    await ctl._apply(show_a, now=105.0)
+    assert ctl._main._capture_task is not None
+    await ctl._main._capture_task
+    assert ctl.metrics.get("snapshots.captured") == 1
+
+    # The view fails to load: the snapshot is shown and the live URL retried later.
+    browser.down = True
+    ctl._main.current_view = None
+    await ctl._apply(show_a, now=200.0)
+    assert browser.shown[-1] == (tmp_path / "a.html").as_uri()
+    assert ctl.facts["browser.offline"] is True
+    await ctl._apply(show_a, now=229.0)
+    assert browser.shown[-1].startswith("file:")
+
+    browser.down = False
+    await ctl._apply(show_a, now=230.0)
+    assert browser.shown[-1] == "http://a"
+    assert ctl.facts["browser.offline"] is False
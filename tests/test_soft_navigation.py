@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+from fakes import KioskFactory
+
+from kiosk_control.cdp import ChromiumKiosk
+from kiosk_control.config import ViewConfig, validate
+
+PAGE = Path(__file__).parent / "data" / "spa_boot_counter.html"
+
+
+ROUTED = {"Runtime.evaluate": {"result": {"value": True}}}
+
+
+async def test_soft_navigation_routes_inside_loaded_app(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk(ROUTED)
+    assert await k.navigate("https://ha.example/lovelace/0", soft=True) is False
+    assert await k.navigate("https://ha.example/energy", soft=True) is True
+    assert cdp.methods() == ["Page.navigate", "Runtime.evaluate"]
+    assert '"https://ha.example/energy"' in cdp.calls[1][1]["expression"]
+
+
+async def test_soft_navigation_falls_back_on_error(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk({"Runtime.evaluate": {"exceptionDetails": {"text": "Uncaught"}}})
+    await k.navigate("https://ha.example/lovelace/0")
+    assert await k.navigate("https://ha.example/energy", soft=True) is False
+    assert cdp.methods() == ["Page.navigate", "Runtime.evaluate", "Page.navigate"]
+
+
+async def test_cross_origin_is_always_full_navigation(make_kiosk: KioskFactory) -> None:
+    k, cdp = make_kiosk(ROUTED)
+    await k.navigate("https://ha.example/lovelace/0")
+    assert await k.navigate("https://nightscout.example/", soft=True) is False
+    assert "Runtime.evaluate" not in cdp.methods()
+
+
+def test_view_mapping_form(make_config: Callable[..., dict[str, Any]]) -> None:
+    cfg = validate(make_config(views={"a": "https://a", "b": {"url": "https://a/b", "spa": True}}))
+    assert cfg.views["a"] == ViewConfig(url="https://a")
+    assert cfg.views["b"].spa is True
+
+
+async def test_spa_is_booted_once_with_real_chromium(tmp_path: Path, chromium_bin: str) -> None:
+    async def page(_request: web.Request) -> web.Response:
+        return web.Response(text=PAGE.read_text(encoding="utf-8"), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    base = f"http://127.0.0.1:{port}"
+
+    kiosk = ChromiumKiosk(
+        chromium_bin,
+        str(tmp_path / "profile"),
+        ["--headless=new", "--remote-debugging-port=0", "--no-first-run", "about:blank"],
+    )
+    await kiosk.start()
+    try:
+
+        async def wait_for(expr: str, expected: Any) -> Any:
+            for _ in range(100):
+                value = await kiosk.evaluate(expr)
+                if value == expected:
+                    return value
+                await asyncio.sleep(0.05)
+            return value
+
+        await kiosk.navigate(f"{base}/lovelace/0", soft=True)
+        assert await wait_for("window.__bootCount", 1) == 1
+        for path in ("/energy", "/lovelace/1", "/energy"):
+            assert await kiosk.navigate(base + path, soft=True) is True
+        assert await wait_for("location.pathname", "/energy") == "/energy"
+        assert await kiosk.evaluate("sessionStorage.getItem('bootCount')") == "1"
+        assert await kiosk.evaluate("window.__routes.length") == 4
+    finally:
+        kiosk.terminate()
+        await runner.cleanup()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from kiosk_control.config import StateConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.state_store import StateStore
+
+
+def _store(tmp_path: Path, **kw: Any) -> StateStore:
+    return StateStore(StateConfig(enabled=True, path=str(tmp_path / "state.json"), **kw))
+
+
+def test_writes_are_debounced_and_rate_limited(tmp_path: Path) -> None:
+    store = _store(tmp_path, min_interval_seconds=60, debounce_seconds=2)
+    state = {"playlist_index": 0}
+
+    store.observe(state, {"ha.production_w": 1}, 1000.0)
+    assert not store.due(1001.0)  # still settling
+    assert store.due(1002.0)
+    version, data = store.document(1002.0)
+    store.write(data)
+    store.mark_saved(version, 1002.0)
+    assert not store.dirty
+
+    # Unchanged observations never make the store dirty.
+    store.observe(state, {"ha.production_w": 1, "ha.connected": True}, 1010.0)
+    assert not store.dirty
+
+    # A fact that changes every second: one write per interval, not per change.
+    for t in range(1003, 1200):
+        store.observe(state, {"ha.production_w": t}, float(t))
+        if store.due(float(t)):
+            version, data = store.document(float(t))
+            store.mark_saved(version, float(t))
+    assert store.writes == 1 + 3
+
+
+def test_file_is_replaced_atomically(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    store.observe({"a": 1}, {"x": "y", "blob": {"nested": 1}, "mqtt.connected": True}, 5.0)
+    _v, data = store.document(5.0)
+    store.write(data)
+    doc = json.loads((tmp_path / "state.json").read_text())
+    assert doc["facts"] == {"x": ["y", 5.0]}  # not JSON scalars / volatile: skipped
+    assert not list(tmp_path.glob("*.tmp"))
+
+    (tmp_path / "state.json").write_text("{truncated")
+    assert _store(tmp_path).load() is None
+
+
+def _cfg(tmp_path: Path) -> dict[str, Any]:
+    return {
+        "security": {"allow_insecure": True},
+        "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+        "views": {"a": "http://a", "b": "http://b", "nightscout": "http://ns"},
+        "playlist": [{"view": "a", "seconds": 10}, {"view": "b", "seconds": 5}],
+        "policy": {
+            "idle_off_seconds": 60,
+            "manual_timeout_seconds": 600,
+            "hypo_threshold_mmol": 4,
+            "trending_guard_mmol": 0.5,
+        },
+        "screen": {"backlight_sysfs": "/tmp"},
+        "state": {"enabled": True, "path": str(tmp_path / "state.json")},
+    }
+
+
+async def test_restart_restores_view_override_and_facts(tmp_path: Path) -> None:
+    first = Controller(validate(_cfg(tmp_path)))
+    first.state.playlist_index = 1
+    first.set_view("nightscout")
+    first.facts.update(
+        {
+            "nightscout.sgv_mmol": 6.4,
+            "nightscout.last_update_ts": time.time() - 30,
+            "nightscout.connected": True,
+            "activity.last_ts": time.time() - 120,
+        }
+    )
+    await first._save_state(time.time(), force=True)
+    # An old value: written with a timestamp from two hours ago.
+    store = first._state_store
+    assert store is not None
+    store._facts["ha.sun_state"] = ("below_horizon", time.time() - 7200)
+    store._version += 1
+    await first._save_state(time.time(), force=True)
+
+    cfg = _cfg(tmp_path)
+    cfg["playlist"] = [{"view": "nightscout", "seconds": 10}] + cfg["playlist"]
+    second = Controller(validate(cfg))
+    await second._restore_state()
+
+    # Found by view name in the changed playlist.
+    assert second._main.playlist[second.state.playlist_index].view == "b"
+    assert second.state.manual_view == "nightscout"
+    assert second.facts["nightscout.sgv_mmol"] == 6.4
+    assert "nightscout.connected" not in second.facts
+    assert "ha.sun_state" not in second.facts
+    assert "activity.last_ts" not in second.facts
+    assert second.facts["state.restored_ts"] > 0
+
+    # Restored values are marked until a plugin publishes a live one.
+    assert second.facts["nightscout.sgv_mmol.restored"] is True
+    second._ctx.set_facts({"nightscout.sgv_mmol": 6.5})
+    assert "nightscout.sgv_mmol.restored" not in second.facts
+    assert second.facts["nightscout.last_update_ts.restored"] is True
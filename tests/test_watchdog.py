@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from kiosk_control.config import EventLoopConfig, validate
+from kiosk_control.controller import Controller
+from kiosk_control.loop_monitor import LoopLagMonitor
+from kiosk_control.system.sdnotify import SdNotifier
+
+
+@pytest.fixture
+def notify_socket(tmp_path: Path) -> Any:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(str(tmp_path / "notify"))
+    sock.settimeout(0.5)
+    yield sock
+    sock.close()
+
+
+def _messages(sock: socket.socket) -> list[str]:
+    out = []
+    sock.setblocking(False)
+    try:
+        while True:
+            out.append(sock.recv(4096).decode())
+    except BlockingIOError:
+        pass
+    return out
+
+
+def test_notifier_reads_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("NOTIFY_SOCKET", "@kiosk-test")
+    monkeypatch.setenv("WATCHDOG_USEC", "20000000")
+    monkeypatch.setenv("WATCHDOG_PID", "1")  # someone else's watchdog
+    n = SdNotifier()
+    assert n.enabled and n.watchdog_seconds is None
+    n.close()
+
+    monkeypatch.delenv("WATCHDOG_PID")
+    monkeypatch.delenv("NOTIFY_SOCKET")
+    n = SdNotifier()
+    assert not n.enabled and n.watchdog_seconds == 20.0
+    assert not n.notify("READY=1")
+
+
+def _cfg() -> dict[str, Any]:
+    return {
+        "security": {"allow_insecure": True},
+        "chromium": {"bin": "chromium", "user_data_dir": "/tmp/x", "extra_flags": []},
+        "views": {"a": "http://a"},
+        "playlist": [{"view": "a", "seconds": 10}],
+        "policy": {
+            "idle_off_seconds": 60,
+            "manual_timeout_seconds": 10,
+            "hypo_threshold_mmol": 4,
+            "trending_guard_mmol": 0.5,
+        },
+        "screen": {"backlight_sysfs": "/tmp"},
+        "event_loop": {"lag_interval_seconds": 0.05, "lag_threshold_seconds": 0.3},
+    }
+
+
+async def test_ready_after_first_navigation_and_watchdog_while_healthy(
+    tmp_path: Path, notify_socket: socket.socket
+) -> None:
+    ctl = Controller(validate(_cfg()))
+    ctl._notifier = SdNotifier(str(tmp_path / "notify"), watchdog_usec=400_000)
+    monitor = ctl._loop_monitor
+    assert monitor is not None
+    monitor.start()
+    try:
+        ctl._notify_systemd()
+        assert _messages(notify_socket) == ["WATCHDOG=1"]  # not ready: nothing shown yet
+
+        ctl._main.current_view = "a"
+        await asyncio.sleep(0.11)
+        ctl._notify_systemd()
+        ctl._notify_systemd()  # rate-limited to a quarter of the watchdog interval
+        assert _messages(notify_socket) == ["READY=1\nSTATUS=showing a", "WATCHDOG=1"]
+
+        # Blocking the loop past the threshold withholds the next ping.
+        time.sleep(0.5)
+        ctl._notify_systemd()
+        assert _messages(notify_socket) == []
+        await asyncio.sleep(0.2)
+        ctl._notify_systemd()
+        assert _messages(notify_socket) == ["WATCHDOG=1"]
+    finally:
+        await monitor.stop()
+        ctl._notifier.close()
+
+
+def _blocking_sysfs_write() -> None:
+    time.sleep(0.5)
+
+
+async def test_lag_monitor_logs_the_blocking_stack(caplog: pytest.LogCaptureFixture) -> None:
+    monitor = LoopLagMonitor(EventLoopConfig(lag_interval_seconds=0.02, lag_threshold_seconds=0.2))
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        with caplog.at_level(logging.WARNING, logger="kiosk_control.loop_monitor"):
+            _blocking_sysfs_write()
+            await asyncio.sleep(0.1)
+        assert monitor.stalls == 1
+        assert "_blocking_sysfs_write" in monitor.last_stack
+        assert "event loop blocked" in caplog.text
+        stats = monitor.stats()
+        assert stats["max_ms"] >= 300
+        assert stats["p50_ms"] < 100
+    finally:
+        await monitor.stop()